@@ -0,0 +1,81 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Time evaluating compiled XPath expressions. Run from the root of the source
+tree:
+
+    PYTHONPATH=src python benchmarks/evaluate.py
+
+Each expression is compiled once for each backend and evaluated repeatedly
+against the same document; the best per-evaluation time of a few rounds is
+reported.
+'''
+
+import sys
+import timeit
+
+from expatriate import Document
+from expatriate import xpath
+
+EXPRESSIONS = (
+    '//item',
+    '//item[@sku = "a" or @sku = "b"]',
+    '//item[@price > 50]',
+    '//item[position() mod 2 = 0]',
+    '//item[count(tag) > 1]/@sku',
+    '//item[not(tag)]',
+    'sum(//item/@price)',
+    'count(//item[@price > 10 and @price < 90])',
+    '//item[tag = "red"][last()]',
+    '/catalog/section[2]/item[3]',
+)
+
+NUMBER = 50
+REPEAT = 5
+
+def document():
+    sections = []
+    for s in range(10):
+        items = []
+        for i in range(50):
+            tags = ''.join(['<tag>' + c + '</tag>' for c in ('red', 'green', 'blue')[:i % 4]])
+            items.append('<item sku="' + 'abcd'[i % 4] + '" price="' + str((s * 50 + i) % 100) + '">' + tags + '</item>')
+        sections.append('<section>' + ''.join(items) + '</section>')
+    doc = Document()
+    doc.parse('<catalog>' + ''.join(sections) + '</catalog>')
+    return doc
+
+def best(f):
+    return min(timeit.repeat(f, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+def main():
+    doc = document()
+    width = max([len(e) for e in EXPRESSIONS])
+    print(' ' * width + ''.join([(b + ' (us)').rjust(18) for b in xpath.CompiledExpression.BACKENDS]))
+    totals = [0] * len(xpath.CompiledExpression.BACKENDS)
+    for expr in EXPRESSIONS:
+        compiled = [xpath.compile(expr, backend=b) for b in xpath.CompiledExpression.BACKENDS]
+        for c in compiled:
+            c.evaluate(doc)
+        times = [best(lambda: c.evaluate(doc)) for c in compiled]
+        totals = [a + b for a, b in zip(totals, times)]
+        print(expr.ljust(width) + ''.join([format(t * 1e6, '18.1f') for t in times]))
+    print('total'.ljust(width) + ''.join([format(t * 1e6, '18.1f') for t in totals]))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Time evaluating relative XPath expressions for many context nodes. Run from
+the root of the source tree:
+
+    PYTHONPATH=src python benchmarks/evaluate_many.py
+
+Each expression is evaluated for every record of a document with
+Node.xpath, with a compiled expression in a loop and with
+CompiledExpression.evaluate_many; the best time of a few rounds is
+reported.
+'''
+
+import sys
+import timeit
+
+from expatriate import Document
+from expatriate import xpath
+
+EXPRESSIONS = (
+    'field/@v',
+    '../@id',
+    'field[@v = "x"]',
+    'field[@v > 100]/@v',
+    'other[../field]',
+)
+
+NUMBER = 5
+REPEAT = 5
+
+def document():
+    records = ['<record><field v="' + str(i) + '"/><field v="x"/><other/></record>' for i in range(2000)]
+    doc = Document()
+    doc.parse('<batch id="b">' + ''.join(records) + '</batch>')
+    return doc
+
+def best(f):
+    return min(timeit.repeat(f, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+def main():
+    doc = document()
+    records = doc.xpath('//record')
+    width = max([len(e) for e in EXPRESSIONS])
+    print(' ' * width + '  Node.xpath (ms)  evaluate (ms)  evaluate_many (ms)')
+    for expr in EXPRESSIONS:
+        compiled = xpath.compile(expr)
+        times = [
+            best(lambda: [r.xpath(expr) for r in records]),
+            best(lambda: [compiled.evaluate(r) for r in records]),
+            best(lambda: compiled.evaluate_many(records)),
+        ]
+        print(expr.ljust(width) + format(times[0] * 1e3, '17.1f')
+            + format(times[1] * 1e3, '15.1f') + format(times[2] * 1e3, '20.1f'))
+
+if __name__ == '__main__':
+    sys.exit(main())
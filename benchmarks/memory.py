@@ -0,0 +1,81 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Measure the memory used by each kind of node. Run from the root of the
+source tree:
+
+    PYTHONPATH=src python benchmarks/memory.py
+
+Many nodes of each kind are created under an element of a document, with
+tracemalloc counting the bytes allocated for them, including what each
+node owns such as an element's children list and attributes dict. The
+bytes per node of a parsed document as a whole are reported too, for both
+a Document and a CompactDocument.
+'''
+
+import sys
+import tracemalloc
+
+from expatriate import *
+
+NODES = 20000
+
+KINDS = (
+    ('Element', lambda parent: Element('item', parent=parent)),
+    ('Element with 2 attributes', lambda parent: Element('item', {'a': '1', 'b': '2'}, parent=parent)),
+    ('Attribute', lambda parent: Attribute('a', '1', parent=parent)),
+    ('CharacterData', lambda parent: CharacterData('text', parent=parent)),
+    ('Comment', lambda parent: Comment('comment', parent=parent)),
+    ('ProcessingInstruction', lambda parent: ProcessingInstruction('target', 'data', parent=parent)),
+    ('Namespace', lambda parent: Namespace('p', 'http://example.com/p', parent=parent)),
+)
+
+def measure(create):
+    # bytes allocated per node by create, not counting the list holding them
+    doc = Document()
+    doc.parse('<root/>')
+    nodes = [None] * NODES
+    tracemalloc.start()
+    for i in range(NODES):
+        nodes[i] = create(doc.root_element)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / NODES
+
+def measure_document(document_class):
+    xml = '<root xmlns:p="http://example.com/p">' \
+        + '<p:item id="1" kind="a"><name>text</name><!-- comment --></p:item>' * (NODES // 4) \
+        + '</root>'
+    tracemalloc.start()
+    doc = document_class()
+    doc.parse(xml)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / (doc.root_element.get_node_count() + 1)
+
+def main():
+    width = max([len(k) for k, c in KINDS])
+    print('node'.ljust(width) + '  bytes per node')
+    for kind, create in KINDS:
+        print(kind.ljust(width) + format(measure(create), '16.0f'))
+    for document_class in (Document, CompactDocument):
+        print(('parsed ' + document_class.__name__).ljust(width)
+            + format(measure_document(document_class), '16.0f'))
+
+if __name__ == '__main__':
+    sys.exit(main())
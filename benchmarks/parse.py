@@ -0,0 +1,101 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Time parsing XPath expressions. Run from the root of the source tree:
+
+    PYTHONPATH=src python benchmarks/parse.py
+
+Each expression is parsed into its syntax tree on its own, then compiled
+without and with the optimizer, and the best time of a few rounds is
+reported for each, so checking out another revision and running this
+again compares the two. Revisions from before the parser module time the
+expression's own tokenizing and parsing instead, and those from before
+compiled expressions time only the tokenizer; columns a revision has
+nothing for are left blank.
+'''
+
+import sys
+import timeit
+
+from expatriate import *
+from expatriate import xpath
+
+try:
+    from expatriate.xpath import parser
+except ImportError:
+    parser = None
+
+EXPRESSIONS = (
+    'para',
+    '//para',
+    '/doc/chapter[5]/section[2]',
+    'child::para[position()=1]',
+    '//para[@type="warning"]/text()',
+    'employee[@secretary and @assistant]',
+    'count(//item) > 3',
+    'concat(name(.), ":", string(@id))',
+    '//item[@sku = "a" or @sku = "b"][last()]',
+    '1 + 2 * 3 - 4 div 5',
+)
+
+# widths of the columns after the expression
+WIDTHS = ('12.1f', '30.1f', '14.1f')
+
+NUMBER = 2000
+REPEAT = 5
+
+def best(f):
+    return min(timeit.repeat(f, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+def parse_function():
+    if parser is not None:
+        return parser.parse
+    if hasattr(xpath, 'CompiledExpression'):
+        ce = xpath.CompiledExpression('1')
+        return lambda expr: ce._parse(xpath.CompiledExpression.tokenize(expr))
+    # Node.xpath tokenized and parsed in one go; only the tokenizer stands alone
+    return Document()._tokenize
+
+def compile_functions():
+    if not hasattr(xpath, 'CompiledExpression'):
+        return None, None
+    try:
+        xpath.CompiledExpression('1', optimize=False)
+    except TypeError:
+        # nothing to switch off before the optimizer
+        return None, xpath.CompiledExpression
+    return lambda expr: xpath.CompiledExpression(expr, optimize=False), xpath.CompiledExpression
+
+def column(t, w):
+    if t is None:
+        return ''.rjust(int(w.split('.')[0]))
+    return format(t * 1e6, w)
+
+def main():
+    functions = (parse_function(),) + compile_functions()
+    width = max([len(e) for e in EXPRESSIONS])
+    print(' ' * width + '  parse (us)  compile, no optimizer (us)  compile (us)')
+    totals = [0, 0, 0]
+    for expr in EXPRESSIONS:
+        times = [None if f is None else best(lambda: f(expr)) for f in functions]
+        totals = [None if b is None else a + b for a, b in zip(totals, times)]
+        print(expr.ljust(width) + ''.join([column(t, w) for t, w in zip(times, WIDTHS)]).rstrip())
+    print('total'.ljust(width) + ''.join([column(t, w) for t, w in zip(totals, WIDTHS)]).rstrip())
+
+if __name__ == '__main__':
+    sys.exit(main())
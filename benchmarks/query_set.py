@@ -0,0 +1,76 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Time evaluating a rule pack of XPath expressions against one document. Run
+from the root of the source tree:
+
+    PYTHONPATH=src python benchmarks/query_set.py
+
+The rules are evaluated together with expatriate.xpath.QuerySet and one by
+one with their compiled expressions; the best time of a few rounds is
+reported.
+'''
+
+import sys
+import timeit
+
+from expatriate import Document
+from expatriate import xpath
+
+NAMES = ['field' + str(i) for i in range(50)]
+
+def rules():
+    exprs = []
+    for name in NAMES:
+        exprs.extend([
+            '//record/' + name,
+            '//record/' + name + '[@v = "3"]',
+            '/batch/record[@kind = "b"]/' + name + '/@v',
+            '//' + name + '[@v > 5]',
+            'count(//record[' + name + '])',
+            '//record[@kind = "a"]/' + name + ' | //record[@kind = "c"]/' + name,
+        ])
+    return exprs
+
+def document():
+    records = []
+    for r in range(200):
+        fields = ''.join(['<' + name + ' v="' + str((r + i) % 10) + '"/>'
+            for i, name in enumerate(NAMES) if (r + i) % 3 == 0])
+        records.append('<record kind="' + 'abc'[r % 3] + '">' + fields + '</record>')
+    doc = Document()
+    doc.parse('<batch>' + ''.join(records) + '</batch>')
+    return doc
+
+def main():
+    doc = document()
+    exprs = rules()
+    query_set = xpath.QuerySet(exprs)
+    compiled = [xpath.compile(e) for e in exprs]
+
+    def one_by_one():
+        return [c.evaluate(doc) for c in compiled]
+
+    together = min(timeit.repeat(lambda: query_set.evaluate(doc), number=1, repeat=5))
+    separately = min(timeit.repeat(one_by_one, number=1, repeat=5))
+    print(str(len(exprs)) + ' expressions')
+    print('QuerySet     ' + format(together * 1e3, '10.1f') + ' ms')
+    print('one by one   ' + format(separately * 1e3, '10.1f') + ' ms')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,6 +19,7 @@ import logging
 
 from .exceptions import *
 from .Node import Node
+from .SymbolTable import SymbolTable
 from .xpath.Literal import Literal
 
 logger = logging.getLogger(__name__)
@@ -37,14 +38,31 @@ class Attribute(Node):
     :param namespace: The namespace of this Attribute. Must be defined if the prefix is not defined by the parent Nodes
     :type namespace: str or None
     '''
+    __slots__ = ('_prefix', '_local_name', '_namespace', '_name', '_expanded_name', '_value')
+
     def __init__(self, local_name, value, parent=None, prefix=None, namespace=None):
         super().__init__(parent=parent)
 
         self._prefix = prefix
         self._local_name = local_name
         self._namespace = namespace
+        self._intern_names()
+
+        self._value = value
+
+    @property
+    def value(self):
+        """
+        The value of this Attribute.
+
+        :type: str
+        """
+        return self._value
 
-        self.value = value
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._mutated()
 
     @property
     def name(self):
@@ -55,20 +73,18 @@ class Attribute(Node):
         :setter: Sets the name. Updates the prefix and namespace and local_name if they change.
         :type: str
         """
-        if self._prefix is None:
-            return self._local_name
-        else:
-            return self._prefix + ':' + self._local_name
+        return self._name
 
     @name.setter
     def name(self, name):
         if ':' in name:
-            self._prefix, colon, self._name = name.partition(':')
+            self._prefix, colon, self._local_name = name.partition(':')
         else:
             self._prefix = None
-            self._name = name
+            self._local_name = name
 
         self._namespace = self.prefix_to_namespace(self._prefix)
+        self._intern_names()
 
     @property
     def local_name(self):
@@ -84,6 +100,7 @@ class Attribute(Node):
     @local_name.setter
     def local_name(self, local_name):
         self._local_name = local_name
+        self._intern_names()
 
     @property
     def prefix(self):
@@ -100,6 +117,7 @@ class Attribute(Node):
     def prefix(self, prefix):
         self._prefix = prefix
         self._namespace = self.prefix_to_namespace(self._prefix)
+        self._intern_names()
 
     @property
     def namespace(self):
@@ -116,6 +134,7 @@ class Attribute(Node):
     def namespace(self, namespace):
         self._namespace = namespace
         self._prefix = self.namespace_to_prefix(namespace)
+        self._intern_names()
 
     def get_type(self):
         '''
@@ -139,7 +158,22 @@ class Attribute(Node):
 
         :rtype: tuple(namespace str, local_name str)
         '''
-        return (self.namespace, self.local_name)
+        return self._expanded_name
+
+    def _intern_names(self):
+        # share the document's copy of each name, when the parent element is
+        # in one, and cache the qualified and expanded names
+        scope = getattr(self._parent, '_scope', None)
+        symbols = None if scope is None else scope.symbols
+        if symbols is None:
+            self._name = SymbolTable.qualify(self._prefix, self._local_name)
+            self._expanded_name = (self._namespace, self._local_name)
+        else:
+            self._prefix = symbols.intern(self._prefix)
+            self._local_name = symbols.intern(self._local_name)
+            self._namespace = symbols.intern(self._namespace)
+            self._name = symbols.qualified_name(self._prefix, self._local_name)
+            self._expanded_name = symbols.expanded_name(self._namespace, self._local_name)
 
     def __eq__(self, other):
         if isinstance(other, Literal):
@@ -156,18 +190,3 @@ class Attribute(Node):
             s += self.namespace + ':'
         s += self.local_name + '=' + self.value
         return s
-
-    def get_document_order(self):
-        '''
-        Get the index of this Node's order in the enclosing Document.
-
-        :rtype: int
-        :raises UnattachedElementException: if the Node is not attached to a Document
-        '''
-        if self._parent is None:
-            raise UnattachedElementException('Attribute ' + str(self) + ' is not attached to a document')
-
-        do = self._parent.get_document_order()
-        do += len(self._parent.namespace_nodes)
-        ordered_attr = [self._parent.attribute_nodes[k] for k in sorted(self._parent.attribute_nodes.keys())]
-        return do + ordered_attr.index(self)
@@ -0,0 +1,211 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+import logging
+import math
+
+from .Element import Element
+from .Parent import Parent
+from .xpath.Function import Function
+from . import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class AttributeIndex(object):
+    '''
+    Index of the elements of a Document by the value of one of their
+    attributes. Values are hashed for equality lookups and their numeric
+    values are kept in a sorted array for range lookups. Indexes are created
+    with :py:meth:`expatriate.Document.create_index` and kept up to date as
+    the Document changes.
+
+    :param str local_name: The local name of the indexed attribute
+    :param namespace: The namespace of the indexed attribute, or None to index the attribute in any namespace
+    :type namespace: str or None
+    '''
+    COMPARISONS = {
+        '=': (bisect.bisect_left, bisect.bisect_right),
+        '<': (None, bisect.bisect_left),
+        '<=': (None, bisect.bisect_right),
+        '>': (bisect.bisect_right, None),
+        '>=': (bisect.bisect_left, None),
+    }
+    ''' bisect functions finding the low & high bounds of each comparison '''
+
+    def __init__(self, local_name, namespace=None):
+        self._local_name = local_name
+        self._namespace = namespace
+
+        # element id -> (element, values of its indexed attributes)
+        self._entries = {}
+        # value -> elements with an indexed attribute of that value
+        self._by_value = {}
+        # numeric values & their elements, sorted; built when needed
+        self._numbers = None
+
+    @property
+    def local_name(self):
+        """
+        The local name of the indexed attribute. Read-only.
+
+        :getter: Returns the local name.
+        :type: str
+        """
+        return self._local_name
+
+    @property
+    def namespace(self):
+        """
+        The namespace of the indexed attribute. Read-only.
+
+        :getter: Returns the namespace URI, or None if any namespace is indexed.
+        :type: str or None
+        """
+        return self._namespace
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, n):
+        '''
+        Index the elements of the subtree rooted at *n*.
+
+        :param expatriate.Node n: The root of the subtree
+        '''
+        if isinstance(n, Element):
+            self._add_element(n)
+        if isinstance(n, Parent):
+            for c in n.children:
+                self.add(c)
+
+    def remove(self, n):
+        '''
+        Remove the elements of the subtree rooted at *n* from the index.
+
+        :param expatriate.Node n: The root of the subtree
+        '''
+        if isinstance(n, Element):
+            self._remove_element(n)
+        if isinstance(n, Parent):
+            for c in n.children:
+                self.remove(c)
+
+    def update(self, el):
+        '''
+        Re-index *el* after its attributes have changed. Its children are not
+        affected.
+
+        :param expatriate.Element el: The changed element
+        '''
+        self._add_element(el)
+
+    def _add_element(self, el):
+        self._remove_element(el)
+
+        # matched against the attribute names, so that the attribute nodes
+        # aren't created just to be indexed
+        values = []
+        for k, v in el.attributes.items():
+            prefix, colon, local_name = k.rpartition(':')
+            if local_name != self._local_name:
+                continue
+            if self._namespace is not None and (
+                colon == '' or el.prefix_to_namespace(prefix) != self._namespace
+            ):
+                continue
+            values.append(v)
+        if len(values) == 0:
+            return
+
+        self._entries[id(el)] = (el, values)
+        for v in set(values):
+            try:
+                self._by_value[v].append(el)
+            except KeyError:
+                self._by_value[v] = [el]
+        self._numbers = None
+
+    def _remove_element(self, el):
+        entry = self._entries.pop(id(el), None)
+        if entry is None:
+            return
+
+        for v in set(entry[1]):
+            els = self._by_value[v]
+            for i, e in enumerate(els):
+                if e is el:
+                    del els[i]
+                    break
+            if len(els) == 0:
+                del self._by_value[v]
+        self._numbers = None
+
+    def equal(self, value):
+        '''
+        Find the elements with an indexed attribute equal to *value*.
+
+        :param str value: The value to match
+        :rtype: list[expatriate.Element] in no particular order
+        '''
+        return self._by_value.get(value, [])
+
+    def compare(self, op, number):
+        '''
+        Find the elements with an indexed attribute whose numeric value
+        compares to *number* as *op* does. Values that aren't numbers never
+        match.
+
+        :param str op: One of =, <, <=, > or >=
+        :param number: The number to compare to
+        :type number: int or float
+        :rtype: list[expatriate.Element] in no particular order
+        '''
+        if math.isnan(number):
+            return []
+
+        if self._numbers is None:
+            self._build_numbers()
+        keys, els = self._numbers
+
+        lo_f, hi_f = AttributeIndex.COMPARISONS[op]
+        lo = 0 if lo_f is None else lo_f(keys, number)
+        hi = len(keys) if hi_f is None else hi_f(keys, number)
+
+        # an element may be in range for more than one of its values
+        found = {}
+        for el in els[lo:hi]:
+            found[id(el)] = el
+        return list(found.values())
+
+    def _build_numbers(self):
+        pairs = []
+        for el, values in self._entries.values():
+            for v in values:
+                x = Function._string_to_number(v)
+                if not math.isnan(x):
+                    pairs.append((x, el))
+        pairs.sort(key=lambda p: p[0])
+        self._numbers = ([p[0] for p in pairs], [p[1] for p in pairs])
+
+        if tracing.enabled:
+            logger.debug('Sorted ' + str(len(pairs)) + ' numeric values of ' + str(self))
+
+    def __str__(self):
+        return self.__class__.__name__ + ' ' + hex(id(self)) + ' ' \
+            + str((self._namespace, self._local_name))
@@ -31,12 +31,28 @@ class CharacterData(Node):
     :param parent: The node to use as the parent to this node
     :type parent: expatriate.Parent or None
     '''
+    __slots__ = ('_data', 'cdata_block')
+
     def __init__(self, data, cdata_block=False, parent=None):
         super().__init__(parent=parent)
 
-        self.data = data
+        self._data = data
         self.cdata_block = cdata_block
 
+    @property
+    def data(self):
+        """
+        The contents of this CharacterData
+
+        :type: str
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._mutated()
+
     def produce(self):
         '''
         Produce an XML str (not encoded) from the contents of this
@@ -30,10 +30,26 @@ class Comment(Node):
     :param parent: The node to use as the parent to this node
     :type parent: expatriate.Parent or None
     '''
+    __slots__ = ('_data',)
+
     def __init__(self, data, parent=None):
         super().__init__(parent=parent)
 
-        self.data = data
+        self._data = data
+
+    @property
+    def data(self):
+        """
+        The contents of this Comment
+
+        :type: str
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._mutated()
 
     def produce(self):
         '''
@@ -0,0 +1,70 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CompactChildren(Sequence):
+    '''
+    The children of a node in a :py:class:`.CompactDocument`, as a read-only
+    sequence. The child nodes are created as they're asked for, so taking the
+    length of the children or iterating over part of them doesn't create the
+    rest.
+
+    :param expatriate.CompactDocument document: The document holding the nodes
+    :param list[int] indexes: The index of each child within the document's arrays
+    '''
+    __slots__ = ('_document', '_indexes')
+
+    def __init__(self, document, indexes):
+        self._document = document
+        self._indexes = indexes
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._document._node(i) for i in self._indexes[key]]
+        return self._document._node(self._indexes[key])
+
+    def __iter__(self):
+        node = self._document._node
+        for i in self._indexes:
+            yield node(i)
+
+    def __contains__(self, node):
+        return self._document._index_of(node) in self._indexes
+
+    def index(self, node, *args):
+        '''
+        Get the position of *node* among the children.
+
+        :param expatriate.Node node: The child to look for
+        :rtype: int
+        :raises ValueError: if *node* isn't one of the children
+        '''
+        i = self._document._index_of(node)
+        if i is None:
+            raise ValueError(str(node) + ' is not a child')
+        return self._indexes.index(i, *args)
+
+    def __str__(self):
+        return 'CompactChildren ' + hex(id(self)) + ' of ' + str(len(self._indexes)) + ' nodes'
@@ -0,0 +1,422 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+import logging
+import weakref
+from array import array
+
+from .CharacterData import CharacterData
+from .Comment import Comment
+from .CompactElement import CompactElement
+from .Document import Document
+from .Element import Element
+from .exceptions import *
+from .NamespaceScope import NamespaceScope
+from .Node import Node
+from .ProcessingInstruction import ProcessingInstruction
+from . import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CompactDocument(Document):
+    '''
+    A read-only XML document for documents too large to hold as a tree of
+    node objects. The parser fills parallel arrays instead, one entry per
+    node: its kind, parent, first child and next sibling, its name as a
+    :py:class:`.SymbolTable` id and the offset of its text in one text
+    buffer. Nodes are created from the arrays when user code (or an XPath
+    expression) reaches them, and are dropped again when nothing refers to
+    them. :py:meth:`produce` and string values are built from the arrays
+    without creating nodes at all.
+
+    The children and attributes of the nodes can't be changed, and changes
+    to other properties of a node aren't kept once it's dropped. Descendant
+    queries don't use a :py:class:`.StructureIndex`, which would hold every
+    element.
+
+    :param encoding: The encoding to use for this Document
+    :type encoding: str or None
+    :param bool skip_whitespace: True if the parser should skip unnecessary whitespace
+    :param int result_cache_size: The number of XPath results to keep in a :py:class:`.xpath.ResultCache`; 0 disables the cache
+    '''
+    ELEMENT = 0
+    TEXT = 1
+    CDATA = 2
+    COMMENT = 3
+    PROCESSING_INSTRUCTION = 4
+
+    _BLOCK_PARTS = 4096
+    ''' Number of parts appended to the text buffer that are joined into a block at a time '''
+
+    def __init__(self, encoding=None, skip_whitespace=True, result_cache_size=256):
+        super().__init__(encoding=encoding, skip_whitespace=skip_whitespace,
+            structure_index=False, result_cache_size=result_cache_size)
+
+        # one entry per node, in document order. _names holds the symbol id
+        # of an element's name or a processing instruction's target. For an
+        # element _offsets & _lengths are the range of its attributes in the
+        # attribute arrays; for other nodes, the range of their text (or
+        # data) in the text buffer
+        self._kinds = array('B')
+        self._parents = array('i')
+        self._first_children = array('i')
+        self._next_siblings = array('i')
+        self._names = array('i')
+        self._orders = array('q')
+        self._offsets = array('q')
+        self._lengths = array('i')
+
+        # one entry per attribute: its name's symbol id and the range of its
+        # value in the text buffer
+        self._attribute_names = array('i')
+        self._attribute_offsets = array('q')
+        self._attribute_lengths = array('i')
+
+        # the text buffer is kept as a few large blocks; parts appended while
+        # parsing are joined into a new block every _BLOCK_PARTS parts or
+        # when some text is asked for
+        self._blocks = []
+        self._block_starts = []
+        self._buffer_parts = []
+        self._buffer_length = 0
+
+        # the nodes created from the arrays that are still referred to
+        self._nodes = weakref.WeakValueDictionary()
+
+        # parse state: the last child of each open element (and the
+        # document), the namespace scope of each and the elements within
+        # xml:space="preserve"
+        self._last_children = [-1]
+        self._scopes = [self._scope]
+        self._preserving = set()
+
+    def close(self):
+        '''
+        Signal the end of the document to the parser.
+
+        :raises ValueError: if there are elements that have not been closed
+        '''
+        if len(self._stack) > 0:
+            raise ValueError('Document ended with unclosed elements: '
+                + ', '.join([self._symbols.symbol(self._names[i]) for i in self._stack]))
+
+        self._mutations += 1
+        self._parser.Parse(b'', True)
+        self._flush_text()
+        self._join_buffer()
+
+    def _append(self, kind, name, offset, length, span):
+        # add a node to the arrays as the next child of the open element
+        i = len(self._kinds)
+        if len(self._stack) == 0:
+            parent = -1
+        else:
+            parent = self._stack[-1]
+
+        self._kinds.append(kind)
+        self._parents.append(parent)
+        self._first_children.append(-1)
+        self._next_siblings.append(-1)
+        self._names.append(name)
+        self._offsets.append(offset)
+        self._lengths.append(length)
+        self._orders.append(self._next_order)
+        self._next_order += Node._ORDER_GAP * span
+
+        prev = self._last_children[-1]
+        if prev >= 0:
+            self._next_siblings[prev] = i
+        elif parent >= 0:
+            self._first_children[parent] = i
+        self._last_children[-1] = i
+
+        if parent < 0:
+            # the document holds on to its own children
+            node = self._create_node(i, self)
+            self._nodes[i] = node
+            self.children.append(node)
+            if kind == CompactDocument.ELEMENT:
+                self.root_element = node
+
+        return i
+
+    def _append_text(self, s):
+        # add s to the text buffer & return its offset
+        offset = self._buffer_length
+        self._buffer_parts.append(s)
+        self._buffer_length += len(s)
+        if len(self._buffer_parts) >= CompactDocument._BLOCK_PARTS:
+            self._join_buffer()
+        return offset
+
+    def _join_buffer(self):
+        if len(self._buffer_parts) == 0:
+            return
+        self._block_starts.append(self._buffer_length - sum([len(s) for s in self._buffer_parts]))
+        self._blocks.append(''.join(self._buffer_parts))
+        self._buffer_parts.clear()
+
+    def _text_at(self, offset, length):
+        # the text at offset in the text buffer; each part appended lies
+        # within a single block
+        if len(self._buffer_parts) > 0:
+            self._join_buffer()
+        b = bisect.bisect_right(self._block_starts, offset) - 1
+        start = offset - self._block_starts[b]
+        return self._blocks[b][start:start + length]
+
+    def _check_prefix(self, scope, name):
+        # the same check an Element makes of its names
+        if ':' in name:
+            prefix = name.partition(':')[0]
+            if prefix != 'xmlns' and prefix not in scope._prefixes:
+                raise UnknownPrefixException('Unknown prefix: ' + prefix)
+
+    def _start_element_handler(self, name, attributes):
+        if tracing.enabled:
+            logger.debug('_start_element_handler elname: ' + str(name) + ' attributes: ' + str(attributes))
+        self._flush_text()
+
+        scope = self._scopes[-1].derive(NamespaceScope.declarations(attributes))
+        self._check_prefix(scope, name)
+
+        offset = len(self._attribute_names)
+        for k, v in attributes.items():
+            self._check_prefix(scope, k)
+            self._attribute_names.append(self._symbols.symbol_id(k))
+            self._attribute_offsets.append(self._append_text(v))
+            self._attribute_lengths.append(len(v))
+
+        i = self._append(CompactDocument.ELEMENT, self._symbols.symbol_id(name),
+            offset, len(attributes), 1 + len(scope) + len(attributes))
+
+        for k, v in attributes.items():
+            if Element.is_id_attribute(k):
+                self._add_id(v, i)
+
+        # check for whitespace preservation
+        if 'xml:space' in attributes and attributes['xml:space'] == 'preserve':
+            self._in_space_preserve = True
+            self._preserving.add(i)
+
+        self._stack.append(i)
+        self._last_children.append(-1)
+        self._scopes.append(scope)
+
+        if self._events is not None and 'start' in self._event_types:
+            self._add_event('start', self._node(i))
+
+    def _end_element_handler(self, name):
+        if tracing.enabled:
+            logger.debug('_end_element_handler name: ' + str(name))
+        self._flush_text()
+        i = self._stack.pop()
+        self._last_children.pop()
+        self._scopes.pop()
+
+        if i in self._preserving:
+            self._preserving.remove(i)
+            self._in_space_preserve = False
+
+        if self._events is not None and 'end' in self._event_types:
+            self._add_event('end', self._node(i))
+
+    def _processing_instruction_handler(self, target, data):
+        if tracing.enabled:
+            logger.debug('_processing_instruction_handler target: ' + str(target) + ' data: ' + str(data))
+        self._flush_text()
+        self._append(CompactDocument.PROCESSING_INSTRUCTION, self._symbols.symbol_id(target),
+            self._append_text(data), len(data), 1)
+
+    def _append_character_data(self, data):
+        if self._in_cdata:
+            kind = CompactDocument.CDATA
+        else:
+            kind = CompactDocument.TEXT
+        self._append(kind, -1, self._append_text(data), len(data), 1)
+
+    def _comment_handler(self, data):
+        if tracing.enabled:
+            logger.debug('_comment_handler data: ' + str(data))
+        self._flush_text()
+        self._append(CompactDocument.COMMENT, -1, self._append_text(data), len(data), 1)
+
+    def _add_id(self, id_, i):
+        # ids are nearly always unique, so a lone index isn't put in a list
+        indexes = self._ids.setdefault(id_, i)
+        if indexes is i:
+            return
+        if isinstance(indexes, int):
+            self._ids[id_] = [indexes, i]
+        else:
+            indexes.append(i)
+
+    def _find_id_within(self, ref, node):
+        indexes = self._ids.get(ref)
+        if indexes is None:
+            return None
+        if isinstance(indexes, int):
+            indexes = [indexes]
+
+        # the indexes are already in document order
+        if node is self:
+            return self._node(indexes[0])
+        for i in indexes:
+            el = self._node(i)
+            n = el
+            while n is not None:
+                if n is node:
+                    return el
+                n = n._parent
+        return None
+
+    def _node(self, i):
+        # the node at index i, creating it and any of its ancestors that
+        # nothing refers to any more
+        node = self._nodes.get(i)
+        if node is not None:
+            return node
+
+        missing = []
+        while True:
+            missing.append(i)
+            p = self._parents[i]
+            if p < 0:
+                parent = self
+                break
+            parent = self._nodes.get(p)
+            if parent is not None:
+                break
+            i = p
+
+        for i in reversed(missing):
+            parent = self._create_node(i, parent)
+            self._nodes[i] = parent
+        return parent
+
+    def _create_node(self, i, parent):
+        kind = self._kinds[i]
+        if kind == CompactDocument.ELEMENT:
+            return CompactElement(self, i, parent)
+
+        data = self._text_at(self._offsets[i], self._lengths[i])
+        if kind == CompactDocument.TEXT:
+            node = CharacterData(data, parent=parent)
+        elif kind == CompactDocument.CDATA:
+            node = CharacterData(data, cdata_block=True, parent=parent)
+        elif kind == CompactDocument.COMMENT:
+            node = Comment(data, parent=parent)
+        else:
+            node = ProcessingInstruction(self._symbols.symbol(self._names[i]), data, parent=parent)
+        node._order = self._orders[i]
+        return node
+
+    def _index_of(self, node):
+        # the index of node within the arrays, or None if it isn't there
+        if isinstance(node, CompactElement):
+            if node._document is self:
+                return node._index
+            return None
+
+        key = getattr(node, '_order', None)
+        if key is None:
+            return None
+        i = bisect.bisect_left(self._orders, key)
+        if i < len(self._orders) and self._orders[i] == key and self._nodes.get(i) is node:
+            return i
+        return None
+
+    def _child_indexes(self, i):
+        indexes = []
+        c = self._first_children[i]
+        while c >= 0:
+            indexes.append(c)
+            c = self._next_siblings[c]
+        return indexes
+
+    def _subtree_end(self, i):
+        # the index following the last of i's descendants
+        while i >= 0:
+            n = self._next_siblings[i]
+            if n >= 0:
+                return n
+            i = self._parents[i]
+        return len(self._kinds)
+
+    def _attributes_of(self, i):
+        attributes = {}
+        start = self._offsets[i]
+        for a in range(start, start + self._lengths[i]):
+            attributes[self._symbols.symbol(self._attribute_names[a])] = \
+                self._text_at(self._attribute_offsets[a], self._attribute_lengths[a])
+        return attributes
+
+    def _string_value(self, i):
+        # the text of the text nodes within i, as Element.get_string_value
+        kinds = self._kinds
+        parts = []
+        for j in range(i, self._subtree_end(i)):
+            if kinds[j] == CompactDocument.TEXT or kinds[j] == CompactDocument.CDATA:
+                parts.append(self._text_at(self._offsets[j], self._lengths[j]))
+        return ''.join(parts)
+
+    def _produce(self, i):
+        # the xml of the subtree at i, as produced by its nodes
+        kinds = self._kinds
+        parents = self._parents
+        names = self._names
+        offsets = self._offsets
+        lengths = self._lengths
+        symbols = self._symbols._by_id
+        text_at = self._text_at
+        escape = self.escape
+        parts = []
+        open_ = []
+        for j in range(i, self._subtree_end(i)):
+            while len(open_) > 0 and open_[-1] != parents[j]:
+                parts.append('</' + symbols[names[open_.pop()]] + '>')
+
+            kind = kinds[j]
+            if kind == CompactDocument.ELEMENT:
+                parts.append('<' + symbols[names[j]])
+                start = offsets[j]
+                for a in range(start, start + lengths[j]):
+                    v = text_at(self._attribute_offsets[a], self._attribute_lengths[a])
+                    parts.append(' ' + escape(symbols[self._attribute_names[a]]) + '="'
+                        + escape(v).replace('"', '&quot;') + '"')
+                if self._first_children[j] < 0:
+                    parts.append('/>')
+                else:
+                    parts.append('>')
+                    open_.append(j)
+                continue
+
+            data = text_at(offsets[j], lengths[j])
+            if kind == CompactDocument.TEXT:
+                parts.append(escape(data))
+            elif kind == CompactDocument.CDATA:
+                parts.append('<![CDATA[' + data.replace(']]>', ']]&gt;') + ']]>')
+            elif kind == CompactDocument.COMMENT:
+                parts.append('<!--' + data + '-->')
+            else:
+                parts.append('<?' + symbols[names[j]] + ' ' + data + '?>')
+
+        while len(open_) > 0:
+            parts.append('</' + symbols[names[open_.pop()]] + '>')
+        return ''.join(parts)
@@ -0,0 +1,107 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from types import MappingProxyType
+
+from .CompactChildren import CompactChildren
+from .Element import Element
+from . import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CompactElement(Element):
+    '''
+    An Element of a :py:class:`.CompactDocument`, created on demand from the
+    document's arrays. Its children and attributes are read-only, and the
+    element holds no references to its children, so only the nodes user
+    code holds on to (and their ancestors) stay in memory.
+
+    :param expatriate.CompactDocument document: The document holding the element
+    :param int index: The index of the element within the document's arrays
+    :param parent: The node to use as the parent to this node
+    :type parent: expatriate.CompactElement or expatriate.CompactDocument
+    '''
+    __slots__ = ('_document', '_index')
+
+    def __init__(self, document, index, parent):
+        # the content stays in the document's arrays, so there's nothing
+        # to publish or subscribe to as Element.__init__ would
+        self._parent = parent
+        self._order = document._orders[index]
+        self._document = document
+        self._index = index
+        self._attributes = MappingProxyType(document._attributes_of(index))
+
+        name = document._symbols.symbol(document._names[index])
+        if ':' in name:
+            self._prefix, colon, self._local_name = name.partition(':')
+        else:
+            self._prefix = None
+            self._local_name = name
+        self._namespace = None
+        self._name = name
+        self._expanded_name = (None, self._local_name)
+
+        self._init_namespaces()
+
+    @property
+    def children(self):
+        """
+        The children of this Element, created as they're asked for.
+        Read-only.
+
+        :type: expatriate.CompactChildren
+        """
+        return CompactChildren(self._document, self._document._child_indexes(self._index))
+
+    def get_document(self):
+        '''
+        Get this node's enclosing document.
+
+        :rtype: expatriate.CompactDocument
+        '''
+        return self._document
+
+    def get_string_value(self):
+        '''
+        Return the string value of the node
+
+        :rtype: str
+        '''
+        return self._document._string_value(self._index)
+
+    def produce(self):
+        '''
+        Produce an XML str (not encoded) from the contents of this
+        node
+
+        :rtype: str
+        '''
+        if tracing.enabled:
+            logger.debug(str(self) + ' producing xml from index ' + str(self._index))
+        return self._document._produce(self._index)
+
+    def _child_index(self, node):
+        return self.children.index(node)
+
+    def _last_order(self):
+        end = self._document._subtree_end(self._index)
+        if end - 1 == self._index:
+            return super()._last_order()
+        return self._document._node(end - 1)._last_order()
@@ -16,16 +16,22 @@
 # along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import os
 import re
 import xml.parsers.expat
 
+from .AttributeIndex import AttributeIndex
 from .CharacterData import CharacterData
 from .Comment import Comment
 from .Element import Element
 from .exceptions import *
+from .NamespaceScope import NamespaceScope
 from .Node import Node
 from .Parent import Parent
 from .ProcessingInstruction import ProcessingInstruction
+from .StructureIndex import StructureIndex
+from .SymbolTable import SymbolTable
+from . import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -37,8 +43,14 @@ class Document(Parent):
     :param encoding: The encoding to use for this Document
     :type encoding: str or None
     :param bool skip_whitespace: True if the parser should skip unnecessary whitespace
+    :param bool structure_index: True if descendant queries may use a :py:class:`.StructureIndex`
+    :param int result_cache_size: The number of XPath results to keep in a :py:class:`.xpath.ResultCache`; 0 disables the cache
     '''
-    def __init__(self, encoding=None, skip_whitespace=True):
+    _TEXT_BUFFER_SIZE = 65536
+    ''' Size of the buffer expat uses to merge character data '''
+
+    def __init__(self, encoding=None, skip_whitespace=True, structure_index=True,
+        result_cache_size=256):
         super().__init__()
         self.version = None
         self.encoding = encoding
@@ -46,11 +58,49 @@ class Document(Parent):
 
         self.root_element = None
 
-        self._parser = xml.parsers.expat.ParserCreate(encoding=encoding)
+        # elements by id attribute value
+        self._ids = {}
+
+        # AttributeIndexes created by the user, by expanded attribute name
+        self._attribute_indexes = {}
+
+        # elements by name; built on first use and dropped by tree mutation
+        self._use_structure_index = structure_index
+        self._structure_index = None
+
+        # bumped by every change to the tree; XPath results are only reused
+        # while it stays the same
+        self._mutations = 0
+        self._result_cache_size = result_cache_size
+        self._result_cache = None
+
+        # the document is first in order; nodes are labelled as they're parsed
+        self._order = 0
+        self._next_order = Node._ORDER_GAP
+
+        # names & namespace URIs, shared with expat's intern dict; elements
+        # reach it through the scope they derive from the document's
+        self._symbols = SymbolTable()
+        self._scope = NamespaceScope(symbols=self._symbols)
+
+        self._parser = xml.parsers.expat.ParserCreate(encoding=encoding,
+            intern=self._symbols._symbols)
         self._skip_whitespace = skip_whitespace
         self._in_space_preserve = False
         self._in_cdata = False
         self._stack = []
+        self._bytes_consumed = 0
+
+        # (event, Element) pairs collected for iterparse; None when not wanted
+        self._events = None
+        self._event_types = ()
+        self._event_tags = None
+
+        # have expat merge character data itself as far as its buffer allows;
+        # _text merges the rest up to the next structural event
+        self._parser.buffer_text = True
+        self._parser.buffer_size = Document._TEXT_BUFFER_SIZE
+        self._text = []
 
         self._parser.XmlDeclHandler = self._xml_decl_handler
         self._parser.StartElementHandler = self._start_element_handler
@@ -73,11 +123,7 @@ class Document(Parent):
         '''
         if len(nodeset) == 0:
             raise ValueError('Cannot determine the first node of an empty nodeset')
-        first = nodeset[0]
-        for n in nodeset[1:]:
-            if n.get_document_order() < first.get_document_order():
-                first = n
-        return first
+        return min(nodeset, key=lambda n: n.get_document_order())
 
     @staticmethod
     def is_nodeset(nodeset):
@@ -105,8 +151,9 @@ class Document(Parent):
         '''
         if not Document.is_nodeset(nodeset):
             raise TypeError('Cannot sort by document order without a nodeset')
-        for n in nodeset:
-            logger.info(str(n) + ' document order: ' + str(n.get_document_order()))
+        if tracing.enabled:
+            for n in nodeset:
+                logger.debug(str(n) + ' document order: ' + str(n.get_document_order()))
         return sorted(nodeset, key=lambda n: n.get_document_order(), reverse=reverse)
 
     def parse(self, data, isfinal=True):
@@ -116,21 +163,97 @@ class Document(Parent):
         :param str data: The str passed to the parsing library
         :param bool isfinal: The flag to the parsing library that no more data will be incoming
         '''
-        logger.debug('Parsing data: ' + str(data))
-        self._parser.Parse(data, isfinal)
+        if tracing.enabled:
+            logger.debug('Parsing data: ' + str(data))
+        self.feed(data)
+        if isfinal:
+            self.close()
+
+    def feed(self, chunk):
+        '''
+        Parse the next chunk of the document. The chunk doesn't need to end on
+        any particular boundary; the parser keeps whatever is incomplete. A
+        str chunk counts towards bytes_consumed by its length in characters.
+
+        :param chunk: The next piece of the document
+        :type chunk: bytes or bytearray or memoryview or str
+        '''
+        if isinstance(chunk, str):
+            # encoding it just to count the bytes would copy every chunk
+            self._bytes_consumed += len(chunk)
+        elif isinstance(chunk, memoryview):
+            self._bytes_consumed += chunk.nbytes
+        elif isinstance(chunk, (bytes, bytearray)):
+            self._bytes_consumed += len(chunk)
+        else:
+            raise TypeError('Chunks must be bytes, bytearray, memoryview or str; got: ' + chunk.__class__.__name__)
 
-        # TODO check that we're the only thing left on the stack when isfinal
+        self._mutations += 1
+        self._parser.Parse(chunk, False)
 
-    def parse_file(self, file_):
+    def close(self):
         '''
-        Parse (from a file object) into expatriate objects.
+        Signal the end of the document to the parser.
 
-        :param file file_: The file object (or file-like) passed to the parsing library
+        :raises ValueError: if there are elements that have not been closed
+        '''
+        # expat handles each complete end tag as it's fed, so anything still
+        # open now is never closed; check before expat reports it less clearly
+        if len(self._stack) > 0:
+            raise ValueError('Document ended with unclosed elements: '
+                + ', '.join([el.name for el in self._stack]))
+
+        self._mutations += 1
+        self._parser.Parse(b'', True)
+        self._flush_text()
+
+    @property
+    def bytes_consumed(self):
+        """
+        The number of bytes passed to the parser so far, counting str chunks
+        by their length in characters. Read-only.
+
+        :type: int
+        """
+        return self._bytes_consumed
+
+    def parse_file(self, file_, buffer_size=65536):
         '''
-        logger.debug('Parsing file: ' + str(file_))
-        self._parser.ParseFile(file_)
+        Parse (from a file object or path) into expatriate objects. The file
+        is read in blocks of *buffer_size* bytes.
 
-        # TODO check that we're the only thing left on the stack when isfinal
+        :param file_: The file object (or file-like) or the path of the file to parse
+        :type file_: file or str or os.PathLike
+        :param int buffer_size: The number of bytes to read at a time
+        :returns: The number of bytes parsed, or characters for a file opened in text mode
+        :rtype: int
+        '''
+        if tracing.enabled:
+            logger.debug('Parsing file: ' + str(file_))
+
+        if isinstance(file_, (str, bytes, os.PathLike)):
+            with open(file_, 'rb') as f:
+                return self.parse_file(f, buffer_size=buffer_size)
+
+        start = self._bytes_consumed
+        if hasattr(file_, 'readinto'):
+            # reuse one buffer for every block
+            buf = bytearray(buffer_size)
+            view = memoryview(buf)
+            while True:
+                n = file_.readinto(buf)
+                if not n:
+                    break
+                self.feed(view[:n])
+        else:
+            while True:
+                chunk = file_.read(buffer_size)
+                if not chunk:
+                    break
+                self.feed(chunk)
+        self.close()
+
+        return self._bytes_consumed - start
 
     def produce(self, xml_decl=True):
         '''
@@ -163,7 +286,8 @@ class Document(Parent):
         return s.encode(self.encoding)
 
     def _xml_decl_handler(self, version, encoding, standalone):
-        logger.debug('_xml_decl_handler version: ' + str(version) + ' encoding: ' + str(encoding) + ' standalone: ' + str(standalone))
+        if tracing.enabled:
+            logger.debug('_xml_decl_handler version: ' + str(version) + ' encoding: ' + str(encoding) + ' standalone: ' + str(standalone))
         self.version = float(version)
         self.encoding = encoding
         if standalone is None or standalone == -1:
@@ -175,7 +299,9 @@ class Document(Parent):
                 self.standalone = False
 
     def _start_element_handler(self, name, attributes):
-        logger.debug('_start_element_handler elname: ' + str(name) + ' attname: ' + str(name) + ' attributes: ' + str(attributes))
+        if tracing.enabled:
+            logger.debug('_start_element_handler elname: ' + str(name) + ' attname: ' + str(name) + ' attributes: ' + str(attributes))
+        self._flush_text()
 
         # check for whitespace preservation
         if 'xml:space' in attributes and attributes['xml:space'] == 'preserve':
@@ -183,6 +309,8 @@ class Document(Parent):
 
         if ':' in name:
             prefix, colon, local_name = name.partition(':')
+            prefix = self._symbols.intern(prefix)
+            local_name = self._symbols.intern(local_name)
         else:
             prefix = None
             local_name = name
@@ -194,11 +322,22 @@ class Document(Parent):
         else:
             el = Element(local_name, attributes, parent=self._stack[-1], prefix=prefix)
             self._stack[-1].children.append(el)
+        self._next_order = el._label_order(self._next_order, Node._ORDER_GAP)
+        self._structure_index = None
+        for id_ in el.get_ids():
+            self._add_id(id_, el)
+        for index in self._attribute_indexes.values():
+            index.add(el)
 
         self._stack.append(el)
 
+        if self._events is not None and 'start' in self._event_types:
+            self._add_event('start', el)
+
     def _end_element_handler(self, name):
-        logger.debug('_end_element_handler name: ' + str(name))
+        if tracing.enabled:
+            logger.debug('_end_element_handler name: ' + str(name))
+        self._flush_text()
         el = self._stack.pop()
         if el.name != name:
             raise ValueError('Stack pop element name (' + el.name + ') does not match end tag name: ' + name)
@@ -207,8 +346,17 @@ class Document(Parent):
         if 'xml:space' in el.attributes and el.attributes['xml:space'] == 'preserve':
             self._in_space_preserve = False
 
+        if self._events is not None and 'end' in self._event_types:
+            self._add_event('end', el)
+
+    def _add_event(self, event, el):
+        if self._event_tags is None or el.name in self._event_tags:
+            self._events.append((event, el))
+
     def _processing_instruction_handler(self, target, data):
-        logger.debug('_processing_instruction_handler target: ' + str(target) + ' data: ' + str(data))
+        if tracing.enabled:
+            logger.debug('_processing_instruction_handler target: ' + str(target) + ' data: ' + str(data))
+        self._flush_text()
 
         if len(self._stack) == 0:
             pi = ProcessingInstruction(target, data, parent=self)
@@ -216,26 +364,48 @@ class Document(Parent):
         else:
             pi = ProcessingInstruction(target, data, parent=self._stack[-1])
             self._stack[-1].children.append(pi)
+        self._next_order = pi._label_order(self._next_order, Node._ORDER_GAP)
 
     def _character_data_handler(self, data):
-        logger.debug('_character_data_handler data: ' + str(data.encode('UTF-8')))
+        self._text.append(data)
+
+    def _flush_text(self):
+        # turn the pending run of character data into a single node
+        if len(self._text) == 0:
+            return
+        if len(self._text) == 1:
+            data = self._text[0]
+        else:
+            data = ''.join(self._text)
+        self._text.clear()
+
+        if tracing.enabled:
+            logger.debug('_character_data_handler data: ' + str(data.encode('UTF-8')))
         if not self._in_space_preserve:
             if self._skip_whitespace:
                 data = data.strip(' \t\n')
-                logger.debug('Stripped to: ' + str(data.encode('UTF-8')))
+                if tracing.enabled:
+                    logger.debug('Stripped to: ' + str(data.encode('UTF-8')))
             if data == '':
-                logger.debug('Skipping whitespace character data')
+                if tracing.enabled:
+                    logger.debug('Skipping whitespace character data')
                 return
 
+        self._append_character_data(data)
+
+    def _append_character_data(self, data):
         if len(self._stack) == 0:
             char_data = CharacterData(data, cdata_block=self._in_cdata, parent=self)
             self.children.append(char_data)
         else:
             char_data = CharacterData(data, cdata_block=self._in_cdata, parent=self._stack[-1])
             self._stack[-1].children.append(char_data)
+        self._next_order = char_data._label_order(self._next_order, Node._ORDER_GAP)
 
     def _comment_handler(self, data):
-        logger.debug('_comment_handler data: ' + str(data))
+        if tracing.enabled:
+            logger.debug('_comment_handler data: ' + str(data))
+        self._flush_text()
 
         if len(self._stack) == 0:
             c = Comment(data, parent=self)
@@ -243,20 +413,91 @@ class Document(Parent):
         else:
             c = Comment(data, parent=self._stack[-1])
             self._stack[-1].children.append(c)
+        self._next_order = c._label_order(self._next_order, Node._ORDER_GAP)
 
     def _start_cdata_section_handler(self):
-        logger.debug('_start_cdata_section_handler')
+        if tracing.enabled:
+            logger.debug('_start_cdata_section_handler')
+        self._flush_text()
         self._in_cdata = True
 
     def _end_cdata_section_handler(self):
-        logger.debug('_end_cdata_section_handler')
+        if tracing.enabled:
+            logger.debug('_end_cdata_section_handler')
+        self._flush_text()
         self._in_cdata = False
 
     def _default_handler_expand(self, data):
-        logger.debug('_default_handler_expand data: ' + str(data))
+        if tracing.enabled:
+            logger.debug('_default_handler_expand data: ' + str(data))
 
     def _not_standalone_handler(self, data):
-        logger.debug('_not_standalone_handler data: ' + str(data))
+        if tracing.enabled:
+            logger.debug('_not_standalone_handler data: ' + str(data))
+
+    def _add_id(self, id_, el):
+        try:
+            self._ids[id_].append(el)
+        except KeyError:
+            self._ids[id_] = [el]
+
+    def _remove_id(self, id_, el):
+        els = self._ids.get(id_)
+        if els is None:
+            return
+        for i, e in enumerate(els):
+            if e is el:
+                del els[i]
+                break
+        if len(els) == 0:
+            del self._ids[id_]
+
+    def _index_ids(self, n):
+        # add the elements of the subtree n to the id index
+        if isinstance(n, Element):
+            for id_ in n.get_ids():
+                self._add_id(id_, n)
+        if isinstance(n, Parent):
+            for c in n.children:
+                self._index_ids(c)
+
+    def _unindex_ids(self, n):
+        # remove the elements of the subtree n from the id index
+        if isinstance(n, Element):
+            for id_ in n.get_ids():
+                self._remove_id(id_, n)
+        if isinstance(n, Parent):
+            for c in n.children:
+                self._unindex_ids(c)
+
+    def _index_subtree(self, n):
+        # bring the indexes up to date for the newly attached subtree n
+        self._index_ids(n)
+        for index in self._attribute_indexes.values():
+            index.add(n)
+
+    def _unindex_subtree(self, n):
+        # remove the detached subtree n from the indexes
+        self._unindex_ids(n)
+        for index in self._attribute_indexes.values():
+            index.remove(n)
+
+    def _find_id_within(self, ref, node):
+        els = self._ids.get(ref)
+        if els is None:
+            return None
+        if len(els) > 1:
+            els = Document.order_sort(els)
+
+        if node is self:
+            return els[0]
+        for el in els:
+            n = el
+            while n is not None:
+                if n is node:
+                    return el
+                n = n._parent
+        return None
 
     def get_type(self):
         '''
@@ -283,3 +524,90 @@ class Document(Parent):
         :raises UnattachedElementException: if the Node is not attached to a Document
         '''
         return 0
+
+    def create_index(self, local_name, namespace=None):
+        '''
+        Create an index of this document's elements by the value of their
+        *local_name* attribute. XPath predicates comparing the attribute to
+        a literal, such as [@sku='X-123'] or [@amount > 100], are answered
+        from the index. Creating an index that already exists returns the
+        existing index.
+
+        :param str local_name: The local name of the attribute to index
+        :param namespace: The namespace of the attribute, or None to index the attribute in any namespace
+        :type namespace: str or None
+        :rtype: expatriate.AttributeIndex
+        '''
+        key = (namespace, local_name)
+        if key not in self._attribute_indexes:
+            index = AttributeIndex(local_name, namespace=namespace)
+            index.add(self)
+            self._attribute_indexes[key] = index
+            if tracing.enabled:
+                logger.debug('Created ' + str(index) + ' of ' + str(len(index)) + ' elements')
+        return self._attribute_indexes[key]
+
+    def get_index(self, local_name, namespace=None):
+        '''
+        Get the index created for the given attribute.
+
+        :param str local_name: The local name of the indexed attribute
+        :param namespace: The namespace of the indexed attribute
+        :type namespace: str or None
+        :rtype: expatriate.AttributeIndex or None if there is no such index
+        '''
+        return self._attribute_indexes.get((namespace, local_name))
+
+    def drop_index(self, local_name, namespace=None):
+        '''
+        Remove the index created for the given attribute.
+
+        :param str local_name: The local name of the indexed attribute
+        :param namespace: The namespace of the indexed attribute
+        :type namespace: str or None
+        :raises KeyError: if there is no such index
+        '''
+        del self._attribute_indexes[(namespace, local_name)]
+
+    def get_structure_index(self):
+        '''
+        Get the index of this document's elements by name, building it if the
+        tree has changed since it was last used.
+
+        :rtype: expatriate.StructureIndex or None if the index is disabled
+        '''
+        if not self._use_structure_index:
+            return None
+        if self._structure_index is None:
+            self._structure_index = StructureIndex(self)
+        return self._structure_index
+
+    @property
+    def symbols(self):
+        """
+        The names and namespace URIs used within this Document, interned so
+        nodes with the same name share one str. Read-only.
+
+        :type: expatriate.SymbolTable
+        """
+        return self._symbols
+
+    def get_result_cache(self):
+        '''
+        Get the cache of XPath results evaluated against this document by
+        :py:meth:`.Node.xpath`, creating it on first use.
+
+        :rtype: expatriate.xpath.ResultCache or None if the cache is disabled
+        '''
+        if self._result_cache_size <= 0:
+            return None
+        if self._result_cache is None:
+            from .xpath.ResultCache import ResultCache
+            self._result_cache = ResultCache(self, self._result_cache_size)
+        return self._result_cache
+
+    def _structure_changed(self):
+        self._structure_index = None
+
+    def _mutated(self):
+        self._mutations += 1
@@ -20,9 +20,12 @@ import logging
 from .Attribute import Attribute
 from .exceptions import *
 from .Namespace import Namespace
+from .NamespaceScope import NamespaceScope
 from .Node import Node
 from .Parent import Parent
 from .publishsubscribe import PublishingDict, Subscriber
+from .SymbolTable import SymbolTable
+from . import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -41,6 +44,8 @@ class Element(Parent, Subscriber):
     :param parent: The node to use as the parent to this node
     :type parent: expatriate.Parent or None
     '''
+    __slots__ = ('_attributes', '_prefix', '_namespace', '_local_name', '_name',
+        '_expanded_name', '_scope', '_namespace_nodes', '_attribute_nodes')
 
     def __init__(self, local_name, attributes=None, prefix=None, namespace=None, parent=None):
         super().__init__(parent=parent)
@@ -54,13 +59,18 @@ class Element(Parent, Subscriber):
         self._prefix = prefix
         self._namespace = namespace
         self._local_name = local_name
+        # the names are interned once the scope is known, but tracing may
+        # print the element before then
+        self._name = SymbolTable.qualify(prefix, local_name)
+        self._expanded_name = (namespace, local_name)
 
         self._init_namespaces()
         self._init_attributes()
 
-        if namespace is not None and namespace not in self._namespace_to_prefixes:
-            logger.debug(str(self) + ' parent does not define namespace ' + namespace
-                + '; adding to attributes')
+        if namespace is not None and namespace not in self._scope._namespaces:
+            if tracing.enabled:
+                logger.debug(str(self) + ' parent does not define namespace ' + namespace
+                    + '; adding to attributes')
             if prefix is None:
                 self.attributes['xmlns'] = namespace
             else:
@@ -82,6 +92,7 @@ class Element(Parent, Subscriber):
     def parent(self, parent):
         self._parent = parent
         self._init_namespaces()
+        self._update_order()
 
     @property
     def attributes(self):
@@ -102,21 +113,19 @@ class Element(Parent, Subscriber):
         :setter: Sets the name. Updates the prefix and namespace and local_name if they change.
         :type: str
         """
-        if self._prefix is None:
-            return self._local_name
-        else:
-            return self._prefix + ':' + self._local_name
+        return self._name
 
     @name.setter
     def name(self, name):
         if ':' in name:
-            self._prefix, colon, self._name = name.partition(':')
+            self._prefix, colon, self._local_name = name.partition(':')
         else:
             self._prefix = None
-            self._name = name
+            self._local_name = name
 
         if self._parent is not None:
             self._namespace = self.prefix_to_namespace(self._prefix)
+        self._name_changed()
 
     @property
     def local_name(self):
@@ -132,6 +141,7 @@ class Element(Parent, Subscriber):
     @local_name.setter
     def local_name(self, local_name):
         self._local_name = local_name
+        self._name_changed()
 
     @property
     def prefix(self):
@@ -149,6 +159,7 @@ class Element(Parent, Subscriber):
         self._prefix = prefix
         if self._parent is not None:
             self._namespace = self.prefix_to_namespace(self._prefix)
+        self._name_changed()
 
     @property
     def namespace(self):
@@ -166,78 +177,228 @@ class Element(Parent, Subscriber):
         self._namespace = namespace
         if self._parent is not None:
             self._prefix = self.namespace_to_prefix(namespace)
+        self._name_changed()
 
     def _data_added(self, publisher, id_, item):
-        logger.debug(str(self) + ' added attributes: ' + str(id_))
-        self._init_attributes()
+        if tracing.enabled:
+            logger.debug(str(self) + ' added attributes: ' + str(id_))
         if id_.startswith('xmlns'):
             self._init_namespaces()
+            self._name_changed()
+        else:
+            self._check_prefix(id_)
+            if self._attribute_nodes is not None:
+                self._attribute_nodes[id_] = self._create_attribute_node(id_)
+        self._reindex_attributes()
+        self._update_order()
+        self._mutated()
+
+        if Element.is_id_attribute(id_):
+            doc = self.get_document()
+            if doc is not None:
+                doc._add_id(item, self)
 
     def _data_updated(self, publisher, id_, old_item, new_item):
-        logger.debug(str(self) + ' updated attributes: ' + str(id_))
-        self._init_attributes()
+        if tracing.enabled:
+            logger.debug(str(self) + ' updated attributes: ' + str(id_))
         if id_.startswith('xmlns'):
             self._init_namespaces()
+            self._name_changed()
+            self._update_order()
+        elif self._attribute_nodes is not None:
+            # the element has already let the document know
+            self._attribute_nodes[id_]._value = new_item
+        self._reindex_attributes()
+        self._mutated()
+
+        if Element.is_id_attribute(id_):
+            doc = self.get_document()
+            if doc is not None:
+                doc._remove_id(old_item, self)
+                doc._add_id(new_item, self)
 
     def _data_deleted(self, publisher, id_, item):
-        logger.debug(str(self) + ' deleted attributes: ' + str(id_))
-        self._init_attributes()
+        if tracing.enabled:
+            logger.debug(str(self) + ' deleted attributes: ' + str(id_))
         if id_.startswith('xmlns'):
             self._init_namespaces()
+            self._name_changed()
+        elif self._attribute_nodes is not None:
+            n = self._attribute_nodes.pop(id_)
+            n._parent = None
+            n._order = None
+        self._reindex_attributes()
+        self._update_order()
+        self._mutated()
+
+        if Element.is_id_attribute(id_):
+            doc = self.get_document()
+            if doc is not None:
+                doc._remove_id(item, self)
+
+    def _reindex_attributes(self):
+        doc = self.get_document()
+        if doc is not None:
+            for index in doc._attribute_indexes.values():
+                index.update(self)
+
+    def _name_changed(self):
+        self._intern_names()
+
+        # names are what the structure index is keyed on
+        doc = self.get_document()
+        if doc is not None:
+            doc._structure_changed()
+            doc._mutated()
 
     def _init_attributes(self):
-        # create nodes for each of the attributes
-        self.attribute_nodes = {}
-        for k, v in self._attributes.items():
-            if ':' in k:
-                prefix, colon, local_name = k.partition(':')
-                # check prefix
-                namespace = self.prefix_to_namespace(prefix)
-            else:
-                local_name = k
-                prefix = None
-                namespace = None
-            n = Attribute(local_name, v, parent=self, prefix=prefix, namespace=namespace)
-            self.attribute_nodes[k] = n
+        # attribute nodes are created when they're first asked for, but
+        # prefixes are checked now so that an unknown one is caught early
+        for k in self._attributes:
+            self._check_prefix(k)
+        self._attribute_nodes = None
 
-    def _init_namespaces(self):
-        if isinstance(self._parent, Element):
-            self._prefix_to_namespace = self._parent._prefix_to_namespace.copy()
-            self._namespace_to_prefixes = self._parent._namespace_to_prefixes.copy()
+    def _check_prefix(self, name):
+        if ':' in name:
+            self.prefix_to_namespace(name.partition(':')[0])
+
+    def _create_attribute_node(self, name):
+        if ':' in name:
+            prefix, colon, local_name = name.partition(':')
+            namespace = self.prefix_to_namespace(prefix)
         else:
-            # parent is-a Document or None
-            self._prefix_to_namespace = {
-                'xml': 'http://www.w3.org/XML/1998/namespace',
-            }
-            self._namespace_to_prefixes = {v: k for k, v in self._prefix_to_namespace.items()}
-
-        # check for prefix namespaces
-        for k, v in self._attributes.items():
-            if k.startswith('xmlns:'):
-                prefix = k.partition(':')[2]
-                if prefix in self._prefix_to_namespace:
-                    raise PrefixRedefineException('Prefix ' + prefix
-                        + ' has already been used but is being redefined')
-                self._prefix_to_namespace[prefix] = v
-                self._namespace_to_prefixes[v] = prefix
-                logger.debug(str(self) + ' Added prefix ' + prefix + ' for uri ' + v)
-            elif k.startswith('xmlns'):
-                self._prefix_to_namespace[None] = v
-                self._namespace_to_prefixes[v] = None
-                logger.debug(str(self) + ' Added prefix None for uri ' + v)
+            local_name = name
+            prefix = None
+            namespace = None
+        return Attribute(local_name, self._attributes[name], parent=self, prefix=prefix, namespace=namespace)
+
+    @property
+    def attribute_nodes(self):
+        """
+        The attribute nodes of this Element, by attribute name, created on
+        first use. Read-only.
+
+        :type: dict[str, expatriate.Attribute]
+        """
+        if self._attribute_nodes is None:
+            self._attribute_nodes = {}
+            for k in self._attributes:
+                self._attribute_nodes[k] = self._create_attribute_node(k)
+            if self._order is not None:
+                self._order_attribute_nodes(self._order + len(self._scope))
+        return self._attribute_nodes
+
+    def _order_attribute_nodes(self, key):
+        # attribute nodes follow the namespace nodes, ordered by name
+        nodes = self._attribute_nodes
+        for k in sorted(nodes.keys()):
+            key += 1
+            nodes[k]._order = key
+
+    def _init_namespaces(self):
+        # elements share their parent's scope unless they declare namespaces
+        scope = getattr(self._parent, '_scope', None)
+        if scope is None:
+            # not within a Document, so there's no symbol table either
+            scope = NamespaceScope.ROOT
+        self._scope = scope.derive(NamespaceScope.declarations(self._attributes))
+
+        # the namespaces of prefixed attributes may have changed with it
+        self._attribute_nodes = None
 
         # now that we've parsed the namespace attributes, we can figure out missing info
-        if self._namespace is None and self._prefix is None and None in self._prefix_to_namespace:
-            self._namespace = self._prefix_to_namespace[None]
+        if self._namespace is None and self._prefix is None and None in self._scope._prefixes:
+            self._namespace = self._scope._prefixes[None]
         elif self._namespace is None and self._prefix is not None:
             self._namespace = self.prefix_to_namespace(self._prefix)
 
-        # create nodes for each of the namespaces
-        self.namespace_nodes = {}
-        for prefix in self._prefix_to_namespace.keys():
-            uri = self._prefix_to_namespace[prefix]
-            n = Namespace(prefix, uri, parent=self)
-            self.namespace_nodes[prefix] = n
+        # namespace nodes are created when they're first asked for
+        self._namespace_nodes = None
+
+        self._intern_names()
+
+    def _intern_names(self):
+        # share the document's copy of each name and cache the qualified and
+        # expanded names, which are asked for far more often than set
+        symbols = self._scope.symbols
+        if symbols is None:
+            self._name = SymbolTable.qualify(self._prefix, self._local_name)
+            self._expanded_name = (self._namespace, self._local_name)
+        else:
+            self._prefix = symbols.intern(self._prefix)
+            self._local_name = symbols.intern(self._local_name)
+            self._namespace = symbols.intern(self._namespace)
+            self._name = symbols.qualified_name(self._prefix, self._local_name)
+            self._expanded_name = symbols.expanded_name(self._namespace, self._local_name)
+
+    @property
+    def namespace_nodes(self):
+        """
+        The namespace nodes of this Element, one for each prefix in scope,
+        created on first use. Read-only.
+
+        :type: dict[str or None, expatriate.Namespace]
+        """
+        if self._namespace_nodes is None:
+            self._namespace_nodes = {}
+            key = self._order
+            for prefix, uri in self._scope._prefixes.items():
+                n = Namespace(prefix, uri, parent=self)
+                if key is not None:
+                    key += 1
+                    n._order = key
+                self._namespace_nodes[prefix] = n
+        return self._namespace_nodes
+
+    @property
+    def namespace_scope(self):
+        """
+        The namespace prefixes in scope at this Element. Read-only.
+
+        :type: expatriate.NamespaceScope
+        """
+        return self._scope
+
+    def _order_span(self):
+        # the element is followed by its namespace & attribute nodes
+        return 1 + len(self._scope) + len(self._attributes)
+
+    def _set_order(self, key):
+        self._order = key
+        namespace_nodes = self._namespace_nodes
+        attribute_nodes = self._attribute_nodes
+        if key is None:
+            if namespace_nodes is not None:
+                for n in namespace_nodes.values():
+                    n._order = None
+            if attribute_nodes is not None:
+                for n in attribute_nodes.values():
+                    n._order = None
+            return
+
+        if namespace_nodes is not None:
+            for n in namespace_nodes.values():
+                key += 1
+                n._order = key
+        else:
+            key += len(self._scope)
+        if attribute_nodes is not None:
+            self._order_attribute_nodes(key)
+
+    def _update_order(self):
+        # re-key the namespace & attribute nodes after they've been rebuilt
+        if self._order is None:
+            return
+
+        self._set_order(self._order)
+
+        if len(self.children) > 0:
+            next_ = self.children[0]
+        else:
+            next_ = self._next_in_order()
+        if next_ is not None and next_._order is not None \
+        and self._order + self._order_span() > next_._order:
+            self._parent._relabel_order()
 
     def prefix_to_namespace(self, prefix):
         '''
@@ -245,11 +406,13 @@ class Element(Parent, Subscriber):
 
         :param str prefix: The prefix to resolve.
         '''
-        logger.debug(str(self) + ' resolving prefix: ' + str(prefix)
-            + ' using ' + str(self._prefix_to_namespace))
+        if tracing.enabled:
+            logger.debug(str(self) + ' resolving prefix: ' + str(prefix)
+                + ' using ' + str(self._scope))
 
-        if prefix in self._prefix_to_namespace:
-            return self._prefix_to_namespace[prefix]
+        prefixes = self._scope._prefixes
+        if prefix in prefixes:
+            return prefixes[prefix]
         else:
             return super().prefix_to_namespace(prefix)
 
@@ -259,11 +422,13 @@ class Element(Parent, Subscriber):
 
         :param str namespace: The namespace to resolve.
         '''
-        logger.debug(str(self) + ' resolving namespace: ' + str(namespace)
-            + ' using ' + str(self._namespace_to_prefixes))
+        if tracing.enabled:
+            logger.debug(str(self) + ' resolving namespace: ' + str(namespace)
+                + ' using ' + str(self._scope))
 
-        if namespace in self._namespace_to_prefixes:
-            return self._namespace_to_prefixes[namespace]
+        namespaces = self._scope._namespaces
+        if namespace in namespaces:
+            return namespaces[namespace]
         else:
             return super().namespace_to_prefix(namespace)
 
@@ -284,9 +449,10 @@ class Element(Parent, Subscriber):
 
         :rtype: str
         '''
-        logger.debug(str(self) + ' producing xml: ' + self.name + ' attributes '
-            + str(self.attributes) + '; ' + str(len(self.children))
-            + ' children')
+        if tracing.enabled:
+            logger.debug(str(self) + ' producing xml: ' + self.name + ' attributes '
+                + str(self.attributes) + '; ' + str(len(self.children))
+                + ' children')
 
         s = '<' + self.name
         for k, v in self.attributes.items():
@@ -331,7 +497,7 @@ class Element(Parent, Subscriber):
 
         :rtype: tuple(namespace str, local_name str)
         '''
-        return (self.namespace, self.local_name)
+        return self._expanded_name
 
     def __str__(self):
         s = self.__class__.__name__ + ' ' + hex(id(self)) + ' ' + self.name
@@ -341,6 +507,25 @@ class Element(Parent, Subscriber):
             s += ' name=' + self.attributes['name']
         return s
 
+    @staticmethod
+    def is_id_attribute(name):
+        '''
+        Returns true if an attribute named *name* holds an element's id
+
+        :param str name: The attribute name
+        :rtype: bool
+        '''
+        name = name.lower()
+        return name == 'id' or name.endswith(':id')
+
+    def get_ids(self):
+        '''
+        Return the values of this element's id attributes
+
+        :rtype: list[str]
+        '''
+        return [v for k, v in self._attributes.items() if Element.is_id_attribute(k)]
+
     def find_by_id(self, ref):
         '''
         Find the node referenced by *ref* within this node's children.
@@ -348,16 +533,13 @@ class Element(Parent, Subscriber):
         :param str ref: The id attribute of the Node to match
         :rtype: Node or None
         '''
-        logger.debug(str(self) + ' checking attributes for id: ' + str(ref))
-        for k, v in self.attributes.items():
-            k = k.lower()
-            if k.endswith(':id') or k == 'id':
-                logger.debug(str(self) + ' found id: ' + str(v))
-                if v == ref:
+        if self.get_document() is None:
+            if tracing.enabled:
+                logger.debug(str(self) + ' checking attributes for id: ' + str(ref))
+            if ref in self.get_ids():
+                if tracing.enabled:
                     logger.debug(str(self) + ' matches id: ' + str(ref))
-                    return self
-                else:
-                    logger.debug(str(self) + ' id ' + str(v) + ' does not match id: ' + str(ref))
+                return self
 
         return super().find_by_id(ref)
 
@@ -367,7 +549,7 @@ class Element(Parent, Subscriber):
 
         :rtype: int
         '''
-        do = 1 + len(self.namespace_nodes) + len(self.attribute_nodes)
+        do = 1 + len(self._scope) + len(self._attributes)
         for c in self.children:
             do += c.get_node_count()
         return do
@@ -33,6 +33,8 @@ class Namespace(Node):
     :param parent: Parent node of this node.
     :type parent: expatriate.Parent or None
     '''
+    __slots__ = ('prefix', 'uri')
+
     def __init__(self, prefix, uri, parent=None):
         super().__init__(parent=parent)
 
@@ -65,17 +67,3 @@ class Namespace(Node):
         :rtype: tuple(None, prefix str)
         '''
         return (None, self.prefix)
-
-    def get_document_order(self):
-        '''
-        Get the index of this Node's order in the enclosing Document.
-
-        :rtype: int
-        :raises UnattachedElementException: if the Node is not attached to a Document
-        '''
-        if self._parent is None:
-            raise UnattachedElementException('Element ' + str(self) + ' is not attached to a document')
-
-        do = self._parent.get_document_order()
-        ordered_ns = [self._parent.namespace_nodes[k] for k in self._parent.namespace_nodes.keys()]
-        return do + ordered_ns.index(self)
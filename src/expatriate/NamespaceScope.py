@@ -0,0 +1,120 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from types import MappingProxyType
+
+from .exceptions import *
+from . import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class NamespaceScope(object):
+    '''
+    The namespace prefixes in scope at an Element. Scopes are immutable, so
+    an Element that doesn't declare any namespaces shares the scope of its
+    parent, and a declaration derives a new scope for the declaring Element
+    and its descendants. Each scope holds every prefix in scope, so
+    resolving a prefix or namespace doesn't walk up the chain of scopes.
+
+    :param parent: The scope the declarations are made within, or None for the outermost scope
+    :type parent: expatriate.NamespaceScope or None
+    :param declarations: (prefix, namespace URI) of each declaration; the default namespace has prefix None
+    :type declarations: list of tuple(str or None, str)
+    :param symbols: The symbol table of the Document the scope is used in; derived scopes use their parent's
+    :type symbols: expatriate.SymbolTable or None
+    :raises PrefixRedefineException: if a prefix is declared that is already in scope
+    '''
+    XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+    ''' The namespace the xml prefix is bound to in every scope '''
+
+    def __init__(self, parent=None, declarations=(), symbols=None):
+        self.parent = parent
+        if parent is None:
+            prefixes = {'xml': NamespaceScope.XML_NAMESPACE}
+            namespaces = {NamespaceScope.XML_NAMESPACE: 'xml'}
+        else:
+            prefixes = dict(parent._prefixes)
+            namespaces = dict(parent._namespaces)
+            symbols = parent.symbols
+        self.symbols = symbols
+
+        for prefix, uri in declarations:
+            if symbols is not None:
+                prefix = symbols.intern(prefix)
+                uri = symbols.intern(uri)
+            if prefix is not None and prefix in prefixes:
+                raise PrefixRedefineException('Prefix ' + prefix
+                    + ' has already been used but is being redefined')
+            prefixes[prefix] = uri
+            namespaces[uri] = prefix
+            if tracing.enabled:
+                logger.debug('Added prefix ' + str(prefix) + ' for uri ' + uri)
+
+        self._prefixes = prefixes
+        self._namespaces = namespaces
+
+    @property
+    def prefixes(self):
+        """
+        The namespace URI of each prefix in scope. Read-only.
+
+        :type: dict[str or None, str]
+        """
+        return MappingProxyType(self._prefixes)
+
+    @property
+    def namespaces(self):
+        """
+        The prefix of each namespace URI in scope. Read-only.
+
+        :type: dict[str, str or None]
+        """
+        return MappingProxyType(self._namespaces)
+
+    def derive(self, declarations):
+        '''
+        Get the scope within this one with the given declarations made.
+
+        :param declarations: (prefix, namespace URI) of each declaration
+        :type declarations: list of tuple(str or None, str)
+        :rtype: expatriate.NamespaceScope, this scope if there are no declarations
+        '''
+        if len(declarations) == 0:
+            return self
+        return NamespaceScope(self, declarations)
+
+    @staticmethod
+    def declarations(attributes):
+        # the (prefix, namespace URI) declared by each xmlns attribute
+        declarations = []
+        for k, v in attributes.items():
+            if k.startswith('xmlns:'):
+                declarations.append((k.partition(':')[2], v))
+            elif k.startswith('xmlns'):
+                declarations.append((None, v))
+        return declarations
+
+    def __len__(self):
+        return len(self._prefixes)
+
+    def __str__(self):
+        return 'NamespaceScope ' + hex(id(self)) + ': ' + str(self._prefixes)
+
+NamespaceScope.ROOT = NamespaceScope()
+''' The outermost scope, with just the xml prefix, shared by every Element not within a Document '''
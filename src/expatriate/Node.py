@@ -16,8 +16,6 @@
 # along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
-import math
-import re
 
 from .exceptions import *
 from .xpath import *
@@ -34,8 +32,17 @@ class Node(object):
     :type parent: expatriate.Parent or None
 
     '''
+    # nodes keep their attributes in slots rather than a __dict__, which
+    # would be most of the memory of a large document. Subclasses that don't
+    # declare __slots__ of their own get a __dict__ as usual
+    __slots__ = ('_parent', '_order', '__weakref__')
+
+    _ORDER_GAP = 1 << 16
+    ''' Spacing between the order keys of adjacent nodes when labelling '''
+
     def __init__(self, parent=None):
         self._parent = parent
+        self._order = None
 
     @property
     def parent(self):
@@ -83,101 +90,17 @@ class Node(object):
             raise UnknownNamespaceException('Unknown namespace uri: ' + str(namespace_uri))
 
     def _tokenize(self, expr):
-        tokens = []
-
-        parens = 0
-        braces = 0
-
-        t = ''
-        for i, char in enumerate(expr):
-            if len(t) > 0:
-                if t[0] in '\'"':
-                    # string literal
-                    t += char
-                    if char == t[0] and t[-1] != '\\':
-                        tokens.append(t)
-                        t = ''
-                elif t == '-':
-                    tokens.append(t)
-                    t = char
-                elif t == '.' and char != '.':
-                    tokens.extend(['self', '::', 'node', '(', ')'])
-                    t = char
-                elif re.fullmatch(r'[0-9][0-9.]*', t) and (char.isdigit() or char == '.'):
-                    t += char
-                elif t[0] == '$' and char.isalpha():
-                    t += char
-                elif t.isspace():
-                    # skip space
-                    t = char
-                elif t in ':/.!<>':
-                    if t + char in ['::', '//', '..', '!=', '<=', '>=']:
-                        t += char
-                        if t == '//':
-                            tokens.extend(['/', 'descendant-or-self', '::', 'node', '(', ')', '/'])
-                        elif t == '..':
-                            tokens.extend(['parent', '::', 'node', '(', ')'])
-                        else:
-                            tokens.append(t)
-                        t = ''
-                    else:
-                        tokens.append(t)
-                        t = char
-                elif t == '@':
-                    tokens.extend(['attribute', '::'])
-                    t = char
-                elif t == '(':
-                    tokens.append(t)
-                    t = char
-                    parens += 1
-                elif t == ')':
-                    tokens.append(t)
-                    t = char
-                    parens -= 1
-                elif t == '[':
-                    tokens.append(t)
-                    t = char
-                    braces += 1
-                elif t == ']':
-                    tokens.append(t)
-                    t = char
-                    braces -= 1
-                elif t in ',\'"*|+=':
-                    tokens.append(t)
-                    t = char
-                elif char.isalnum() or char == '-':
-                    t += char
-                else:
-                    tokens.append(t)
-                    t = char
-            else:
-                if char.isspace():
-                    continue
-                t += char
-
-        # append final token if there is one
-        if t == '.':
-            tokens.extend(['self', '::', 'node', '(', ')'])
-        elif t.isspace():
-            pass
-        elif t == ')':
-            tokens.append(t)
-            parens -= 1
-        elif t == ']':
-            tokens.append(t)
-            braces -= 1
-        elif t != '':
-            tokens.append(t)
-
-        if parens != 0 or braces != 0:
-            raise XPathSyntaxException('Paren or brace expression not closed')
-
-        return tokens
+        return CompiledExpression.tokenize(expr)
 
     def xpath(self, expr, version=1.0, variables={}, add_functions={}):
         '''
         Return the nodes matching the given XPath expression (expr).
 
+        The compiled expression is kept in expatriate.xpath.expression_cache
+        so repeated calls with the same expression skip parsing. The result is
+        kept in the document's :py:class:`.xpath.ResultCache` until the tree
+        changes.
+
         :param str expr: XPath expression
         :param version: Version of XPath the expression conforms to
         :type version: float or defaults to 1.0
@@ -188,244 +111,41 @@ class Node(object):
         if version != 1.0:
             raise NotImplementedError('Only XPath 1.0 has been implemented')
 
+        doc = self.get_document()
+        if doc is None:
+            raise ValueError("Can't resolve xpath expression on Node not attached to a document")
+
+        from . import xpath
+        ce = xpath.expression_cache.get(expr, add_functions)
+        cache = doc.get_result_cache()
+        if cache is None:
+            return ce.evaluate(self, variables)
+        return cache.get(ce, self, variables)
+
+    def ixpath(self, expr, version=1.0, variables={}, add_functions={}):
+        '''
+        Iterate over the nodes matching the given XPath expression (expr),
+        yielding them as they are found. Steps that select nodes in document
+        order, such as //name or child::name, are evaluated lazily, so
+        stopping early saves evaluating the rest of the expression. The tree
+        should not be changed while iterating.
+
+        :param str expr: XPath expression
+        :param version: Version of XPath the expression conforms to
+        :type version: float or defaults to 1.0
+        :param dict variables: Variables to substitute in the XPath expression
+        :param dict add_functions: Functions to use within the XPath expression
+        :rtype: iterator of Node
+        :raises TypeError: if the expression doesn't select a nodeset
+        '''
+        if version != 1.0:
+            raise NotImplementedError('Only XPath 1.0 has been implemented')
+
         if self.get_document() is None:
             raise ValueError("Can't resolve xpath expression on Node not attached to a document")
 
-        logger.debug('********************************************')
-        logger.debug('Tokenizing xpath expression: ' + str(expr))
-
-        tokens = self._tokenize(expr)
-        logger.debug('Tokens: ' + str(tokens))
-
-        functions = Function.FUNCTIONS.copy()
-        functions.update(add_functions)
-
-        stack = []
-        for i, token in enumerate(tokens):
-            if token == '(':
-                e = Expression()
-                logger.debug('Starting sub expression ' + str(e))
-                stack.append(e)
-            elif token == ')':
-                if len(stack) <= 1:
-                    continue
-
-                logger.debug('End of ' + str(stack[-1]))
-                if i > 0 and tokens[i-1] == '(':
-                    # don't add empty Expression
-                    stack.pop()
-                    logger.debug('Ignoring empty expression')
-                elif len(stack) > 1:
-                    e = stack.pop()
-                    logger.debug('Adding ' + str(e) + ' to ' + str(stack[-1]))
-                    stack[-1].children.append(e)
-                # else just let it on the stack
-            elif token == '[':
-                p = Predicate()
-                stack.append(p)
-                logger.debug('Starting predicate ' + str(p))
-                e = Expression()
-                stack.append(e)
-                logger.debug('Starting sub expression ' + str(e))
-            elif token == ']':
-                logger.debug('End of ' + str(stack[-1]))
-                if i > 0 and tokens[i-1] == '[':
-                    # don't add empty predicate
-                    stack.pop()
-                    stack.pop()
-                    logger.debug('Ignoring empty expression & predicate')
-                else:
-                    while(len(stack) > 1 and not isinstance(stack[-1], Predicate)):
-                        i = stack.pop()
-                        logger.debug('Adding ' + str(i) + ' to ' + str(stack[-1]))
-                        stack[-1].children.append(i)
-                    p = stack.pop()
-                    if not isinstance(stack[-1], Axis):
-                        raise SyntaxException('Expecting Axis on stack before predicate')
-                    logger.debug('Adding ' + str(p) + ' to ' + str(stack[-1]))
-                    stack[-1].children.append(p)
-            elif token  == '::':
-                # already processed axis
-                pass
-            elif token == ':':
-                # already processed QNameNodeTest
-                pass
-            elif token == '*':
-                if i > 0 and tokens[i-1] not in [
-                    '::', '(', '[', ',', 'and', 'or', 'mod', 'div',
-                    '*', '/', '//', '|', '+', '-', '=', '!=', '<', '<=',
-                    '>', '>=']:
-                    o = Operator(token)
-                    o.children.append(stack.pop())
-                    stack.append(o)
-                    logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                else:
-                    if len(stack) == 0 or not isinstance(stack[-1], Axis):
-                        # use implicit axis
-                        a = Axis('child')
-                        stack.append(a)
-                        logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                    nt = AnyNodeTest(stack[-1].get_principal_node_type())
-                    stack[-1].children.append(nt)
-                    logger.debug('Adding ' + str(nt) + ' to children of ' + str(stack[-1]))
-            elif token == ',':
-                try:
-                    while(not isinstance(stack[-1], Function)):
-                        i = stack.pop()
-                        logger.debug('Adding ' + str(i) + ' to children of ' + str(stack[-1]))
-                        stack[-1].children.append(i)
-                except IndexError:
-                    raise SyntaxException('Unable to add argument to function')
-
-                logger.debug('Starting new expression ' + str(e) + ' for function argument')
-                e = Expression()
-                stack.append(e)
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif token[0] in '\'"':
-                l = Literal(token[1:-1])
-                stack.append(l)
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif re.fullmatch(r'[0-9.]+', token):
-                if '.' in token:
-                    l = Literal(float(token))
-                else:
-                    l = Literal(int(token))
-
-                if len(stack) > 0 and isinstance(stack[-1], Operator):
-                    op = stack.pop()
-                    op.children.append(l)
-                    logger.debug('Added ' + str(l) + ' to children of ' + str(op))
-                    stack.append(op)
-                else:
-                    stack.append(l)
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif token == '-' and ( \
-                len(stack) == 0 \
-                or isinstance(stack[-1], Operator) \
-                or (i > 0 and tokens[i-1] in ('(', ',', '[')) \
-            ):
-                o = Operator('negate')
-                stack.append(o)
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif token in Operator.OPERATORS and i > 0 and tokens[-1] not in [
-                '::', '(', '[', ',', 'and', 'or', 'mod', 'div',
-                '*', '/', '//', '|', '+', '-', '=', '!=', '<', '<=',
-                '>', '>=',
-            ]:
-                o = Operator(token)
-                o.children.append(stack.pop())
-                stack.append(o)
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif token == '/':
-                if i == 0:
-                    s = RootStep(self.get_document())
-                else:
-                    while(len(stack) > 0 and not isinstance(stack[-1], Step)):
-                        i = stack.pop()
-                        if len(stack) > 0:
-                            logger.debug('Adding ' + str(i) + ' to children of ' + str(stack[-1]))
-                            stack[-1].children.append(i)
-
-                    if len(stack) == 0 or not isinstance(stack[-1], Step):
-                        logger.debug('Step is not the last item on the stack')
-                        parent_step = Step()
-                        logger.debug('Adding ' + str(i) + ' to children of ' + str(parent_step))
-                        parent_step.children.append(i)
-                        stack.append(parent_step)
-                        logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                    s = Step()
-                stack.append(s)
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif token == 'Infinity':
-                stack.append(Literal(math.inf))
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif token == 'NaN':
-                stack.append(Literal(math.nan))
-                logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-            elif re.fullmatch(r'[a-zA-Z0-9_-]+', token):
-                if len(stack) > 0 and isinstance(stack[-1], Axis):
-                    if token in TypeNodeTest.NODE_TYPES:
-                        stack[-1].children.append(TypeNodeTest(token))
-                        logger.debug('Added ' + str(stack[-1].children[-1]) + ' to children of ' + str(stack[-1]))
-                    elif len(tokens) > i+1 and tokens[i+1] == ':':
-                        stack.append(QNameNodeTest(token))
-                        logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                    else:
-                        stack[-1].children.append(NCNameNodeTest(token))
-                        logger.debug('Added ' + str(stack[-1].children[-1]) + ' to children of ' + str(stack[-1]))
-                elif len(tokens) > i+1 and tokens[i+1] == '::':
-                    if token not in Axis.AXES:
-                        raise XPathSyntaxException('Unknown axis: ' + str(token))
-                    a = Axis(token)
-                    stack.append(a)
-                    logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                elif len(tokens) > i+1 and tokens[i+1] == '(':
-                    if token in Function.FUNCTIONS:
-                        f = Function(token, Function.FUNCTIONS[token])
-                        stack.append(f)
-                        logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                    elif token in TypeNodeTest.NODE_TYPES:
-                        if len(stack) == 0 or not isinstance(stack[-1], Axis):
-                            stack.append(Axis('child'))
-                            logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                        nt = TypeNodeTest(token)
-                        stack[-1].children.append(nt)
-                        logger.debug('Added ' + str(nt) + ' to children of ' + str(stack[-1]))
-                    else:
-                        raise XPathSyntaxException('Unknown function or node type test: ' + str(token))
-                elif token == 'true':
-                    stack.append(Literal(True))
-                    logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                elif token == 'false':
-                    stack.append(Literal(False))
-                    logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                elif token in Operator.OPERATORS and i > 0 and tokens[-1] not in [
-                    '::', '(', '[', ',', 'and', 'or', 'mod', 'div', '*', '/',
-                    '//', '|', '+', '-', '=', '!=', '<', '<=', '>', '>=']:
-                    o = Operator(token)
-                    o.children.append(stack.pop())
-                    stack.append(o)
-                    logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                elif len(tokens) > i+1 and tokens[i+1] == ':':
-                    # first part of a qname test
-                    if len(stack) == 0 or not isinstance(stack[-1], Axis):
-                        stack.append(Axis('child'))
-                        logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                    nt = QNameNodeTest(token)
-                    stack.append(nt)
-                    logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                elif i > 0 and tokens[i-1] == ':':
-                    # second part of a qname test
-                    if len(stack) == 0 or not isinstance(stack[-1], QNameNodeTest):
-                        raise SyntaxException('Expecting QNameNodeTest on stack; got second half of QName')
-                    nt = stack.pop()
-                    nt.name += ':' + token
-                    if len(stack) == 0 or not isinstance(stack[-1], Axis):
-                        raise SyntaxException('Expecting Axis on stack; finished QNameNodeTest')
-                    stack[-1].children.append(nt)
-                    logger.debug('Added ' + str(nt) + ' to ' + str(stack[-1]))
-                else:
-                    # has to be a ncname test
-                    if len(stack) == 0 or not isinstance(stack[-1], Axis):
-                        stack.append(Axis('child'))
-                        logger.debug('Pushed ' + str(stack[-1]) + ' on stack')
-                    nt = NCNameNodeTest(token)
-                    stack[-1].children.append(nt)
-                    logger.debug('Added ' + str(nt) + ' to children of ' + str(stack[-1]))
-            else:
-                raise XPathSyntaxException('Unknown token: ' + str(token))
-
-        while(len(stack) > 1):
-            i = stack.pop()
-            logger.debug('Adding ' + str(i) + ' to children of ' + str(stack[-1]))
-            stack[-1].children.append(i)
-        i = stack.pop()
-        logger.debug('Final pop off stack got ' + str(i))
-
-        # TODO need to make sure node set items are unique
-        logger.debug('********************************************')
-        logger.debug('Evaluating ' + str(i))
-        return i.evaluate(self, 1, 1, variables)
+        from . import xpath
+        return xpath.expression_cache.get(expr, add_functions).iterate(self, variables)
 
     def __str__(self):
         return self.__class__.__name__ + ' ' + hex(id(self))
@@ -500,27 +220,65 @@ class Node(object):
 
     def get_document_order(self):
         '''
-        Get the index of this Node's order in the enclosing Document.
+        Get the order key of this Node in the enclosing Document. Keys compare
+        in document order but are not contiguous.
 
         :rtype: int
         :raises UnattachedElementException: if the Node is not attached to a Document
         '''
+        if self._order is not None:
+            return self._order
+
         if self._parent is None:
             raise UnattachedElementException('Element ' + str(self) + ' is not attached to a document')
 
-        do = self._parent.get_document_order()
-        try:
-            do += len(self._parent.namespace_nodes)
-        except AttributeError:
-            pass
-        try:
-            do += len(self._parent.attribute_nodes)
-        except AttributeError:
-            pass
-
-        for c in self._parent.children:
-            if c == self:
-                return do
-            do += c.get_node_count()
-
-        raise ValueError('Unable to find node ' + str(self) + ' in ' + str(self._parent) + ' children')
+        doc = self.get_document()
+        if doc is None:
+            raise UnattachedElementException('Element ' + str(self) + ' is not attached to a document')
+
+        # some node was attached without going through Parent; relabel everything
+        doc._relabel_order()
+        if self._order is None:
+            raise ValueError('Unable to find node ' + str(self) + ' in ' + str(self._parent) + ' children')
+        return self._order
+
+    def _order_span(self):
+        # number of order keys used by this node itself
+        return 1
+
+    def _set_order(self, key):
+        self._order = key
+
+    def _clear_order(self):
+        self._set_order(None)
+
+    def _label_order(self, key, step):
+        # assign key to this node (and its subtree) and return the next free key
+        self._set_order(key)
+        return key + step * self._order_span()
+
+    def _count_order_units(self):
+        return self._order_span()
+
+    def _last_order(self):
+        # the highest key used within this node's subtree
+        if self._order is None:
+            return None
+        return self._order + self._order_span() - 1
+
+    def _mutated(self):
+        # let the enclosing document know its tree has changed
+        doc = self.get_document()
+        if doc is not None:
+            doc._mutated()
+
+    def _next_in_order(self):
+        # the first node following this node's subtree in document order
+        node = self
+        while node._parent is not None:
+            p = node._parent
+            i = p._child_index(node)
+            if i + 1 < len(p.children):
+                return p.children[i + 1]
+            node = p
+        return None
@@ -19,6 +19,7 @@ import logging
 
 from .exceptions import *
 from .Node import Node
+from . import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -32,6 +33,11 @@ class Parent(Node):
     :type parent: Parent or None
 
     '''
+    __slots__ = ('children',)
+
+    _MIN_RELABEL_GAP = 16
+    ''' Smallest spacing accepted when relabelling a region of the document '''
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.children = []
@@ -48,6 +54,7 @@ class Parent(Node):
         n = CharacterData(*args, **kwargs, parent=self)
 
         self.children.append(n)
+        self._attach_child(len(self.children) - 1)
 
         return n
 
@@ -63,6 +70,7 @@ class Parent(Node):
         n = Comment(*args, **kwargs, parent=self)
 
         self.children.append(n)
+        self._attach_child(len(self.children) - 1)
 
         return n
 
@@ -78,6 +86,7 @@ class Parent(Node):
         n = Element(*args, **kwargs, parent=self)
 
         self.children.append(n)
+        self._attach_child(len(self.children) - 1)
 
         return n
 
@@ -93,6 +102,7 @@ class Parent(Node):
         n = ProcessingInstruction(*args, **kwargs, parent=self)
 
         self.children.append(n)
+        self._attach_child(len(self.children) - 1)
 
         return n
 
@@ -120,7 +130,12 @@ class Parent(Node):
         if not isinstance(value, Node):
             raise TypeError('Values must be of Node type; got: ' + value.__class__.__name__)
 
+        old = self.children[key]
         self.children[key] = value
+        if old is not value:
+            self.detach(old)
+        value._parent = self
+        self._attach_child(key)
 
     def __delitem__(self, key):
         '''
@@ -129,7 +144,9 @@ class Parent(Node):
         if not isinstance(key, int):
             raise TypeError('Key values must be of int type; got: ' + key.__class__.__name__)
 
+        n = self.children[key]
         del self.children[key]
+        self.detach(n)
 
     def __iter__(self):
         '''
@@ -165,6 +182,7 @@ class Parent(Node):
                 + ' or a subclass of Node; got: ' + x.__class__.__name__)
 
         self.children.append(n)
+        self._attach_child(len(self.children) - 1)
 
     def count(self, x):
         '''
@@ -214,10 +232,18 @@ class Parent(Node):
             n = CharacterData(str(x), parent=self)
         elif isinstance(x, Node):
             n = x
+            n._parent = self
         else:
             raise ValueError('Children of ' + self.__class__.__name__ + ' must be subclass of Node; got: ' + x.__class__.__name__)
 
+        # normalize i the same way list.insert does
+        if i < 0:
+            i = max(len(self.children) + i, 0)
+        elif i > len(self.children):
+            i = len(self.children)
+
         self.children.insert(i, n)
+        self._attach_child(i)
 
     def pop(self, *args):
         '''
@@ -241,12 +267,31 @@ class Parent(Node):
         '''
         n = self.children[self.children.index(x)]
         self.children.remove(x)
+        self.detach(n)
+
+    def detach(self, n):
+        '''
+        Release node *n*, which has already been removed from this node's
+        children, from this node.
+
+        :param expatriate.Node n: The node removed
+        '''
+        doc = self.get_document()
+        if doc is not None:
+            doc._unindex_subtree(n)
+            doc._structure_changed()
+            doc._mutated()
+
+        n._parent = None
+        n._clear_order()
 
     def reverse(self):
         '''
         Reverse the items of the node's children in place.
         '''
         self.children.reverse()
+        self._relabel_order()
+        self._mutated()
 
     def sort(self, key=None, reverse=False):
         '''
@@ -257,6 +302,8 @@ class Parent(Node):
         :param bool reverse: A boolean value. If set to True, then the list elements are sorted as if each comparison were reversed. Defaults to False.
         '''
         self.children.sort(key=key, reverse=reverse)
+        self._relabel_order()
+        self._mutated()
 
     # TODO copy()
 
@@ -267,10 +314,139 @@ class Parent(Node):
         :param str ref: The id attribute of the node to match
         :rtype: Node or None
         '''
-        logger.debug(str(self) + ' checking children for id: ' + str(ref))
+        doc = self.get_document()
+        if doc is not None:
+            return doc._find_id_within(ref, self)
+
+        # not in a document, so there's no index to use
+        if tracing.enabled:
+            logger.debug(str(self) + ' checking children for id: ' + str(ref))
         for c in self.children:
             el = c.find_by_id(ref)
             if el is not None:
                 return el
 
         return super().find_by_id(ref)
+
+    def _attach_child(self, i):
+        # bring the bookkeeping up to date for the newly attached child at i
+        self._order_child(i)
+
+        doc = self.get_document()
+        if doc is not None:
+            doc._index_subtree(self.children[i])
+            doc._structure_changed()
+            doc._mutated()
+
+    def _label_order(self, key, step):
+        key = super()._label_order(key, step)
+        for c in self.children:
+            key = c._label_order(key, step)
+        return key
+
+    def _clear_order(self):
+        super()._clear_order()
+        for c in self.children:
+            c._clear_order()
+
+    def _count_order_units(self):
+        units = self._order_span()
+        for c in self.children:
+            units += c._count_order_units()
+        return units
+
+    def _last_order(self):
+        if len(self.children) > 0:
+            return self.children[-1]._last_order()
+        return super()._last_order()
+
+    def _child_index(self, node):
+        # children are kept in key order, so try a binary search first
+        key = node._order
+        if key is not None:
+            lo = 0
+            hi = len(self.children)
+            try:
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if self.children[mid]._order < key:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+            except TypeError:
+                # some child hasn't been labelled
+                lo = len(self.children)
+            if lo < len(self.children) and self.children[lo] is node:
+                return lo
+
+        for i, c in enumerate(self.children):
+            if c is node:
+                return i
+        raise ValueError('Unable to find node ' + str(node) + ' in ' + str(self) + ' children')
+
+    def _order_child(self, i):
+        # label the subtree of the child at index i within the gap left
+        # between its neighbours
+        if self._order is None:
+            return
+
+        n = self.children[i]
+        if i > 0:
+            lo = self.children[i - 1]._last_order()
+        else:
+            lo = self._order + self._order_span() - 1
+
+        if i + 1 < len(self.children):
+            next_ = self.children[i + 1]
+        else:
+            next_ = self._next_in_order()
+
+        if lo is None or (next_ is not None and next_._order is None):
+            self.get_document()._relabel_order()
+            return
+
+        if next_ is None:
+            key = n._label_order(lo + Node._ORDER_GAP, Node._ORDER_GAP)
+            self.get_document()._next_order = key
+            return
+
+        step = (next_._order - lo) // (n._count_order_units() + 1)
+        if step >= 1:
+            n._label_order(lo + step, step)
+        else:
+            self._relabel_order()
+
+    def _relabel_order(self):
+        # relabel the children of this node, widening to ancestors until
+        # there is enough room between the keys
+        node = self
+        while node._order is not None:
+            next_ = node._next_in_order()
+            units = 0
+            for c in node.children:
+                units += c._count_order_units()
+
+            lo = node._order + node._order_span() - 1
+            if next_ is None or next_._order is None:
+                if node._parent is not None:
+                    node = node._parent
+                    continue
+                # at the document; nothing follows
+                step = Node._ORDER_GAP
+            else:
+                step = (next_._order - lo) // (units + 1)
+                if step < Parent._MIN_RELABEL_GAP and node._parent is not None:
+                    node = node._parent
+                    continue
+
+            # the keys held by the structure index are about to go stale
+            doc = node.get_document()
+            if doc is not None:
+                doc._structure_changed()
+
+            key = lo + step
+            for c in node.children:
+                key = c._label_order(key, step)
+            if next_ is None:
+                node._next_order = key
+            return
@@ -32,11 +32,41 @@ class ProcessingInstruction(Node):
     :param parent: Parent node of the PI
     :type parent: expatriate.Parent or None
     '''
+    __slots__ = ('_target', '_data')
+
     def __init__(self, target, data, parent=None):
         super().__init__(parent=parent)
 
-        self.target = target
-        self.data = data
+        self._target = target
+        self._data = data
+
+    @property
+    def target(self):
+        """
+        The target of this processing instruction
+
+        :type: str
+        """
+        return self._target
+
+    @target.setter
+    def target(self, target):
+        self._target = target
+        self._mutated()
+
+    @property
+    def data(self):
+        """
+        The data section of this processing instruction
+
+        :type: str
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._mutated()
 
     def produce(self):
         '''
@@ -0,0 +1,121 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+import logging
+
+from .Element import Element
+from .Parent import Parent
+from . import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class StructureIndex(object):
+    '''
+    Posting lists of a Document's elements, kept in document order and keyed
+    by name. Each element's subtree occupies the interval of order keys
+    between its own key and the key of its last descendant, so the
+    descendants of a node with a given name can be found with a range scan
+    over the matching posting list.
+
+    :param document: The Document to index
+    :type document: expatriate.Document
+    '''
+    def __init__(self, document):
+        self._elements = ([], [])
+        self._by_local_name = {}
+        self._by_name = {}
+        self._by_expanded_name = {}
+
+        # walk the tree in document order so that each list comes out sorted
+        stack = [document]
+        while len(stack) > 0:
+            n = stack.pop()
+            if isinstance(n, Element):
+                self._post(self._elements, n)
+                self._post(self._by_local_name.setdefault(n.local_name, ([], [])), n)
+                self._post(self._by_name.setdefault(n.name, ([], [])), n)
+                self._post(self._by_expanded_name.setdefault(n.get_expanded_name(), ([], [])), n)
+            if isinstance(n, Parent):
+                stack.extend(reversed(n.children))
+
+        if tracing.enabled:
+            logger.debug('Indexed ' + str(len(self._elements[0])) + ' elements of ' + str(document))
+
+    def _post(self, postings, el):
+        postings[0].append(el._order)
+        postings[1].append(el)
+
+    def elements(self):
+        '''
+        Get the posting list of all the elements.
+
+        :rtype: tuple of (list of order keys, list of Element)
+        '''
+        return self._elements
+
+    def by_local_name(self, local_name):
+        '''
+        Get the posting list of the elements with the given local name.
+
+        :param str local_name: The local name to match
+        :rtype: tuple of (list of order keys, list of Element)
+        '''
+        return self._by_local_name.get(local_name, ([], []))
+
+    def by_name(self, name):
+        '''
+        Get the posting list of the elements with the given (possibly
+        prefixed) name.
+
+        :param str name: The name to match
+        :rtype: tuple of (list of order keys, list of Element)
+        '''
+        return self._by_name.get(name, ([], []))
+
+    def by_expanded_name(self, namespace, local_name):
+        '''
+        Get the posting list of the elements with the given expanded name.
+
+        :param namespace: The namespace URI to match
+        :type namespace: str or None
+        :param str local_name: The local name to match
+        :rtype: tuple of (list of order keys, list of Element)
+        '''
+        return self._by_expanded_name.get((namespace, local_name), ([], []))
+
+    @staticmethod
+    def descendants(node, postings, include_self=False):
+        '''
+        Select the entries of *postings* that fall within the subtree of
+        *node*.
+
+        :param node: The node whose descendants are wanted
+        :type node: expatriate.Node
+        :param postings: The posting list to scan
+        :type postings: tuple of (list of order keys, list of Element)
+        :param bool include_self: True if *node* itself may be selected
+        :rtype: list of Element, in document order
+        '''
+        keys, els = postings
+        if include_self:
+            lo = bisect.bisect_left(keys, node._order)
+        else:
+            lo = bisect.bisect_right(keys, node._order)
+        hi = bisect.bisect_right(keys, node._last_order(), lo)
+        return els[lo:hi]
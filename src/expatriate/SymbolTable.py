@@ -0,0 +1,144 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class SymbolTable(object):
+    '''
+    The names and namespace URIs used within a Document, each kept once.
+    The Document's expat parser interns element and attribute names into
+    the same table, so every node with a given name shares one str and
+    names can be compared by identity. Qualified names and expanded-name
+    tuples are built once per distinct name as well. Symbols can also be
+    numbered, so they can be kept as ints, as
+    :py:class:`.CompactDocument` does.
+    '''
+
+    def __init__(self):
+        # str -> the same str; this is also the parser's intern dict
+        self._symbols = {}
+        # (prefix, local_name) -> qualified name
+        self._qualified_names = {}
+        # (namespace, local_name) -> expanded name tuple
+        self._expanded_names = {}
+        # the numbered symbols; str -> id & id -> str
+        self._ids = {}
+        self._by_id = []
+
+    def intern(self, s):
+        '''
+        Get the interned copy of *s*, adding it to the table if it isn't
+        already.
+
+        :param s: The name or URI to intern
+        :type s: str or None
+        :rtype: str or None, None if *s* is None
+        '''
+        if s is None:
+            return None
+        return self._symbols.setdefault(s, s)
+
+    def get(self, s):
+        '''
+        Get the interned copy of *s* without adding it to the table.
+
+        :param str s: The name or URI to look up
+        :rtype: str or None, None if no node in the Document has used *s*
+        '''
+        return self._symbols.get(s)
+
+    def qualified_name(self, prefix, local_name):
+        '''
+        Get the interned qualified name (prefix:local_name) for the given
+        prefix and local name.
+
+        :param prefix: The prefix of the name
+        :type prefix: str or None
+        :param str local_name: The local name
+        :rtype: str
+        '''
+        key = (prefix, local_name)
+        try:
+            return self._qualified_names[key]
+        except KeyError:
+            name = self.intern(SymbolTable.qualify(prefix, local_name))
+            self._qualified_names[key] = name
+            return name
+
+    def expanded_name(self, namespace, local_name):
+        '''
+        Get the shared expanded name tuple for the given namespace and local
+        name.
+
+        :param namespace: The namespace URI
+        :type namespace: str or None
+        :param str local_name: The local name
+        :rtype: tuple(namespace str, local_name str)
+        '''
+        key = (namespace, local_name)
+        try:
+            return self._expanded_names[key]
+        except KeyError:
+            expanded_name = (self.intern(namespace), self.intern(local_name))
+            self._expanded_names[key] = expanded_name
+            return expanded_name
+
+    def symbol_id(self, s):
+        '''
+        Get the id number of *s*, interning and numbering it if it hasn't
+        been already. Ids are numbered from 0 in the order they're asked for.
+
+        :param str s: The name or URI to number
+        :rtype: int
+        '''
+        try:
+            return self._ids[s]
+        except KeyError:
+            s = self.intern(s)
+            id_ = len(self._by_id)
+            self._ids[s] = id_
+            self._by_id.append(s)
+            return id_
+
+    def symbol(self, id_):
+        '''
+        Get the symbol numbered *id_*.
+
+        :param int id_: The id number returned by :py:meth:`symbol_id`
+        :rtype: str
+        :raises IndexError: if no symbol has been given that number
+        '''
+        return self._by_id[id_]
+
+    @staticmethod
+    def qualify(prefix, local_name):
+        # the qualified name without interning it
+        if prefix is None:
+            return local_name
+        return prefix + ':' + local_name
+
+    def __contains__(self, s):
+        return s in self._symbols
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __str__(self):
+        return 'SymbolTable ' + hex(id(self)) + ' ' + str(len(self._symbols)) + ' symbols'
@@ -26,12 +26,20 @@ XML_SPACE_ENUMERATION = (
 ''' Enumeration of the possible whitespace processing modes '''
 
 from .exceptions import *
+from .tracing import set_tracing
 from .xpath.exceptions import *
 from .publishsubscribe import Publisher, Subscriber
 from .Attribute import Attribute
+from .AttributeIndex import AttributeIndex
 from .CharacterData import CharacterData
 from .Comment import Comment
+from .CompactDocument import CompactDocument
+from .CompactElement import CompactElement
 from .Document import Document
 from .Element import Element
 from .Namespace import Namespace
+from .NamespaceScope import NamespaceScope
 from .ProcessingInstruction import ProcessingInstruction
+from .StructureIndex import StructureIndex
+from .SymbolTable import SymbolTable
+from .iterparse import iterparse
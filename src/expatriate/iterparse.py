@@ -0,0 +1,89 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+
+from .Document import Document
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+EVENTS = ('start', 'end')
+''' The events iterparse can report '''
+
+def iterparse(source, events=('start', 'end'), tag=None, buffer_size=65536, **kwargs):
+    '''
+    Parse *source* incrementally, yielding (event, Element) pairs as the
+    elements are started and ended. The elements are built into a Document as
+    usual, so a finished subtree can be released by removing it from its
+    parent, keeping memory proportional to the depth of the document rather
+    than its size::
+
+        for event, el in iterparse('export.xml', events=('end',), tag='record'):
+            process(el)
+            el.parent.remove(el)
+
+    Events are handed out after each block of *buffer_size* bytes has been
+    parsed, so on a 'start' event the element has its attributes but may
+    already have some or all of its children. Only on the 'end' event is the
+    element guaranteed to be complete.
+
+    :param source: The path of the file to parse or a file object (or file-like)
+    :type source: str or os.PathLike or file
+    :param events: The events to report, any of 'start' and 'end'
+    :type events: tuple(str)
+    :param tag: The name or names of the elements to report. Defaults to all elements
+    :type tag: str or list[str] or None
+    :param int buffer_size: The number of bytes to read at a time
+    :param kwargs: Passed to the Document constructor
+    :rtype: generator of tuple(str, expatriate.Element)
+    '''
+    for event in events:
+        if event not in EVENTS:
+            raise ValueError('Unknown iterparse event: ' + str(event))
+
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from iterparse(f, events=events, tag=tag, buffer_size=buffer_size, **kwargs)
+        return
+
+    doc = Document(**kwargs)
+    doc._events = []
+    doc._event_types = tuple(events)
+    if tag is None:
+        doc._event_tags = None
+    elif isinstance(tag, str):
+        doc._event_tags = (tag,)
+    else:
+        doc._event_tags = frozenset(tag)
+
+    while True:
+        chunk = source.read(buffer_size)
+        if not chunk:
+            break
+        doc.feed(chunk)
+        yield from _drain(doc._events)
+    doc.close()
+    yield from _drain(doc._events)
+
+def _drain(pending):
+    # hand out the collected events without holding on to them
+    while len(pending) > 0:
+        batch = pending.copy()
+        pending.clear()
+        yield from batch
@@ -20,6 +20,7 @@ import logging
 
 from .exceptions import *
 from .Mapper import Mapper
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -87,8 +88,9 @@ class AttributeMapper(Mapper):
 
         setattr(model, attr_name, default_value)
 
-        logger.debug('Initialized ' + str(model) + ' attribute ' + attr_name
-            + ' to default ' + str(default_value))
+        if tracing.enabled:
+            logger.debug('Initialized ' + str(model) + ' attribute ' + attr_name
+                + ' to default ' + str(default_value))
 
     def get_namespace(self):
         if 'namespace' in self._kwargs:
@@ -109,15 +111,17 @@ class AttributeMapper(Mapper):
             (Model.ANY_NAMESPACE, Model.ANY_LOCAL_NAME)
         )
 
-        if matches:
-            logger.debug('AttributeMapper matches ' + str(attr))
-        else:
-            logger.debug('AttributeMapper does not match ' + str(attr))
+        if tracing.enabled:
+            if matches:
+                logger.debug('AttributeMapper matches ' + str(attr))
+            else:
+                logger.debug('AttributeMapper does not match ' + str(attr))
 
         return matches
 
     def parse_in(self, model, attr):
-        logger.debug('Parsing attribute ' + attr.name + ' using kwargs: ' + str(self._kwargs))
+        if tracing.enabled:
+            logger.debug('Parsing attribute ' + attr.name + ' using kwargs: ' + str(self._kwargs))
 
         name = self.get_attr_name()
         value = attr.value
@@ -128,8 +132,9 @@ class AttributeMapper(Mapper):
 
         # convert value
         if 'type' in self._kwargs:
-            logger.debug('Parsing ' + str(value) + ' as '
-                + str(self._kwargs['type']))
+            if tracing.enabled:
+                logger.debug('Parsing ' + str(value) + ' as '
+                    + str(self._kwargs['type']))
             type_ = self._kwargs['type']
             # load from a tuple (module_name, class_name) to defer class load
             if isinstance(type_, tuple):
@@ -137,13 +142,15 @@ class AttributeMapper(Mapper):
                 type_ = getattr(mod, type_[1])
             value = type_().parse_value(value)
 
-        logger.debug('Parsed attribute ' + name + ' = ' + str(value))
+        if tracing.enabled:
+            logger.debug('Parsed attribute ' + name + ' = ' + str(value))
 
         setattr(model, name, value)
 
     def validate(self, model):
         name = self.get_attr_name()
-        logger.debug('Validating attribute ' + str(self._kwargs))
+        if tracing.enabled:
+            logger.debug('Validating attribute ' + str(self._kwargs))
 
         name = self._kwargs['local_name']
 
@@ -181,8 +188,9 @@ class AttributeMapper(Mapper):
         if 'default' in self._kwargs and value == self._kwargs['default']:
             return
 
-        logger.debug(str(self) + ' producing ' + str(model) + ' attribute '
-            + name + ' according to ' + str(self._kwargs))
+        if tracing.enabled:
+            logger.debug(str(self) + ' producing ' + str(model) + ' attribute '
+                + name + ' according to ' + str(self._kwargs))
 
         if 'namespace' in self._kwargs:
             namespace = self._kwargs['namespace']
@@ -203,8 +211,9 @@ class AttributeMapper(Mapper):
             attr_name = local_name
 
         if 'type' in self._kwargs:
-            logger.debug(str(model) + ' Producing ' + str(value) + ' as '
-                + str(self._kwargs['type']) + ' type')
+            if tracing.enabled:
+                logger.debug(str(model) + ' Producing ' + str(value) + ' as '
+                    + str(self._kwargs['type']) + ' type')
             type_ = self._kwargs['type']()
             v = type_.produce_value(value)
 
@@ -219,8 +228,9 @@ class AttributeMapper(Mapper):
 
         else:
             # otherwise, we default to producing as string
-            logger.debug(str(model) + ' Producing ' + str(value)
-                + ' as String type')
+            if tracing.enabled:
+                logger.debug(str(model) + ' Producing ' + str(value)
+                    + ' as String type')
             type_ = StringType()
             v = type_.produce_value(value)
             el.attributes[attr_name] = v
@@ -21,6 +21,7 @@ from .. import CharacterData
 from ..Node import Node
 from .exceptions import *
 from .Mapper import Mapper
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -54,5 +55,6 @@ class ContentMapper(Mapper):
 
     def produce_in(self, el, model, id_):
         from .Model import Model
-        logger.debug(str(self) + ' producing ' + str(id_) + ' in ' + str(el))
+        if tracing.enabled:
+            logger.debug(str(self) + ' producing ' + str(id_) + ' in ' + str(el))
         el.children.append(CharacterData(str(id_)))
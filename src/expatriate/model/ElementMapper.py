@@ -23,6 +23,7 @@ from .. import CharacterData, Element
 from ..publishsubscribe import PublishingDict, PublishingList
 from .exceptions import *
 from .Mapper import Mapper
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -125,7 +126,8 @@ class ElementMapper(Mapper):
 
         # initialze the attr if it doesn't exist
         if not hasattr(model, name):
-            logger.debug('Initializing ' + str(self) + ' '+ name + ' to ' + str(value))
+            if tracing.enabled:
+                logger.debug('Initializing ' + str(self) + ' '+ name + ' to ' + str(value))
             setattr(model, name, value)
 
     def get_namespace(self):
@@ -143,7 +145,8 @@ class ElementMapper(Mapper):
         name = self.get_attr_name()
         attr = getattr(model, name)
 
-        logger.debug('Looking for reference ' + ref + ' in ' + name + ' of ' + str(model))
+        if tracing.enabled:
+            logger.debug('Looking for reference ' + ref + ' in ' + name + ' of ' + str(model))
 
         if isinstance(attr, list):
             for child in attr:
@@ -178,10 +181,11 @@ class ElementMapper(Mapper):
             (Model.ANY_NAMESPACE, Model.ANY_LOCAL_NAME)
         )
 
-        if matches:
-            logger.debug(str(self) + str((namespace, self.get_local_name())) + ' matches ' + str(el))
-        else:
-            logger.debug(str(self) + str((namespace, self.get_local_name())) + ' does not match ' + str(el))
+        if tracing.enabled:
+            if matches:
+                logger.debug(str(self) + str((namespace, self.get_local_name())) + ' matches ' + str(el))
+            else:
+                logger.debug(str(self) + str((namespace, self.get_local_name())) + ' does not match ' + str(el))
 
         return matches
 
@@ -203,16 +207,19 @@ class ElementMapper(Mapper):
     def parse_in(self, model, el):
         from .Model import Model
 
-        logger.debug('Parsing element ' + el.name + ' using kwargs: ' + str(self._kwargs))
+        if tracing.enabled:
+            logger.debug('Parsing element ' + el.name + ' using kwargs: ' + str(self._kwargs))
 
         name = self.get_attr_name()
 
         if 'ignore' in self._kwargs and self._kwargs['ignore'] == True:
-            logger.debug('Ignoring ' + name + ' element in ' + str(model))
+            if tracing.enabled:
+                logger.debug('Ignoring ' + name + ' element in ' + str(model))
             return
 
         if self._kwargs['local_name'] == Model.ANY_LOCAL_NAME:
-            logger.debug(str(model) + ' parsing elements matching * into ' + name)
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing elements matching * into ' + name)
 
             lst = getattr(model, name)
 
@@ -229,10 +236,12 @@ class ElementMapper(Mapper):
 
             lst.append(value)
 
-            logger.debug('Appended ' + str(value) + ' to ' + name)
+            if tracing.enabled:
+                logger.debug('Appended ' + str(value) + ' to ' + name)
 
         elif 'list' in self._kwargs:
-            logger.debug(str(model) + ' parsing ' + str(el) + ' elements into ' + name)
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing ' + str(el) + ' elements into ' + name)
 
             lst = getattr(model, name)
 
@@ -250,10 +259,12 @@ class ElementMapper(Mapper):
 
             lst.append(value)
 
-            logger.debug('Appended ' + str(value) + ' to ' + name)
+            if tracing.enabled:
+                logger.debug('Appended ' + str(value) + ' to ' + name)
 
         elif 'dict' in self._kwargs:
-            logger.debug(str(model) + ' parsing ' + str(el) + ' elements into ' + name)
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing ' + str(el) + ' elements into ' + name)
 
             dict_ = getattr(model, name)
 
@@ -304,11 +315,13 @@ class ElementMapper(Mapper):
 
             dict_[key] = value
 
-            logger.debug('Mapped ' + str(key) + ' to ' + str(value) + ' in ' + name)
+            if tracing.enabled:
+                logger.debug('Mapped ' + str(key) + ' to ' + str(value) + ' in ' + name)
 
         elif 'cls' in self._kwargs:
-            logger.debug(str(model) + ' parsing ' + str(el) + ' element as '
-                + str(self._kwargs['cls']))
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing ' + str(el) + ' element as '
+                    + str(self._kwargs['cls']))
 
             if el.is_nil():
                 # check we can accept nil
@@ -320,12 +333,14 @@ class ElementMapper(Mapper):
 
             setattr(model, name, value)
 
-            logger.debug('Set attribute ' + str(name) + ' to ' + str(value)
-                + ' in ' + str(model))
+            if tracing.enabled:
+                logger.debug('Set attribute ' + str(name) + ' to ' + str(value)
+                    + ' in ' + str(model))
 
         elif 'type' in self._kwargs:
-            logger.debug(str(model) + ' parsing ' + str(el) + ' elements as '
-                + self._kwargs['type'])
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing ' + str(el) + ' elements as '
+                    + self._kwargs['type'])
 
             if el.is_nil():
                 # check we can accept nil
@@ -343,12 +358,14 @@ class ElementMapper(Mapper):
 
             setattr(model, name, value)
 
-            logger.debug('Set attribute ' + str(name) + ' to ' + str(value)
-                + ' in ' + str(model))
+            if tracing.enabled:
+                logger.debug('Set attribute ' + str(name) + ' to ' + str(value)
+                    + ' in ' + str(model))
 
         elif 'enum' in self._kwargs:
-            logger.debug(str(model) + ' parsing ' + str(el)
-                + ' elements from enum ' + str(self._kwargs['enum']))
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing ' + str(el)
+                    + ' elements from enum ' + str(self._kwargs['enum']))
 
             value = el.get_string_value()
             if value not in self._kwargs['enum']:
@@ -357,12 +374,14 @@ class ElementMapper(Mapper):
 
             setattr(model, name, value)
 
-            logger.debug('Set enum attribute ' + str(name) + ' to '
-                + str(value) + ' in ' + str(model))
+            if tracing.enabled:
+                logger.debug('Set enum attribute ' + str(name) + ' to '
+                    + str(value) + ' in ' + str(model))
 
         elif 'pattern' in self._kwargs:
-            logger.debug(str(model) + ' parsing ' + str(el)
-                + ' elements from pattern ' + str(self._kwargs['pattern']))
+            if tracing.enabled:
+                logger.debug(str(model) + ' parsing ' + str(el)
+                    + ' elements from pattern ' + str(self._kwargs['pattern']))
 
             value = el.get_string_value()
             if re.match(self._kwargs['pattern'], value) is None:
@@ -371,8 +390,9 @@ class ElementMapper(Mapper):
 
             setattr(model, name, value)
 
-            logger.debug('Set pattern attribute ' + str(name) + ' to '
-                + str(value) + ' in ' + str(model))
+            if tracing.enabled:
+                logger.debug('Set pattern attribute ' + str(name) + ' to '
+                    + str(value) + ' in ' + str(model))
 
         else:
             raise UnknownElementException(str(model) + ' could not parse '
@@ -453,8 +473,9 @@ class ElementMapper(Mapper):
         else:
             value = attr[id_]
 
-        logger.debug(str(self) + ' producing ' + str(model) + ' element '
-            + name  + str([id_]) + ' according to ' + str(self._kwargs))
+        if tracing.enabled:
+            logger.debug(str(self) + ' producing ' + str(model) + ' element '
+                + name  + str([id_]) + ' according to ' + str(self._kwargs))
 
         if hasattr(value, '_namespace') and value._namespace is not None:
             namespace = value._namespace
@@ -27,6 +27,7 @@ from ..exceptions import *
 from ..publishsubscribe import Subscriber
 from .decorators import *
 from .exceptions import *
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -162,8 +163,9 @@ class Model(Subscriber):
             for cls_ in reversed(cls.__mro__):
                 if issubclass(cls_, Model):
                     try:
-                        logger.debug('Adding attribute mappers from superclass '
-                            + cls_.__name__)
+                        if tracing.enabled:
+                            logger.debug('Adding attribute mappers from superclass '
+                                + cls_.__name__)
                         mappers.extend(cls_._attribute_mappers[cls_.__name__])
                     except KeyError:
                         pass
@@ -205,8 +207,9 @@ class Model(Subscriber):
             for cls_ in reversed(cls.__mro__):
                 if issubclass(cls_, Model):
                     try:
-                        logger.debug('Adding element mappers from superclass '
-                            + cls_.__name__)
+                        if tracing.enabled:
+                            logger.debug('Adding element mappers from superclass '
+                                + cls_.__name__)
                         mappers.extend(cls_._element_mappers[cls_.__name__])
                     except KeyError:
                         pass
@@ -272,8 +275,9 @@ class Model(Subscriber):
             for cls_ in reversed(cls.__mro__):
                 if issubclass(cls_, Model):
                     try:
-                        logger.debug('Adding content mappers from superclass '
-                            + cls_.__name__)
+                        if tracing.enabled:
+                            logger.debug('Adding content mappers from superclass '
+                                + cls_.__name__)
                         mappers.extend(cls_._content_mappers[cls_.__name__])
                     except KeyError:
                         pass
@@ -322,8 +326,9 @@ class Model(Subscriber):
         :param str model_package: The package to lookup
         :raises UnknownNamespaceException: if the package isn't registered
         '''
-        logger.debug('Looking for xml namespace for model package '
-            + model_package)
+        if tracing.enabled:
+            logger.debug('Looking for xml namespace for model package '
+                + model_package)
         if model_package not in Model.__package_to_namespace:
             raise UnknownNamespaceException('Package ' + model_package
                 + ' is not in registered packages')
@@ -338,7 +343,8 @@ class Model(Subscriber):
         :param str namespace: The namespace to lookup
         :raises UnknownNamespaceException: if the namspace isn't registered
         '''
-        logger.debug('Looking for model package for xml namespace ' + str(namespace))
+        if tracing.enabled:
+            logger.debug('Looking for model package for xml namespace ' + str(namespace))
         if namespace not in Model.__namespace_to_package:
             raise UnknownNamespaceException('XML namespace ' + str(namespace)
                 + ' is not in registered namespaces')
@@ -353,7 +359,8 @@ class Model(Subscriber):
         :param str namespace: The namespace to lookup
         :raises UnknownNamespaceException: if the namspace isn't registered
         '''
-        logger.debug('Looking for xml prefix for xml namespace ' + str(namespace))
+        if tracing.enabled:
+            logger.debug('Looking for xml prefix for xml namespace ' + str(namespace))
 
         prefix = None
 
@@ -363,8 +370,9 @@ class Model(Subscriber):
             prefix = 'ns' + str(Model._ns_count)
             Model._ns_count += 1
 
-            logger.info(pkg_mod.__name__
-                + ' did not register prefix; generated: ' + prefix)
+            if tracing.enabled:
+                logger.info(pkg_mod.__name__
+                    + ' did not register prefix; generated: ' + prefix)
         except:
             raise UnknownNamespaceException('Unable to determine prefix for '
                 + namespace + ' namespace')
@@ -398,13 +406,15 @@ class Model(Subscriber):
 
             class_ = Model.class_for_element(el)
         else:
-            logger.debug('Checking ' + parent.__class__.__name__
-                + ' for element ' + str(el))
+            if tracing.enabled:
+                logger.debug('Checking ' + parent.__class__.__name__
+                    + ' for element ' + str(el))
 
             for mapper in parent._get_element_mappers():
                 if mapper.matches(el, parent):
-                    logger.debug(str(el) + ' matched ' + str(mapper)
-                        + ' in ' + parent.__class__.__name__)
+                    if tracing.enabled:
+                        logger.debug(str(el) + ' matched ' + str(mapper)
+                            + ' in ' + parent.__class__.__name__)
                     class_ = mapper.class_for_element(el, parent)
                     break
             else:
@@ -412,7 +422,8 @@ class Model(Subscriber):
                     + ' does not define mapping for '
                     + str(el) + ' element')
 
-        logger.debug('Loaded class ' + str(class_) + ' for ' + str(el))
+        if tracing.enabled:
+            logger.debug('Loaded class ' + str(class_) + ' for ' + str(el))
 
         # instantiate an instance of the class & load it
         inst = class_()
@@ -602,7 +613,8 @@ class Model(Subscriber):
         :rtype: .Model
         '''
 
-        logger.debug('Matching reference ' + ref + ' against ' + str(self))
+        if tracing.enabled:
+            logger.debug('Matching reference ' + ref + ' against ' + str(self))
 
         try:
             if self.id == ref:
@@ -634,9 +646,10 @@ class Model(Subscriber):
         self._namespace = el.namespace
         self._prefix = el.prefix
 
-        logger.debug('Parsing ' + str(el) + ' element into '
-            + self.__class__.__module__ + '.' + self.__class__.__name__
-            + ' class')
+        if tracing.enabled:
+            logger.debug('Parsing ' + str(el) + ' element into '
+                + self.__class__.__module__ + '.' + self.__class__.__name__
+                + ' class')
 
         for name, attr in el.attribute_nodes.items():
             for mapper in self._get_attribute_mappers():
@@ -674,7 +687,8 @@ class Model(Subscriber):
         :rtype: expatriate.Element
         '''
 
-        logger.debug(str(self) + ' to xml')
+        if tracing.enabled:
+            logger.debug(str(self) + ' to xml')
 
         at_mappers = self._get_attribute_mappers()
         el_mappers = self._get_element_mappers()
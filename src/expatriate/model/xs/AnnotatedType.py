@@ -22,6 +22,7 @@ from ..decorators import *
 from .AnnotationElement import AnnotationElement
 from .AnyTypeType import AnyTypeType
 from .IdType import IdType
+from ... import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -58,7 +59,8 @@ class AnnotatedType(AnyTypeType):
             model_map['elements'].extend(defs['elements'])
             model_map['attributes'].update(defs['attributes'])
 
-        logger.debug('Stubbing ' + str(self) + ' to ' + class_name + '.py')
+        if tracing.enabled:
+            logger.debug('Stubbing ' + str(self) + ' to ' + class_name + '.py')
 
         with open(os.path.join(path, class_name + '.py'), 'w') as f:
             f.write(STUB_HEADER)
@@ -31,6 +31,7 @@ from .NonNegativeIntegerType import NonNegativeIntegerType
 from .QNameType import QNameType
 from .SimpleTypeType import SimpleTypeType
 from .StringType import StringType
+from ... import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -93,7 +94,8 @@ class ElementType(AnnotatedType):
         e['tag_name'] = self.name
 
         model_map['elements'].append(e)
-        logger.debug('Adding element ' + str(e))
+        if tracing.enabled:
+            logger.debug('Adding element ' + str(e))
 
         for t in self.tags:
             defs = t.get_defs(schema, top_level)
@@ -27,6 +27,7 @@ from .QNameType import QNameType
 from .TotalDigitsElement import TotalDigitsElement
 from .WhitespaceElement import WhitespaceElement
 from .WildcardType import WildcardType
+from ... import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -62,7 +63,8 @@ logger.setLevel(logging.INFO)
 @element(local_name='anyAttribute', list='tags', cls=WildcardType, min=0)
 class RestrictionType(AnnotatedType):
     def get_defs(self, schema, top_level):
-        logger.debug('Base: ' + self.base)
+        if tracing.enabled:
+            logger.debug('Base: ' + self.base)
         # TODO unable to map xmlns because ET doesn't retain it
         base_ns, base_name = [self.base.partition(':')[i] for i in [0,2]]
         top_level.set_super_module(base_ns)
@@ -35,6 +35,7 @@ from .NotationElement import NotationElement
 from .RedefineElement import RedefineElement
 from .SimpleTypeType import SimpleTypeType
 from .TokenType import TokenType
+from ... import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -79,4 +80,5 @@ class SchemaElement(AnyTypeType):
                 f.write("    '{" + self.targetNamespace + '}' + name + "': '" + self._tag_mapping[name] + "',\n")
             f.write('}\n\n')
 
-        logger.debug('Wrote __init__.py')
+        if tracing.enabled:
+            logger.debug('Wrote __init__.py')
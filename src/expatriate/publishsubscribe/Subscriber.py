@@ -21,6 +21,8 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class Subscriber(object):
+    __slots__ = ()
+
     def _data_added(self, publisher, id_, item):
         '''
         Notification received from a Publisher when data has been added.
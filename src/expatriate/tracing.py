@@ -0,0 +1,54 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+enabled = False
+''' True if debug tracing has been switched on with set_tracing '''
+
+_levels = {}
+# levels the expatriate loggers had before tracing was switched on
+
+def set_tracing(enable=True):
+    '''
+    Switch debug tracing of the parser, XPath evaluation and model mapping on
+    or off. While it is off the debug messages are never built, whatever the
+    logging configuration, so tracing costs nothing. Switching it on also sets
+    the expatriate loggers to DEBUG; switching it off restores the levels they
+    had before, or INFO for loggers created while tracing was on.
+
+    :param bool enable: True to switch tracing on
+    '''
+    global enabled
+    enable = bool(enable)
+
+    for name, logger in list(logging.Logger.manager.loggerDict.items()):
+        if not isinstance(logger, logging.Logger):
+            continue
+        if name != __package__ and not name.startswith(__package__ + '.'):
+            continue
+
+        if enable:
+            if not enabled:
+                _levels[name] = logger.level
+            logger.setLevel(logging.DEBUG)
+        else:
+            logger.setLevel(_levels.get(name, logging.INFO))
+
+    if not enable:
+        _levels.clear()
+    enabled = enable
@@ -30,5 +30,10 @@ class AnyNodeTest(NodeTest):
     def evaluate(self, context_node, context_position, context_size, variables):
         return context_node.get_type() == self._prinicpal_node_type
 
+    def _postings(self, index):
+        if self._prinicpal_node_type == 'element':
+            return index.elements()
+        return None
+
     def __str__(self):
         return 'AnyNodeTest ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -15,68 +15,70 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
 
+import itertools
 import logging
+import math
 
+from .NodeSet import NodeSet
 from .NodeTest import NodeTest
 from .Predicate import Predicate
+from .TypeNodeTest import TypeNodeTest
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class Axis(object):
+    # each axis yields its nodes in the axis' direction: document order for
+    # forward axes and reverse document order for reverse axes
+
     def a_ancestor(node):
-        ns = []
-        while(node._parent is not None):
-            ns.append(node._parent)
+        while node._parent is not None:
             node = node._parent
-        return ns
+            yield node
 
     def a_ancestor_or_self(node):
-        ns = [node]
-        ns.extend(Axis.a_ancestor(node))
-        return ns
+        yield node
+        yield from Axis.a_ancestor(node)
 
     def a_attribute(node):
         if hasattr(node, 'attribute_nodes'):
-            return list(node.attribute_nodes.values())
-        else:
-            return []
+            # attribute nodes are ordered by name
+            for k in sorted(node.attribute_nodes.keys()):
+                yield node.attribute_nodes[k]
 
     def a_child(node):
         if hasattr(node, 'children'):
-            return node.children.copy()
-        else:
-            return []
+            yield from node.children
 
     def a_descendant(node):
-        logger.debug('Collecting descendants of ' + str(node))
-        if not hasattr(node, 'children') or len(node.children) == 0:
-            logger.debug(str(node) + ' has no children')
-            return []
-        else:
-            ns = []
-            for n in node.children:
-                ns.append(n)
-                ns.extend(Axis.a_descendant(n))
-            logger.debug(str(node) + ' descendants: [' + ','.join([str(x) for x in ns]) + ']')
-            return ns
+        if tracing.enabled:
+            logger.debug('Collecting descendants of ' + str(node))
+        if not hasattr(node, 'children'):
+            return
+
+        stack = [iter(node.children)]
+        while len(stack) > 0:
+            for n in stack[-1]:
+                yield n
+                if hasattr(n, 'children') and len(n.children) > 0:
+                    # descend before moving on to n's next sibling
+                    stack.append(iter(n.children))
+                    break
+            else:
+                stack.pop()
 
     def a_descendant_or_self(node):
-        ns = [node]
-        ns.extend(Axis.a_descendant(node))
-        return ns
+        yield node
+        yield from Axis.a_descendant(node)
 
     def a_namespace(node):
         if hasattr(node, 'namespace_nodes'):
-            return list(node.namespace_nodes.values())
-        else:
-            return []
+            yield from node.namespace_nodes.values()
 
     def a_parent(node):
         if node._parent is not None:
-            return [node._parent]
-        else:
-            return []
+            yield node._parent
 
     def a_following_sibling(node):
         from ..Attribute import Attribute
@@ -84,27 +86,23 @@ class Axis(object):
         if isinstance(node, Attribute) \
         or isinstance(node, Namespace) \
         or node._parent is None:
-            return []
+            return
 
-        ns = []
         # figure out our index then go through children > our index
-        node_i = node._parent.children.index(node) + 1
-        for n in node._parent.children[node_i:]:
-            ns.append(n)
-        return ns
+        siblings = node._parent.children
+        for i in range(node._parent._child_index(node) + 1, len(siblings)):
+            yield siblings[i]
 
     def a_following(node):
         from ..Attribute import Attribute
         from ..Namespace import Namespace
         if isinstance(node, Attribute) \
         or isinstance(node, Namespace):
-            return []
+            return
 
-        ns = []
         while node is not None:
-            ns.extend(Axis.a_following_sibling(node))
+            yield from Axis.a_following_sibling(node)
             node = node._parent
-        return ns
 
     def a_preceding_sibling(node):
         from ..Attribute import Attribute
@@ -112,31 +110,32 @@ class Axis(object):
         if isinstance(node, Attribute) \
         or isinstance(node, Namespace) \
         or node._parent is None:
-            return []
+            return
 
-        ns = []
-        # figure out our index then go through children < our index
-        node_i = node._parent.children.index(node)
-        for n in reversed(node._parent.children[:node_i]):
-            ns.append(n)
-        return ns
+        # figure out our index then go back through children < our index
+        siblings = node._parent.children
+        for i in range(node._parent._child_index(node) - 1, -1, -1):
+            yield siblings[i]
 
     def a_preceding(node):
         from ..Attribute import Attribute
         from ..Namespace import Namespace
         if isinstance(node, Attribute) \
         or isinstance(node, Namespace):
-            return []
+            return
 
-        ns = []
         while node is not None:
-            logger.debug('Extending nodeset with ' + str(node) + ' preceding siblings')
-            ns.extend(Axis.a_preceding_sibling(node))
+            if tracing.enabled:
+                logger.debug('Extending nodeset with ' + str(node) + ' preceding siblings')
+            yield from Axis.a_preceding_sibling(node)
             if node._parent is not None:
-                logger.debug('Appending parent of ' + str(node) + ': ' + str(node._parent))
-                ns.append(node._parent)
+                if tracing.enabled:
+                    logger.debug('Appending parent of ' + str(node) + ': ' + str(node._parent))
+                yield node._parent
             node = node._parent
-        return ns
+
+    def a_self(node):
+        yield node
 
     AXES = {
         'ancestor': a_ancestor,
@@ -151,7 +150,7 @@ class Axis(object):
         'parent': a_parent,
         'preceding': a_preceding,
         'preceding-sibling': a_preceding_sibling,
-        'self': lambda node: [node],
+        'self': a_self,
     }
 
     PRINCIPAL_NODE_TYPE = {
@@ -189,9 +188,28 @@ class Axis(object):
     def __init__(self, name):
         self.name = name
         self.children = []
+        self._batched = None
 
     def evaluate(self, context_node, context_position, context_size, variables):
-        from ..Document import Document
+        return self._select(self.name, context_node, variables)
+
+    def iterate(self, context_node, context_position, context_size, variables):
+        '''
+        Select the nodes of this step lazily.
+
+        :rtype: iterator of expatriate.Node, in document order if is_ordered() is True
+        '''
+        return self._iterate(self.name, context_node, variables)
+
+    def is_ordered(self):
+        '''
+        Check if iterate() yields nodes in document order.
+
+        :rtype: bool
+        '''
+        return Axis.AXIS_DIRECTION[self.name] == 'forward'
+
+    def _check(self):
         if len(self.children) <= 0:
             raise ValueError('Axis missing NodeTest')
         for i, child in enumerate(self.children):
@@ -200,29 +218,208 @@ class Axis(object):
             elif i > 0 and not isinstance(child, Predicate):
                 raise ValueError('Axis children past the first must be predicates: ' + str(child))
 
-        nodeset = Axis.AXES[self.name](context_node)
-        if len(nodeset) == 0:
-            return nodeset
-
-        logger.debug('Initial nodeset: [' + ','.join([str(x) for x in nodeset]) + ']')
-        for c in self.children:
-            ns = []
-            for i, n in enumerate(nodeset):
-                # logger.debug('Testing ' + str(nodeset[i]) + ' against ' + str(c))
-                if c.evaluate(n, i+1, len(nodeset), variables):
-                    # logger.debug(str(nodeset[i]) + ' passed ' + str(c))
-                    ns.append(n)
-                # else:
-                #     logger.debug(str(nodeset[i]) + ' failed ' + str(c))
-            nodeset = ns
-        if Axis.AXIS_DIRECTION[self.name] == 'forward':
-            nodeset = Document.order_sort(nodeset)
+    def _select(self, axis, context_node, variables, evaluators=None):
+        # select the nodes along the named axis that pass the node test and
+        # predicates; they come out in the axis' direction, so forward axes
+        # are in document order without sorting
+        nodes = self._iterate(axis, context_node, variables, evaluators, batch=True)
+        if Axis.AXIS_DIRECTION[axis] == 'forward':
+            nodeset = NodeSet(nodes, ordered=True)
         else:
-            nodeset = Document.order_sort(nodeset, reverse=True)
-        logger.debug('Final nodeset: [' + ','.join([str(x) for x in nodeset]) + ']')
+            nodeset = NodeSet(nodes)
+        if tracing.enabled:
+            logger.debug('Final nodeset: [' + ','.join([str(x) for x in nodeset]) + ']')
 
         return nodeset
 
+    def _iterate(self, axis, context_node, variables, evaluators=None, batch=False):
+        # chain the node test & predicates onto the axis' nodes, pulling
+        # from the axis only as far as the consumer does; evaluators, if
+        # given, stand in for the evaluate methods of the children, which
+        # have then already been checked. If batch is True, the consumer
+        # takes every node, so predicates may be applied a nodeset at a time
+        if evaluators is None:
+            self._check()
+            evaluators = [c.evaluate for c in self.children]
+
+        nodes, start = self._positional_scan(axis, context_node)
+        if nodes is None:
+            nodes, start = self._index_scan(axis, context_node)
+        if nodes is None:
+            nodes = Axis.AXES[axis](context_node)
+            start = 0
+
+        if batch:
+            if self._batched is None:
+                self._batched = Axis._batch_start(self.children)
+            batched = self._batched
+        else:
+            batched = len(self.children)
+        for i in range(start, len(self.children)):
+            nodes = Axis._filter(self.children[i], nodes, context_node, variables, evaluators[i], i >= batched)
+        return nodes
+
+    @staticmethod
+    def _batch_start(children):
+        # the index of the first of children that sees every node; a later
+        # [n] stops pulling nodes once it has its node, so the predicates
+        # before it only see as many as it needs
+        start = 0
+        for i, c in enumerate(children):
+            if isinstance(c, Predicate) and c._literal_position() is not None:
+                start = i + 1
+        return start
+
+    @staticmethod
+    def _filter(c, nodes, context_node, variables, evaluate, batch=False):
+        # the nodes passing node test or predicate c, evaluated by evaluate
+        # or, if batch is True and c can be, a nodeset at a time
+        size = None
+        if isinstance(c, Predicate):
+            matches = c._index_matches(context_node)
+            if matches is not None:
+                # the predicate doesn't depend on position, so membership in
+                # the index's answer is all that matters
+                ids = set([id(n) for n in matches])
+                return (n for n in nodes if id(n) in ids)
+
+            position = c._literal_position()
+            if position is not None:
+                return Axis._nth(nodes, position)
+
+            if c._is_last():
+                return Axis._last(nodes)
+
+            if c._uses_last():
+                # the size of the nodeset is needed, so it has to be collected
+                nodes = list(nodes)
+                size = len(nodes)
+
+            mask = c._batch() if batch else None
+            if mask is not None:
+                if not isinstance(nodes, list):
+                    nodes = list(nodes)
+                selected = mask.mask(nodes, context_node, variables)
+                if selected is not None:
+                    return itertools.compress(nodes, selected)
+
+        return Axis._test(evaluate, nodes, size, variables)
+
+    @staticmethod
+    def _test(evaluate, nodes, size, variables):
+        for i, n in enumerate(nodes):
+            if evaluate(n, i+1, size, variables):
+                yield n
+
+    @staticmethod
+    def _nth(nodes, position):
+        # only the node at position can pass, so stop once it's found
+        index = Axis._index(position)
+        if index is None:
+            return
+        for n in itertools.islice(nodes, index, None):
+            yield n
+            return
+
+    @staticmethod
+    def _index(position):
+        # the list index of a literal position, None if no node can be there
+        if math.isnan(position) or math.isinf(position) \
+        or position != int(position) or position < 1:
+            return None
+        return int(position) - 1
+
+    @staticmethod
+    def _last(nodes):
+        # only the last node can pass, so nothing else needs keeping
+        last = None
+        for n in nodes:
+            last = n
+        if last is not None:
+            yield last
+
+    def _positional_scan(self, axis, context_node):
+        # the child axis is a list, so [n] and [last()] can pick their node
+        # out of it directly, returning them along with the index of the
+        # first child still to be applied; (None, None) if the first
+        # predicate isn't positional
+        if axis != 'child' \
+        or len(self.children) < 2 \
+        or not hasattr(context_node, 'children'):
+            return None, None
+
+        test = self.children[0]
+        c = self.children[1]
+        if c._is_last():
+            for n in reversed(context_node.children):
+                if test.evaluate(n, 1, 1, None):
+                    return [n], 2
+            return [], len(self.children)
+
+        position = c._literal_position()
+        if position is None \
+        or not isinstance(test, TypeNodeTest) \
+        or test.name != 'node':
+            return None, None
+        index = Axis._index(position)
+        if index is None:
+            return [], len(self.children)
+        return context_node.children[index:index + 1], 2
+
+    def _index_scan(self, axis, context_node):
+        # select the nodes along the axis using the document's indexes,
+        # returning them in document order along with the index of the first
+        # child still to be applied; (None, None) if the indexes can't be
+        # used
+        from ..Document import Document
+        from ..Parent import Parent
+        from ..StructureIndex import StructureIndex
+
+        if axis not in ('child', 'descendant', 'descendant-or-self') \
+        or not isinstance(context_node, Parent) \
+        or context_node._order is None:
+            return None, None
+
+        try:
+            if len(self.children) > 1:
+                # an attribute index narrows things down the most
+                matches = self.children[1]._index_matches(context_node)
+                if matches is not None:
+                    if axis == 'child':
+                        nodeset = [n for n in matches if n._parent is context_node]
+                    else:
+                        lo = context_node._order
+                        hi = context_node._last_order()
+                        if axis == 'descendant':
+                            nodeset = [n for n in matches if n._order is not None and lo < n._order <= hi]
+                        else:
+                            nodeset = [n for n in matches if n._order is not None and lo <= n._order <= hi]
+                    test = self.children[0]
+                    nodeset = [n for n in nodeset if test.evaluate(n, 1, 1, None)]
+                    NodeSet.sorts += 1
+                    return Document.order_sort(nodeset), 2
+
+            if axis == 'child':
+                return None, None
+
+            doc = context_node.get_document()
+            if doc is None:
+                return None, None
+            index = doc.get_structure_index()
+            if index is None:
+                return None, None
+            postings = self.children[0]._postings(index)
+            if postings is None:
+                return None, None
+
+            if tracing.enabled:
+                logger.debug('Scanning structure index for descendants of ' + str(context_node))
+            nodeset = StructureIndex.descendants(context_node, postings, axis == 'descendant-or-self')
+            return nodeset, 1
+        except TypeError:
+            # some node in the subtree hasn't been labelled
+            return None, None
+
     def get_principal_node_type(self):
         return Axis.PRINCIPAL_NODE_TYPE[self.name]
 
@@ -0,0 +1,389 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import logging
+
+from .Axis import Axis
+from .exceptions import *
+from .Expression import Expression
+from .Function import Function
+from .HoistedExpression import HoistedExpression
+from .Literal import Literal
+from .NodeSet import NodeSet
+from .Operator import Operator
+from .Predicate import Predicate
+from .RootStep import RootStep
+from .Step import Step
+from .VariableReference import VariableReference
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class ClosureCompiler(object):
+    '''
+    Compiles the tree of an expression into nested Python closures. Each
+    closure takes (context_node, context_position, context_size, variables)
+    like the evaluate methods of the tree and returns the same value, but
+    the checks of the tree's shape, the lookups of operators and functions
+    and, where the type of an operand is known before evaluation, its
+    conversion are done once when compiling rather than on every call.
+
+    :param wrap: Called with each node of the tree and its closure, returning the closure to use in its place
+    :type wrap: function(node, closure) or None
+    '''
+
+    RETURN_TYPES = {
+        'last': 'number',
+        'position': 'number',
+        'count': 'number',
+        'local-name': 'string',
+        'name': 'string',
+        'string': 'string',
+        'concat': 'string',
+        'starts-with': 'boolean',
+        'contains': 'boolean',
+        'substring-before': 'string',
+        'substring-after': 'string',
+        'substring': 'string',
+        'string-length': 'number',
+        'normalize-space': 'string',
+        'translate': 'string',
+        'boolean': 'boolean',
+        'not': 'boolean',
+        'true': 'boolean',
+        'false': 'boolean',
+        'number': 'number',
+        'sum': 'number',
+        'floor': 'number',
+        'ceiling': 'number',
+        'round': 'number',
+    }
+    ''' Type of the value of each core function that always returns one type '''
+
+    ARITHMETIC_OPERATORS = ('*', '+', '-', 'div', 'mod')
+
+    def __init__(self, wrap=None):
+        self._wrap = wrap
+
+    def compile(self, node):
+        '''
+        Compile the tree of an expression.
+
+        :param node: The root of the tree
+        :rtype: function(context_node, context_position, context_size, variables)
+        '''
+        if tracing.enabled:
+            logger.debug('Compiling ' + str(node))
+        f = getattr(self, '_compile_' + type(node).__name__)(node)
+        if self._wrap is not None:
+            f = self._wrap(node, f)
+        return f
+
+    def _type(self, node):
+        # the type of node's value, if it's known before evaluation:
+        # nodeset, boolean, number or string; None otherwise
+        if isinstance(node, Literal):
+            if isinstance(node.value, bool):
+                return 'boolean'
+            elif isinstance(node.value, str):
+                return 'string'
+            elif isinstance(node.value, (int, float)):
+                return 'number'
+        elif isinstance(node, (Axis, Step)):
+            return 'nodeset'
+        elif isinstance(node, HoistedExpression):
+            return self._type(node.children[0])
+        elif isinstance(node, Expression):
+            if len(node.children) > 1:
+                return 'nodeset'
+            return self._type(node.children[0])
+        elif isinstance(node, Operator):
+            if node.op == '|':
+                return 'nodeset'
+            elif node.op == 'negate':
+                # negating a boolean gives a boolean
+                if self._type(node.children[0]) in ('number', 'string'):
+                    return 'number'
+            elif node.op in ClosureCompiler.ARITHMETIC_OPERATORS:
+                return 'number'
+            else:
+                return 'boolean'
+        elif isinstance(node, Function):
+            if node.function is Function.FUNCTIONS.get(node.name):
+                return ClosureCompiler.RETURN_TYPES.get(node.name)
+        return None
+
+    def _to_boolean(self, f, type_):
+        if type_ == 'boolean':
+            return f
+        def to_boolean(context_node, context_position, context_size, variables):
+            return Function.f_boolean((f(context_node, context_position, context_size, variables),),
+                context_node, context_position, context_size, variables)
+        return to_boolean
+
+    def _to_number(self, f, type_):
+        if type_ == 'number':
+            return f
+        def to_number(context_node, context_position, context_size, variables):
+            return Function.f_number((f(context_node, context_position, context_size, variables),),
+                context_node, context_position, context_size, variables)
+        return to_number
+
+    def _to_string(self, f, type_):
+        if type_ == 'string':
+            return f
+        def to_string(context_node, context_position, context_size, variables):
+            return Function.f_string((f(context_node, context_position, context_size, variables),),
+                context_node, context_position, context_size, variables)
+        return to_string
+
+    def _compile_Literal(self, node):
+        value = node.value
+        def literal(context_node, context_position, context_size, variables):
+            return value
+        return literal
+
+    def _compile_VariableReference(self, node):
+        return node.evaluate
+
+    def _compile_HoistedExpression(self, node):
+        child = self.compile(node.children[0])
+        # kept in the evaluation's own variables dict, as HoistedExpression does
+        key = id(node)
+        def hoisted(context_node, context_position, context_size, variables):
+            if key in variables:
+                return variables[key]
+            v = child(context_node, context_position, context_size, variables)
+            variables[key] = v
+            return v
+        return hoisted
+
+    def _compile_Expression(self, node):
+        if len(node.children) == 1:
+            return self.compile(node.children[0])
+
+        primary = self.compile(node.children[0])
+        evaluators = [self.compile(c) for c in node.children[1:]]
+        def filter_(context_node, context_position, context_size, variables):
+            return node._filter(primary(context_node, context_position, context_size, variables),
+                context_node, variables, evaluators)
+        return filter_
+
+    SIMPLE_AXES = ('attribute', 'child', 'parent', 'self')
+    ''' Axes that nothing but a walk along them is used for, without predicates '''
+
+    def _compile_Axis(self, node):
+        node._check()
+        name = node.name
+        if len(node.children) == 1 and name in ClosureCompiler.SIMPLE_AXES:
+            along = Axis.AXES[name]
+            test = node.children[0].evaluate
+            def walk(context_node, context_position, context_size, variables):
+                return NodeSet([n for n in along(context_node) if test(n, 1, 1, None)], ordered=True)
+            return walk
+
+        evaluators = [node.children[0].evaluate] + [self.compile(c) for c in node.children[1:]]
+        def axis(context_node, context_position, context_size, variables):
+            return node._select(name, context_node, variables, evaluators)
+        return axis
+
+    def _compile_Step(self, node):
+        if len(node.children) == 1:
+            return self.compile(node.children[0])
+        elif len(node.children) != 2:
+            raise XPathSyntaxException('Steps require between 1 and 2 children')
+
+        first = self.compile(node.children[0])
+        next_ = self.compile(node.children[1])
+        def step(context_node, context_position, context_size, variables):
+            context_nodes = first(context_node, context_position, context_size, variables)
+            size = len(context_nodes)
+            return NodeSet.merge([next_(cn, i+1, size, variables) for i, cn in enumerate(context_nodes)])
+        return step
+
+    def _compile_RootStep(self, node):
+        if len(node.children) == 0:
+            def root(context_node, context_position, context_size, variables):
+                return NodeSet([context_node.get_document()], ordered=True)
+            return root
+
+        steps = self._compile_Step(node)
+        def root_step(context_node, context_position, context_size, variables):
+            return steps(context_node.get_document(), 1, 1, variables)
+        return root_step
+
+    def _compile_Predicate(self, node):
+        if len(node.children) != 1:
+            raise XPathSyntaxException('Predicate can only have 1 expression')
+
+        path = node.children[0]._path()
+        if path is not None:
+            # a nodeset is true if it isn't empty; the first node settles it
+            def exists(context_node, context_position, context_size, variables):
+                for n in path.iterate(context_node, context_position, context_size, variables):
+                    return True
+                return False
+            return exists
+
+        type_ = self._type(node.children[0])
+        f = self.compile(node.children[0])
+        if type_ == 'number':
+            def position(context_node, context_position, context_size, variables):
+                return f(context_node, context_position, context_size, variables) == context_position
+            return position
+        elif type_ is not None:
+            return self._to_boolean(f, type_)
+
+        def predicate(context_node, context_position, context_size, variables):
+            v = f(context_node, context_position, context_size, variables)
+            return Predicate._matches(v, context_node, context_position, context_size, variables)
+        return predicate
+
+    def _compile_Function(self, node):
+        function = node.function
+        builtin = function is Function.FUNCTIONS.get(node.name)
+
+        path = node._path_argument()
+        if path is not None:
+            # only the first node matters, unless string() has to find the
+            # first in document order
+            all_nodes = node.name == 'string' and not path.is_ordered()
+            def first_node(context_node, context_position, context_size, variables):
+                nodes = path.iterate(context_node, context_position, context_size, variables)
+                if all_nodes:
+                    nodeset = list(nodes)
+                else:
+                    nodeset = list(itertools.islice(nodes, 1))
+                return function([nodeset], context_node, context_position, context_size, variables)
+            return first_node
+
+        if builtin and len(node.children) == 0:
+            if node.name == 'position':
+                def position(context_node, context_position, context_size, variables):
+                    return context_position
+                return position
+            elif node.name == 'last':
+                def last(context_node, context_position, context_size, variables):
+                    return context_size
+                return last
+
+        args = [self.compile(c) for c in node.children]
+        if builtin and len(args) == 1:
+            arg = args[0]
+            type_ = self._type(node.children[0])
+            if node.name == 'count' and type_ == 'nodeset':
+                def count(context_node, context_position, context_size, variables):
+                    return len(arg(context_node, context_position, context_size, variables))
+                return count
+            elif node.name == 'not' and type_ == 'boolean':
+                def not_(context_node, context_position, context_size, variables):
+                    return not arg(context_node, context_position, context_size, variables)
+                return not_
+            elif node.name == 'boolean' and type_ == 'boolean':
+                return arg
+
+        def call(context_node, context_position, context_size, variables):
+            return function([a(context_node, context_position, context_size, variables) for a in args],
+                context_node, context_position, context_size, variables)
+        return call
+
+    def _compile_Operator(self, node):
+        op = node.op
+        if op == 'negate':
+            operand = self.compile(node.children[0])
+            if self._type(node.children[0]) == 'number':
+                def negate_number(context_node, context_position, context_size, variables):
+                    return -operand(context_node, context_position, context_size, variables)
+                return negate_number
+            def negate(context_node, context_position, context_size, variables):
+                return Operator._negate(operand(context_node, context_position, context_size, variables))
+            return negate
+
+        left = self.compile(node.children[0])
+        right = self.compile(node.children[1])
+        left_type = self._type(node.children[0])
+        right_type = self._type(node.children[1])
+
+        if op == 'and' or op == 'or':
+            left = self._to_boolean(left, left_type)
+            right = self._to_boolean(right, right_type)
+            if op == 'and':
+                def and_(context_node, context_position, context_size, variables):
+                    return left(context_node, context_position, context_size, variables) \
+                        and right(context_node, context_position, context_size, variables)
+                return and_
+            def or_(context_node, context_position, context_size, variables):
+                return left(context_node, context_position, context_size, variables) \
+                    or right(context_node, context_position, context_size, variables)
+            return or_
+
+        f = Operator.OPERATORS[op]
+        if op in ClosureCompiler.ARITHMETIC_OPERATORS:
+            left = self._to_number(left, left_type)
+            right = self._to_number(right, right_type)
+            def arithmetic(context_node, context_position, context_size, variables):
+                return f(left(context_node, context_position, context_size, variables),
+                    right(context_node, context_position, context_size, variables))
+            return arithmetic
+
+        scalars = ('boolean', 'number', 'string')
+        if op != '|' and left_type in scalars and right_type in scalars:
+            # both sides are converted to the same type: boolean, then
+            # number, then string
+            if 'boolean' in (left_type, right_type):
+                left = self._to_boolean(left, left_type)
+                right = self._to_boolean(right, right_type)
+            elif 'number' in (left_type, right_type):
+                left = self._to_number(left, left_type)
+                right = self._to_number(right, right_type)
+            else:
+                left = self._to_string(left, left_type)
+                right = self._to_string(right, right_type)
+            def compare(context_node, context_position, context_size, variables):
+                return f(left(context_node, context_position, context_size, variables),
+                    right(context_node, context_position, context_size, variables))
+            return compare
+
+        if op != '|' and left_type == 'nodeset' and right_type in ('number', 'string'):
+            return self._compare_nodeset(f, left, right, right_type == 'number', False)
+        elif op != '|' and right_type == 'nodeset' and left_type in ('number', 'string'):
+            return self._compare_nodeset(f, right, left, left_type == 'number', True)
+
+        def apply(context_node, context_position, context_size, variables):
+            return Operator._apply(op,
+                left(context_node, context_position, context_size, variables),
+                right(context_node, context_position, context_size, variables),
+                context_node, context_position, context_size, variables)
+        return apply
+
+    def _compare_nodeset(self, f, nodeset, value, numeric, flipped):
+        # true if the string value, or its number, of any node compares to
+        # the value
+        to_number = Function._string_to_number
+        def compare_nodeset(context_node, context_position, context_size, variables):
+            nodes = nodeset(context_node, context_position, context_size, variables)
+            v = value(context_node, context_position, context_size, variables)
+            for n in nodes:
+                x = n.get_string_value()
+                if numeric:
+                    x = to_number(x)
+                if f(v, x) if flipped else f(x, v):
+                    return True
+            return False
+        return compare_nodeset
@@ -0,0 +1,412 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import logging
+from types import MappingProxyType
+
+from .Axis import Axis
+from .ClosureCompiler import ClosureCompiler
+from .Explainer import Explainer
+from .exceptions import *
+from .Function import Function
+from .NodeSet import NodeSet
+from .Optimizer import Optimizer
+from .Profiler import Profiler
+from .parser import Lexer, parse
+from .RootStep import RootStep
+from .Step import Step
+from .TreeBuilder import TreeBuilder
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CompiledExpression(object):
+    '''
+    Class representing a parsed XPath expression that can be evaluated
+    repeatedly against different context nodes
+
+    :param str expr: XPath expression
+    :param functions: Functions to use within the XPath expression in addition to the XPath 1.0 core library
+    :type functions: dict[str, function] or None
+    :param namespaces: Prefix to namespace URI mapping used to resolve QName node tests. If None, QNames are matched against the prefixed name of the node
+    :type namespaces: dict[str, str] or None
+    :param bool optimize: Rewrite the parsed expression with
+        expatriate.xpath.Optimizer before it's evaluated
+    :param str backend: How the expression is evaluated: 'closure' compiles
+        it with expatriate.xpath.ClosureCompiler, 'interpreter' walks its
+        tree on each evaluation
+    :raises ValueError: if *backend* isn't one of BACKENDS
+    '''
+    BACKENDS = ('closure', 'interpreter')
+    ''' The evaluation backends, the default first '''
+
+    ABBREVIATIONS = {
+        '.': ['self', '::', 'node', '(', ')'],
+        '..': ['parent', '::', 'node', '(', ')'],
+        '@': ['attribute', '::'],
+        '//': ['/', 'descendant-or-self', '::', 'node', '(', ')', '/'],
+    }
+
+    def __init__(self, expr, functions=None, namespaces=None, optimize=True, backend='closure'):
+        if backend not in CompiledExpression.BACKENDS:
+            raise ValueError('Unknown xpath backend: ' + str(backend))
+        self._expr = expr
+
+        f = Function.FUNCTIONS.copy()
+        if functions is not None:
+            f.update(functions)
+        self._functions = MappingProxyType(f)
+
+        if namespaces is None:
+            self._namespaces = None
+        else:
+            self._namespaces = MappingProxyType(dict(namespaces))
+
+        if tracing.enabled:
+            logger.debug('Parsing xpath expression: ' + str(expr))
+        self._ast = parse(expr)
+        self._root = TreeBuilder(self._functions, self._namespaces).build(self._ast)
+        self._optimize = optimize
+        if optimize:
+            self._root = Optimizer().optimize(self._root)
+
+        self._backend = backend
+        if backend == 'closure':
+            self._evaluate = ClosureCompiler().compile(self._root)
+        else:
+            self._evaluate = self._root.evaluate
+
+        # for evaluate_many: whether the value is the same for every context
+        # node of a document, and the steps of a relative location path
+        self._context_free = Optimizer()._is_context_free(self._root)
+        self._steps = CompiledExpression._relative_steps(self._root)
+        if self._steps is None:
+            self._step_evaluators = None
+        elif backend == 'closure':
+            self._step_evaluators = [ClosureCompiler().compile(a) for a in self._steps]
+        else:
+            self._step_evaluators = [a.evaluate for a in self._steps]
+
+        # built on the first profiled evaluation
+        self._profiler = None
+
+    @property
+    def expr(self):
+        """
+        The source of this expression. Read-only.
+
+        :type: str
+        """
+        return self._expr
+
+    @property
+    def ast(self):
+        """
+        The syntax tree of this expression, from expatriate.xpath.parser. Read-only.
+
+        :type: one of the expression classes of expatriate.xpath.parser
+        """
+        return self._ast
+
+    @property
+    def functions(self):
+        """
+        The functions available to this expression. Read-only.
+
+        :type: dict[str, function]
+        """
+        return self._functions
+
+    @property
+    def namespaces(self):
+        """
+        The prefix to namespace URI mapping of this expression. Read-only.
+
+        :type: dict[str, str] or None
+        """
+        return self._namespaces
+
+    @property
+    def backend(self):
+        """
+        The backend this expression is evaluated with, one of BACKENDS. Read-only.
+
+        :type: str
+        """
+        return self._backend
+
+    def evaluate(self, context_node, variables=None, profile=False):
+        '''
+        Evaluate this expression with *context_node* as the context node.
+
+        :param expatriate.Node context_node: The context node
+        :param variables: Variables to substitute in the XPath expression
+        :type variables: dict or None
+        :param bool profile: Record what each step of the expression does,
+            returning an expatriate.xpath.Profile holding the value instead
+            of just the value
+        :rtype: list[expatriate.Node] or str or int or float or bool or expatriate.xpath.Profile
+        '''
+        if profile:
+            if self._profiler is None:
+                self._profiler = Profiler(self)
+            return self._profiler.profile(context_node, variables)
+
+        if context_node.get_document() is None:
+            raise ValueError("Can't resolve xpath expression on Node not attached to a document")
+
+        # a scope of its own for each evaluation, which hoisted
+        # subexpressions cache their values against
+        if variables is None:
+            variables = {}
+        else:
+            variables = dict(variables)
+
+        if tracing.enabled:
+            logger.debug('Evaluating ' + str(self._root))
+        return self._evaluate(context_node, 1, 1, variables)
+
+    def evaluate_many(self, context_nodes, variables=None):
+        '''
+        Evaluate this expression with each of *context_nodes* as the context
+        node. A relative location path is evaluated a step at a time for all
+        of them together, stepping from each node along the way just once
+        however many context nodes lead to it. An expression that doesn't
+        depend on the context node is evaluated once per document.
+
+        :param context_nodes: The context nodes
+        :type context_nodes: iterable of expatriate.Node
+        :param variables: Variables to substitute in the XPath expression
+        :type variables: dict or None
+        :rtype: list with the value for each of *context_nodes*, in turn
+        '''
+        context_nodes = list(context_nodes)
+
+        # a scope for each document, shared by its context nodes; hoisted
+        # subexpressions are the same for all of them. Siblings share the
+        # walk up to their document
+        documents = {}
+        scopes = {}
+        context_scopes = []
+        for n in context_nodes:
+            parent = n._parent
+            if parent is None:
+                document = n.get_document()
+            elif id(parent) in documents:
+                document = documents[id(parent)]
+            else:
+                document = parent.get_document()
+                documents[id(parent)] = document
+            if document is None:
+                raise ValueError("Can't resolve xpath expression on Node not attached to a document")
+
+            if id(document) not in scopes:
+                if variables is None:
+                    scopes[id(document)] = {}
+                else:
+                    scopes[id(document)] = dict(variables)
+            context_scopes.append(scopes[id(document)])
+
+        if tracing.enabled:
+            logger.debug('Evaluating ' + str(self._root) + ' for ' + str(len(context_nodes)) + ' context nodes')
+
+        if self._context_free:
+            values = {}
+            for n, scope in zip(context_nodes, context_scopes):
+                if id(scope) not in values:
+                    values[id(scope)] = self._evaluate(n, 1, 1, scope)
+            return [CompiledExpression._copy(values[id(scope)]) for scope in context_scopes]
+
+        if self._steps is None:
+            return [self._evaluate(n, 1, 1, scope) for n, scope in zip(context_nodes, context_scopes)]
+
+        frontiers = [[n] for n in context_nodes]
+        for k, evaluate in enumerate(self._step_evaluators):
+            # a location path's value is in document order, unless it's a
+            # single step along a reverse axis
+            ordered = k > 0 and k == len(self._step_evaluators) - 1
+            # the nodes selected from each node, whichever contexts reach it
+            selected = None
+            if len(scopes) == 1:
+                selected = CompiledExpression._select_together(self._steps[k], frontiers, context_scopes[0])
+            if selected is None:
+                selected = {}
+            for i, frontier in enumerate(frontiers):
+                runs = []
+                for n in frontier:
+                    v = selected.get(id(n))
+                    if v is None:
+                        v = evaluate(n, 1, 1, context_scopes[i])
+                        selected[id(n)] = v
+                    runs.append(v)
+                if len(runs) != 1:
+                    frontiers[i] = NodeSet.merge(runs)
+                elif ordered:
+                    frontiers[i] = runs[0].in_order()
+                else:
+                    frontiers[i] = runs[0]
+        return CompiledExpression._unshared(frontiers)
+
+    @staticmethod
+    def _select_together(axis, frontiers, variables):
+        # the nodes the step selects from each node of frontiers, keyed by
+        # the node's id, walking from all of them at once and applying each
+        # predicate to all the nodes found together; None if the step's
+        # predicates depend on the position of the nodes
+        if axis.name not in ClosureCompiler.SIMPLE_AXES:
+            return None
+        predicates = axis.children[1:]
+        for p in predicates:
+            if p._depends_on_position():
+                return None
+
+        nodes = []
+        seen = set()
+        for frontier in frontiers:
+            for n in frontier:
+                if id(n) not in seen:
+                    seen.add(id(n))
+                    nodes.append(n)
+        if len(nodes) == 0:
+            return None
+
+        along = Axis.AXES[axis.name]
+        test = axis.children[0].evaluate
+        candidates = []
+        owners = []
+        for i, n in enumerate(nodes):
+            for c in along(n):
+                if test(c, 1, 1, None):
+                    candidates.append(c)
+                    owners.append(i)
+
+        for p in predicates:
+            mask = p._batch()
+            passed = None
+            if mask is not None:
+                passed = mask.mask(candidates, nodes[0], variables)
+            if passed is None:
+                # nothing depends on position, so any will do
+                passed = [p.evaluate(c, 1, 1, variables) for c in candidates]
+            candidates = list(itertools.compress(candidates, passed))
+            owners = list(itertools.compress(owners, passed))
+
+        selected = {}
+        for n in nodes:
+            selected[id(n)] = []
+        for c, i in zip(candidates, owners):
+            selected[id(nodes[i])].append(c)
+        for k, v in selected.items():
+            selected[k] = NodeSet(v, ordered=True)
+        return selected
+
+    @staticmethod
+    def _unshared(values):
+        # a value of its own for each context node; the nodesets of context
+        # nodes that share their last step are copied
+        seen = set()
+        for i, v in enumerate(values):
+            if id(v) in seen:
+                values[i] = CompiledExpression._copy(v)
+            else:
+                seen.add(id(v))
+        return values
+
+    @staticmethod
+    def _copy(v):
+        if isinstance(v, NodeSet):
+            return NodeSet(v, ordered=v.ordered)
+        elif isinstance(v, list):
+            return list(v)
+        return v
+
+    @staticmethod
+    def _relative_steps(node):
+        # the axes of the steps of a relative location path, or None if node
+        # is something else
+        if isinstance(node, Axis):
+            return [node]
+        elif isinstance(node, Step) and not isinstance(node, RootStep):
+            if len(node.children) == 1:
+                return CompiledExpression._relative_steps(node.children[0])
+            elif len(node.children) == 2 and isinstance(node.children[0], Axis):
+                steps = CompiledExpression._relative_steps(node.children[1])
+                if steps is not None:
+                    return [node.children[0]] + steps
+        return None
+
+    def iterate(self, context_node, variables=None):
+        '''
+        Evaluate this expression with *context_node* as the context node,
+        yielding the selected nodes in document order as they're found.
+        Location paths that select nodes in document order are evaluated
+        lazily; other expressions are evaluated in full first.
+
+        :param expatriate.Node context_node: The context node
+        :param variables: Variables to substitute in the XPath expression
+        :type variables: dict or None
+        :rtype: iterator of expatriate.Node
+        :raises TypeError: if the expression doesn't select a nodeset
+        '''
+        if context_node.get_document() is None:
+            raise ValueError("Can't resolve xpath expression on Node not attached to a document")
+
+        if variables is None:
+            variables = {}
+        else:
+            variables = dict(variables)
+
+        if hasattr(self._root, 'iterate') and self._root.is_ordered():
+            if tracing.enabled:
+                logger.debug('Iterating ' + str(self._root))
+            yield from self._root.iterate(context_node, 1, 1, variables)
+            return
+
+        v = self.evaluate(context_node, variables)
+        if not isinstance(v, list):
+            raise TypeError('Expression ' + self._expr + ' does not select a nodeset')
+        yield from v
+
+    def explain(self):
+        '''
+        Describe the plan this expression is evaluated by: its tree, after
+        optimization, with notes on how each node will be evaluated.
+
+        :rtype: str
+        '''
+        return Explainer().explain(self._root)
+
+    @staticmethod
+    def tokenize(expr):
+        '''
+        Split an XPath expression into its tokens, expanding abbreviations.
+
+        :param str expr: XPath expression
+        :rtype: list[str]
+        '''
+        tokens = []
+        for t in Lexer.tokenize(expr):
+            if t.value in CompiledExpression.ABBREVIATIONS:
+                tokens.extend(CompiledExpression.ABBREVIATIONS[t.value])
+            else:
+                tokens.append(t.value)
+        return tokens
+
+    def __str__(self):
+        return 'CompiledExpression ' + hex(id(self)) + ' ' + self._expr + ': [' + str(self._root) + ']'
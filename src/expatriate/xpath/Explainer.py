@@ -0,0 +1,189 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from .Axis import Axis
+from .Expression import Expression
+from .HoistedExpression import HoistedExpression
+from .Literal import Literal
+from .Operator import Operator
+from .Predicate import Predicate
+from .Step import Step
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class Explainer(object):
+    '''
+    Describes the tree of a compiled expression, the plan it's evaluated
+    by, as text: one line for each node of the tree, indented beneath its
+    parent, with notes on how the node will be evaluated.
+    '''
+
+    INDENT = '  '
+    ''' Indentation of each level of the tree '''
+
+    def explain(self, node):
+        '''
+        Describe the tree under *node*.
+
+        :param node: The root of the tree
+        :rtype: str
+        '''
+        if tracing.enabled:
+            logger.debug('Explaining ' + str(node))
+        lines = []
+        self._explain(node, 0, lines)
+        return '\n'.join(lines)
+
+    def text(self, node):
+        '''
+        Render the tree under *node* back into (unabbreviated) XPath.
+
+        :param node: The root of the tree
+        :rtype: str
+        '''
+        return getattr(self, '_text_' + type(node).__name__)(node)
+
+    def _explain(self, node, depth, lines):
+        if isinstance(node, Expression) and len(node.children) == 1:
+            # just a wrapper around its child
+            self._explain(node.children[0], depth, lines)
+            return
+
+        line = Explainer.INDENT * depth + type(node).__name__
+        detail = self._detail(node)
+        if detail:
+            line += ' ' + detail
+        notes = self._notes(node)
+        if len(notes) > 0:
+            line += ' (' + ', '.join(notes) + ')'
+        lines.append(line)
+
+        for c in getattr(node, 'children', ()):
+            if isinstance(node, Axis) and c is node.children[0]:
+                # the node test is part of the axis' line
+                continue
+            self._explain(c, depth + 1, lines)
+
+    def _detail(self, node):
+        if isinstance(node, Axis):
+            return node.name + '::' + self.text(node.children[0])
+        elif isinstance(node, Operator):
+            return node.op
+        elif isinstance(node, (Step, Predicate, Literal)) \
+        or type(node).__name__ in ('Function', 'VariableReference'):
+            return self.text(node)
+        return ''
+
+    def _notes(self, node):
+        notes = []
+        if isinstance(node, Axis):
+            if Axis.AXIS_DIRECTION[node.name] == 'forward':
+                notes.append('document order')
+            else:
+                notes.append('reverse document order')
+        elif isinstance(node, Predicate):
+            position = node._literal_position()
+            if position is not None:
+                notes.append('selects node ' + self._number(position))
+            elif node._is_last():
+                notes.append('selects the last node')
+            elif node.children[0]._path() is not None:
+                notes.append('stops at the first node selected')
+            else:
+                if node._attribute_comparison():
+                    notes.append('attribute index if there is one')
+                if node._batch() is not None:
+                    notes.append('a nodeset at a time')
+                else:
+                    notes.append('a node at a time')
+        elif isinstance(node, HoistedExpression):
+            notes.append('once per evaluation')
+        elif isinstance(node, Expression) and len(node.children) > 1:
+            notes.append('filter')
+        return notes
+
+    def _number(self, value):
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    def _operand(self, node):
+        # parenthesize operands that are themselves binary operations
+        while isinstance(node, (Expression, HoistedExpression)) and len(node.children) == 1:
+            node = node.children[0]
+        if isinstance(node, Operator) and node.op != 'negate':
+            return '(' + self.text(node) + ')'
+        return self.text(node)
+
+    def _text_AnyNodeTest(self, node):
+        return '*'
+
+    def _text_NCNameNodeTest(self, node):
+        return node.name
+
+    def _text_QNameNodeTest(self, node):
+        return node.name
+
+    def _text_TypeNodeTest(self, node):
+        return node.name + '()'
+
+    def _text_Axis(self, node):
+        return node.name + '::' + ''.join([self.text(c) for c in node.children])
+
+    def _text_Predicate(self, node):
+        return '[' + ''.join([self.text(c) for c in node.children]) + ']'
+
+    def _text_Step(self, node):
+        return '/'.join([self.text(c) for c in node.children])
+
+    def _text_RootStep(self, node):
+        return '/' + self._text_Step(node)
+
+    def _text_Expression(self, node):
+        if len(node.children) == 1:
+            return self.text(node.children[0])
+        return self._operand(node.children[0]) \
+            + ''.join([self.text(c) for c in node.children[1:]])
+
+    def _text_HoistedExpression(self, node):
+        return self.text(node.children[0])
+
+    def _text_Operator(self, node):
+        if node.op == 'negate':
+            return '-' + self._operand(node.children[0])
+        return self._operand(node.children[0]) + ' ' + node.op + ' ' \
+            + self._operand(node.children[1])
+
+    def _text_Function(self, node):
+        return node.name + '(' + ', '.join([self.text(c) for c in node.children]) + ')'
+
+    def _text_Literal(self, node):
+        v = node.value
+        if isinstance(v, bool):
+            return 'true()' if v else 'false()'
+        elif isinstance(v, (int, float)):
+            return self._number(v)
+        elif "'" in v:
+            return '"' + v + '"'
+        return "'" + v + "'"
+
+    def _text_VariableReference(self, node):
+        return '$' + node.name
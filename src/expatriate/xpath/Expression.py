@@ -20,6 +20,7 @@ import re
 
 from .exceptions import *
 from .Operator import Operator
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -29,14 +30,45 @@ class Expression(object):
         self.children = []
 
     def evaluate(self, context_node, context_position, context_size, variables):
-        logger.debug('Evaluating ' + str(self))
-        if len(self.children) > 1:
-            raise XPathSyntaxException('Expression has more than 1 child')
-
+        if tracing.enabled:
+            logger.debug('Evaluating ' + str(self))
         v = self.children[0].evaluate(context_node, context_position, context_size, variables)
-        logger.debug('Child ' + str(self.children[0]) + ' evaluated to ' + str(v))
+        if tracing.enabled:
+            logger.debug('Child ' + str(self.children[0]) + ' evaluated to ' + str(v))
+
+        if len(self.children) > 1:
+            v = self._filter(v, context_node, variables)
 
         return v
 
+    def _filter(self, nodeset, context_node, variables, evaluators=None):
+        # the children past the first are the predicates of a filter
+        # expression, which see the nodes in document order; evaluators, if
+        # given, stand in for their evaluate methods
+        from .Axis import Axis
+        from .NodeSet import NodeSet
+        from .Predicate import Predicate
+
+        if not isinstance(nodeset, list):
+            raise XPathSyntaxException('Predicates can only filter nodesets: ' + str(self.children[0]))
+
+        if not isinstance(nodeset, NodeSet):
+            nodeset = NodeSet(nodeset)
+        nodes = iter(nodeset.in_order())
+        batched = Axis._batch_start(self.children)
+        for i, c in enumerate(self.children[1:]):
+            if not isinstance(c, Predicate):
+                raise XPathSyntaxException('Expression children past the first must be predicates: ' + str(c))
+            evaluate = c.evaluate if evaluators is None else evaluators[i]
+            nodes = Axis._filter(c, nodes, context_node, variables, evaluate, i + 1 >= batched)
+        return NodeSet(nodes, ordered=True)
+
+    def _path(self):
+        # the location path this expression consists of, or None if it's
+        # something else
+        if len(self.children) == 1 and hasattr(self.children[0], 'iterate'):
+            return self.children[0]
+        return None
+
     def __str__(self):
         return 'Expression ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -0,0 +1,75 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from collections import OrderedDict
+
+from .CompiledExpression import CompiledExpression
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class ExpressionCache(object):
+    '''
+    Bounded least recently used cache of compiled XPath expressions
+
+    :param int maxsize: The maximum number of expressions to keep
+    '''
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._expressions = OrderedDict()
+
+    def get(self, expr, functions=None):
+        '''
+        Return the compiled form of *expr*, compiling it if it isn't cached.
+
+        :param str expr: XPath expression
+        :param functions: Functions to use within the XPath expression
+        :type functions: dict[str, function] or None
+        :rtype: expatriate.xpath.CompiledExpression
+        '''
+        if functions:
+            key = (expr, frozenset(functions.items()))
+        else:
+            key = (expr, None)
+
+        try:
+            ce = self._expressions[key]
+        except KeyError:
+            self.misses += 1
+            ce = CompiledExpression(expr, functions=functions)
+            self._expressions[key] = ce
+            if len(self._expressions) > self.maxsize:
+                self._expressions.popitem(last=False)
+            return ce
+
+        self.hits += 1
+        self._expressions.move_to_end(key)
+        return ce
+
+    def clear(self):
+        '''
+        Empty the cache and reset the hit & miss counters.
+        '''
+        self._expressions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._expressions)
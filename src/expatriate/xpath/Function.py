@@ -15,11 +15,13 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
 
+import itertools
 import logging
 import math
 import re
 
 from .exceptions import *
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -55,19 +57,26 @@ class Function(object):
                 if not isinstance(n, Node):
                     raise XPathSyntaxException('Cannot determine the string value of ' + str(n))
                 s = n.get_string_value()
-                logger.debug('Using ' + str(s) + ' as string-value of ' + str(n))
+                if tracing.enabled:
+                    logger.debug('Using ' + str(s) + ' as string-value of ' + str(n))
                 ids.extend(re.split(r'[\x20\x09\x0D\x0A]+', s))
         else:
             ids = re.split(r'[\x20\x09\x0D\x0A]+', Function.f_string((args[0],), context_node, context_position, context_size, variables))
 
         doc = context_node.get_document()
         ns = []
+        found = set()
         for i in ids:
-            try:
-                ns.append(doc.find_by_id(i))
-            except KeyError:
-                logger.debug('Could not find element with id: ' + str(i))
-                pass
+            el = doc.find_by_id(i)
+            if el is None:
+                if tracing.enabled:
+                    logger.debug('Could not find element with id: ' + str(i))
+            elif id(el) not in found:
+                found.add(id(el))
+                ns.append(el)
+
+        # a node-set, so in document order rather than the order of the ids
+        ns.sort(key=lambda n: n.get_document_order())
 
         if len(ns) == 1:
             return ns[0]
@@ -210,7 +219,8 @@ class Function(object):
         start = arg_1 - 1
         if start < 0:
             start = 0
-        logger.debug('Substring start: ' + str(start))
+        if tracing.enabled:
+            logger.debug('Substring start: ' + str(start))
 
         if len(args) > 2:
             if args[2] == -math.inf:
@@ -219,7 +229,8 @@ class Function(object):
                 return args[0][start:]
 
             end = arg_1 - 1 + Function.f_round((args[2],), context_node, context_position, context_size, variables)
-            logger.debug('Substring end: ' + str(end))
+            if tracing.enabled:
+                logger.debug('Substring end: ' + str(end))
 
             return args[0][start:end]
         else:
@@ -333,8 +344,8 @@ class Function(object):
             elif args[0] == False:
                 return 0
             elif isinstance(args[0],  list):
-                s = f_string((args[0],), context_node, context_position, context_size, variables)
-                return f_number(s, context_node, context_position, context_size, variables)
+                s = Function.f_string((args[0],), context_node, context_position, context_size, variables)
+                return Function.f_number((s,), context_node, context_position, context_size, variables)
             elif isinstance(args[0], int) or isinstance(args[0], float):
                 return args[0]
             else:
@@ -342,6 +353,14 @@ class Function(object):
         except ValueError:
             raise XPathSyntaxException('Invalid syntax for a number')
 
+    @staticmethod
+    def _string_to_number(s):
+        # the number a string value converts to; NaN if it isn't a number
+        try:
+            return Function.f_number((s,), None, None, None, None)
+        except XPathSyntaxException:
+            return math.nan
+
     def f_sum(args, context_node, context_position, context_size, variables):
         if len(args) != 1:
             raise XPathSyntaxException('sum() expects 1 argument')
@@ -420,12 +439,36 @@ class Function(object):
         self.children = []
 
     def evaluate(self, context_node, context_position, context_size, variables):
+        path = self._path_argument()
+        if path is not None:
+            nodes = path.iterate(context_node, context_position, context_size, variables)
+            if self.name == 'string' and not path.is_ordered():
+                # the first node in document order could come from anywhere
+                nodeset = list(nodes)
+            else:
+                # only the first node matters
+                nodeset = list(itertools.islice(nodes, 1))
+            return self.function([nodeset], context_node, context_position, context_size, variables)
+
         arg_evals = []
         for c in self.children:
             v = c.evaluate(context_node, context_position, context_size, variables)
-            logger.debug('Evaluated child of ' + str(self) + ' to ' + str(v))
+            if tracing.enabled:
+                logger.debug('Evaluated child of ' + str(self) + ' to ' + str(v))
             arg_evals.append(v)
         return self.function(arg_evals, context_node, context_position, context_size, variables)
 
+    def _path_argument(self):
+        # the location path argument of the built in functions that only
+        # need the first node it selects, or None
+        from .Expression import Expression
+
+        if self.name not in ('boolean', 'not', 'string') \
+        or self.function is not Function.FUNCTIONS[self.name] \
+        or len(self.children) != 1 \
+        or not isinstance(self.children[0], Expression):
+            return None
+        return self.children[0]._path()
+
     def __str__(self):
         return 'Function ' + self.name + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -0,0 +1,50 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class HoistedExpression(object):
+    '''
+    Wraps a subexpression whose value doesn't depend on the context node,
+    position or size so that it's evaluated just once per evaluation of the
+    whole expression, rather than once per node.
+    '''
+    def __init__(self, child):
+        self.children = [child]
+
+    def evaluate(self, context_node, context_position, context_size, variables):
+        # each evaluation of a CompiledExpression has its own variables dict;
+        # the value is kept there, under a key no variable name can have, so
+        # it goes when the evaluation does rather than living on in the
+        # shared expression tree
+        key = id(self)
+        if key in variables:
+            return variables[key]
+
+        v = self.children[0].evaluate(context_node, context_position, context_size, variables)
+        if tracing.enabled:
+            logger.debug('Hoisted ' + str(self.children[0]) + ' evaluated to ' + str(v))
+        variables[key] = v
+        return v
+
+    def __str__(self):
+        return 'HoistedExpression ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -32,5 +32,8 @@ class NCNameNodeTest(NodeTest):
             return False
         return context_node.local_name == self.name
 
+    def _postings(self, index):
+        return index.by_local_name(self.name)
+
     def __str__(self):
         return 'NCNameNodeTest ' + hex(id(self)) + ' ' + self.name + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -0,0 +1,156 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+import logging
+
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def _document_order(n):
+    return n.get_document_order()
+
+class NodeSet(list):
+    '''
+    A list of nodes that knows whether it is in document order without
+    duplicates. Nodesets in document order are merged in a single pass
+    instead of being sorted again. Changing the nodes in place, other than by
+    removing them, makes the nodeset unordered.
+
+    :param nodes: The nodes of the nodeset
+    :type nodes: iterable of expatriate.Node
+    :param bool ordered: True if *nodes* are in document order, each just once
+    '''
+    sorts = 0
+    ''' The number of times nodes have been sorted or merged into document order '''
+
+    def __init__(self, nodes=(), ordered=False):
+        super().__init__(nodes)
+        self._ordered = ordered
+
+    @property
+    def ordered(self):
+        """
+        If the nodes are in document order without duplicates. Read-only.
+
+        :getter: Returns True if the nodeset is ordered.
+        :type: bool
+        """
+        return self._ordered
+
+    def append(self, node):
+        self._ordered = False
+        super().append(node)
+
+    def extend(self, nodes):
+        self._ordered = False
+        super().extend(nodes)
+
+    def insert(self, index, node):
+        self._ordered = False
+        super().insert(index, node)
+
+    def reverse(self):
+        self._ordered = False
+        super().reverse()
+
+    def sort(self, *args, **kwargs):
+        self._ordered = False
+        super().sort(*args, **kwargs)
+
+    def __setitem__(self, index, value):
+        self._ordered = False
+        super().__setitem__(index, value)
+
+    def __iadd__(self, nodes):
+        self._ordered = False
+        return super().__iadd__(nodes)
+
+    def __imul__(self, n):
+        self._ordered = False
+        return super().__imul__(n)
+
+    def in_order(self):
+        '''
+        Get the nodes of this nodeset in document order, without duplicates.
+
+        :rtype: expatriate.xpath.NodeSet
+        '''
+        if self._ordered:
+            return self
+
+        if tracing.enabled:
+            logger.debug('Sorting ' + str(len(self)) + ' nodes into document order')
+        NodeSet.sorts += 1
+        return NodeSet._unique(sorted(self, key=_document_order))
+
+    def __or__(self, other):
+        return NodeSet.merge([self, other])
+
+    @staticmethod
+    def merge(nodesets):
+        '''
+        Merge nodesets into one in document order, without duplicates. Runs
+        that are each in order and follow one another are joined directly;
+        overlapping runs are merged through a heap.
+
+        :param nodesets: The nodesets to merge
+        :type nodesets: list of list[expatriate.Node]
+        :rtype: expatriate.xpath.NodeSet
+        '''
+        runs = []
+        for ns in nodesets:
+            if len(ns) == 0:
+                continue
+            if not isinstance(ns, NodeSet):
+                ns = NodeSet(ns)
+            runs.append(ns.in_order())
+
+        if len(runs) == 0:
+            return NodeSet(ordered=True)
+        elif len(runs) == 1:
+            return runs[0]
+
+        disjoint = True
+        for i in range(1, len(runs)):
+            if runs[i - 1][-1].get_document_order() >= runs[i][0].get_document_order():
+                disjoint = False
+                break
+        if disjoint:
+            nodes = []
+            for r in runs:
+                nodes.extend(r)
+            return NodeSet(nodes, ordered=True)
+
+        if tracing.enabled:
+            logger.debug('Merging ' + str(len(runs)) + ' overlapping runs')
+        NodeSet.sorts += 1
+        return NodeSet._unique(heapq.merge(*runs, key=_document_order))
+
+    @staticmethod
+    def _unique(nodes):
+        # drop repeats from nodes already in document order; a node is only
+        # ever next to itself
+        unique = []
+        last = None
+        for n in nodes:
+            if n is not last:
+                unique.append(n)
+                last = n
+        return NodeSet(unique, ordered=True)
@@ -23,3 +23,8 @@ logger.setLevel(logging.INFO)
 class NodeTest(object):
     def __init__(self):
         self.children = []
+
+    def _postings(self, index):
+        # the posting list of the structure index holding every element this
+        # test can match, or None if the index can't answer for this test
+        return None
@@ -20,6 +20,8 @@ import math
 
 from .exceptions import *
 from .Function import Function
+from .NodeSet import NodeSet
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -38,7 +40,7 @@ class Operator(object):
         '*': lambda x,y: x * y,
         # /
         # //
-        # |
+        '|': lambda x,y: NodeSet.merge([x, y]),
         '+': lambda x,y: x + y,
         '-': lambda x,y: x - y,
         '=': lambda x,y: x == y,
@@ -53,109 +55,175 @@ class Operator(object):
         'div': op_div,
         'negate': lambda x: - x,
     }
+    @staticmethod
+    def compare_nodesets(op, left, right):
+        '''
+        Compare two nodesets: true if there is a node in each whose string
+        values compare as *op*. For =, != the string values are compared;
+        otherwise their numbers are.
+
+        :param str op: The comparison operator
+        :param list left: The left hand nodeset
+        :param list right: The right hand nodeset
+        :rtype: bool
+        '''
+        if len(left) == 0 or len(right) == 0:
+            return False
+
+        # each string value is computed just once
+        left = [n.get_string_value() for n in left]
+        right = [n.get_string_value() for n in right]
+        if tracing.enabled:
+            logger.debug('Comparing nodeset values ' + str(left) + ' ' + op + ' ' + str(right))
+
+        if op == '=':
+            # hash the smaller side and probe with the other
+            if len(left) > len(right):
+                left, right = right, left
+            values = set(left)
+            for v in right:
+                if v in values:
+                    return True
+            return False
+        elif op == '!=':
+            # only false if every value on both sides is the same
+            values = set(left)
+            if len(values) > 1:
+                return True
+            v = left[0]
+            for r in right:
+                if r != v:
+                    return True
+            return False
+        elif op in ('<', '<=', '>', '>='):
+            # the extremes of each side decide whether any pair compares
+            left = [x for x in map(Function._string_to_number, left) if not math.isnan(x)]
+            right = [x for x in map(Function._string_to_number, right) if not math.isnan(x)]
+            if len(left) == 0 or len(right) == 0:
+                return False
+            if op in ('<', '<='):
+                return Operator.OPERATORS[op](min(left), max(right))
+            else:
+                return Operator.OPERATORS[op](max(left), min(right))
+        else:
+            raise XPathSyntaxException('Unknown nodeset comparison: ' + op)
+
     def __init__(self, op):
         self.op = op
         self.children = []
 
     def evaluate(self, context_node, context_position, context_size, variables):
-        from .Axis import Axis
-
         if self.op == 'negate':
-            left = self.children[0].evaluate(context_node, context_position, context_size, variables)
-            if isinstance(left, list):
-                raise XPathSyntaxException('Got negate operator with a nodeset')
+            v = self.children[0].evaluate(context_node, context_position, context_size, variables)
+            return Operator._negate(v)
+
+        left = self.children[0].evaluate(context_node, context_position, context_size, variables)
+        right = self.children[1].evaluate(context_node, context_position, context_size, variables)
+        return Operator._apply(self.op, left, right, context_node, context_position, context_size, variables)
+
+    @staticmethod
+    def _negate(v):
+        if isinstance(v, list):
+            raise XPathSyntaxException('Got negate operator with a nodeset')
+        elif isinstance(v, str):
+            v = Function.f_number((v,), None, 1, 1, None)
+        elif isinstance(v, bool):
+            return not v
+        elif isinstance(v, int) or isinstance(v, float):
+            pass
+        else:
+            raise XPathSyntaxException('Unknown operand: ' + str(v))
+
+        if tracing.enabled:
+            logger.debug('Negating ' + str(v))
+        return Operator.OPERATORS['negate'](v)
+
+    @staticmethod
+    def _apply(op, left, right, context_node, context_position, context_size, variables):
+        # apply the binary operator op to the values of its operands
+        if op == '|':
+            if not isinstance(left, list) or not isinstance(right, list):
+                raise XPathSyntaxException('Union operands must be nodesets: ' + str(left) + ' | ' + str(right))
+            return Operator.OPERATORS[op](left, right)
+        elif op in ['or', 'and']:
+            left = Function.f_boolean((left,), context_node, context_position, context_size, variables)
+            right = Function.f_boolean((right,), context_node, context_position, context_size, variables)
+        elif op in ['*', '+', '-', 'div', 'mod']:
+            left = Function.f_number((left,), context_node, context_position, context_size, variables)
+            right = Function.f_number((right,), context_node, context_position, context_size, variables)
+
+        if isinstance(left, list) and isinstance(right, list):
+            return Operator.compare_nodesets(op, left, right)
+        elif isinstance(left, list):
+            if isinstance(right, int) or isinstance(right, float):
+                for x in left:
+                    x = Function._string_to_number(Function.f_string((x,), context_node, context_position, context_size, variables))
+                    if tracing.enabled:
+                        logger.debug('Operator ' + str(x) + op + str(right))
+                    if Operator.OPERATORS[op](x, right):
+                        return True
+                return False
+            elif isinstance(right, str):
+                for x in left:
+                    x = Function.f_string((x,), context_node, context_position, context_size, variables)
+                    if tracing.enabled:
+                        logger.debug('Operator ' + str(x) + op + str(right))
+                    if Operator.OPERATORS[op](x, right):
+                        return True
+                return False
+            elif isinstance(right, bool):
+                left = Function.f_boolean((left,), context_node, context_position, context_size, variables)
+                if tracing.enabled:
+                    logger.debug('Operator ' + str(left) + op + str(right))
+                return Operator.OPERATORS[op](left, right)
+            else:
+                raise XPathSyntaxException('Unknown right hand operand: ' + str(right))
+        elif isinstance(right, list):
+            if isinstance(left, int) or isinstance(left, float):
+                for x in right:
+                    x = Function._string_to_number(Function.f_string((x,), context_node, context_position, context_size, variables))
+                    if tracing.enabled:
+                        logger.debug('Operator ' + str(left) + op + str(x))
+                    if Operator.OPERATORS[op](left, x):
+                        return True
+                return False
             elif isinstance(left, str):
-                left = Functions.f_number(left)
+                for x in right:
+                    x = Function.f_string((x,), context_node, context_position, context_size, variables)
+                    if tracing.enabled:
+                        logger.debug('Operator ' + str(left) + op + str(x))
+                    if Operator.OPERATORS[op](left, x):
+                        return True
+                return False
             elif isinstance(left, bool):
-                return not left
-            elif isinstance(left, int) or isinstance(left, float):
-                pass
+                right = Function.f_boolean((right,), context_node, context_position, context_size, variables)
+                if tracing.enabled:
+                    logger.debug('Operator ' + str(left) + op + str(right))
+                return Operator.OPERATORS[op](left, right)
             else:
-                raise XPathSyntaxException('Unknown operand: ' + str(left))
-
-            logger.debug('Negating ' + str(left))
-            return Operator.OPERATORS['negate'](left)
+                raise XPathSyntaxException('Unknown left hand operand: ' + str(left))
         else:
-            left = self.children[0].evaluate(context_node, context_position, context_size, variables)
-            right = self.children[1].evaluate(context_node, context_position, context_size, variables)
-
-            if self.op in ['or', 'and']:
+            if isinstance(left, bool) or isinstance(right, bool):
                 left = Function.f_boolean((left,), context_node, context_position, context_size, variables)
                 right = Function.f_boolean((right,), context_node, context_position, context_size, variables)
-            elif self.op in ['+', '-', 'div', 'mod']:
+                if tracing.enabled:
+                    logger.debug('Operator ' + str(left) + op + str(right))
+                return Operator.OPERATORS[op](left, right)
+            elif isinstance(left, int) or isinstance(left, float) \
+            or isinstance(right, int) or isinstance(right, float):
                 left = Function.f_number((left,), context_node, context_position, context_size, variables)
                 right = Function.f_number((right,), context_node, context_position, context_size, variables)
-
-            if isinstance(left, list) and isinstance(right, list):
-                for l in left:
-                    l = Function.f_string((l,), context_node, context_position, context_size, variables)
-                    for r in right:
-                        r = Function.f_string((r,), context_node, context_position, context_size, variables)
-                        logger.debug('Operator ' + str(l) + self.op + str(r))
-                        if Operator.OPERATORS[self.op](l, r):
-                            return True
-                return False
-            elif isinstance(left, list):
-                if isinstance(right, int) or isinstance(right, float):
-                    for x in left:
-                        x = Function.f_number(Function.f_string((x,), context_node, context_position, context_size, variables))
-                        logger.debug('Operator ' + str(x) + self.op + str(right))
-                        if Operator.OPERATORS[self.op](x, right):
-                            return True
-                    return False
-                elif isinstance(right, str):
-                    for x in left:
-                        x = Function.f_string((x,), context_node, context_position, context_size, variables)
-                        logger.debug('Operator ' + str(x) + self.op + str(right))
-                        if Operator.OPERATORS[self.op](x, right):
-                            return True
-                    return False
-                elif isinstance(right, bool):
-                    left = Function.f_boolean((left,), context_node, context_position, context_size, variables)
-                    logger.debug('Operator ' + str(left) + self.op + str(right))
-                    return Operator.OPERATORS[self.op](left, right)
-                else:
-                    raise XPathSyntaxException('Unknown right hand operand: ' + str(right))
-            elif isinstance(right, list):
-                if isinstance(left, int) or isinstance(left, float):
-                    for x in right:
-                        x = Function.f_number(Function.f_string((x,), context_node, context_position, context_size, variables))
-                        logger.debug('Operator ' + str(left) + self.op + str(x))
-                        if Operator.OPERATORS[self.op](left, x):
-                            return True
-                    return False
-                elif isinstance(left, str):
-                    for x in right:
-                        x = Function.f_string((x,), context_node, context_position, context_size, variables)
-                        logger.debug('Operator ' + str(left) + self.op + str(x))
-                        if Operator.OPERATORS[self.op](left, x):
-                            return True
-                    return False
-                elif isinstance(left, bool):
-                    right = Function.f_boolean((right,), context_node, context_position, context_size, variables)
-                    logger.debug('Operator ' + str(left) + self.op + str(right))
-                    return Operator.OPERATORS[self.op](left, right)
-                else:
-                    raise XPathSyntaxException('Unknown left hand operand: ' + str(left))
+                if tracing.enabled:
+                    logger.debug('Operator ' + str(left) + op + str(right))
+                return Operator.OPERATORS[op](left, right)
+            elif isinstance(left, str) or isinstance(right, str):
+                left = Function.f_string((left,), context_node, context_position, context_size, variables)
+                right = Function.f_string((right,), context_node, context_position, context_size, variables)
+                if tracing.enabled:
+                    logger.debug('Operator ' + str(left) + op + str(right))
+                return Operator.OPERATORS[op](left, right)
             else:
-                if isinstance(left, bool) or isinstance(right, bool):
-                    left = Function.f_boolean((left,), context_node, context_position, context_size, variables)
-                    right = Function.f_boolean((right,), context_node, context_position, context_size, variables)
-                    logger.debug('Operator ' + str(left) + self.op + str(right))
-                    return Operator.OPERATORS[self.op](left, right)
-                elif isinstance(left, int) or isinstance(left, float) \
-                or isinstance(right, int) or isinstance(right, float):
-                    left = Function.f_number((left,), context_node, context_position, context_size, variables)
-                    right = Function.f_number((right,), context_node, context_position, context_size, variables)
-                    logger.debug('Operator ' + str(left) + self.op + str(right))
-                    return Operator.OPERATORS[self.op](left, right)
-                elif isinstance(left, str) or isinstance(right, str):
-                    left = Function.f_string((left,), context_node, context_position, context_size, variables)
-                    right = Function.f_string((right,), context_node, context_position, context_size, variables)
-                    logger.debug('Operator ' + str(left) + self.op + str(right))
-                    return Operator.OPERATORS[self.op](left, right)
-                else:
-                    return Operator.OPERATORS[self.op](left, right)
+                return Operator.OPERATORS[op](left, right)
 
     def __str__(self):
         return 'Operator ' + self.op + ' ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -0,0 +1,210 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from .Axis import Axis
+from .Expression import Expression
+from .Function import Function
+from .HoistedExpression import HoistedExpression
+from .Literal import Literal
+from .Operator import Operator
+from .Predicate import Predicate
+from .RootStep import RootStep
+from .Step import Step
+from .TypeNodeTest import TypeNodeTest
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class Optimizer(object):
+    '''
+    Rewrites the parsed tree of an XPath expression into one that selects
+    the same nodes with less work:
+
+    * descendant-or-self::node()/child::name, which is what //name expands
+      to, becomes descendant::name when the child step's predicates don't
+      depend on position
+    * [position() = n] becomes [n] and [position() = last()] becomes
+      [last()], which the axes answer by indexing or stopping early
+    * operators and core functions of literals are folded into literals
+    * the parts of predicates that don't depend on the context are evaluated
+      once per evaluation instead of once per node
+    '''
+
+    CONTEXT_FREE_FUNCTIONS = {
+        'boolean': 0,
+        'ceiling': 0,
+        'concat': 0,
+        'contains': 0,
+        'count': 0,
+        'false': 0,
+        'floor': 0,
+        'id': 0,
+        'local-name': 1,
+        'name': 1,
+        'namespace-uri': 1,
+        'normalize-space': 1,
+        'not': 0,
+        'number': 1,
+        'round': 0,
+        'starts-with': 0,
+        'string': 1,
+        'string-length': 1,
+        'substring': 0,
+        'substring-after': 0,
+        'substring-before': 0,
+        'sum': 0,
+        'translate': 0,
+        'true': 0,
+    }
+    ''' Core functions that don't use the context given at least this many arguments '''
+
+    def optimize(self, root):
+        '''
+        Optimize the tree of an expression.
+
+        :param root: The root of the parsed expression
+        :rtype: the root of the optimized expression
+        '''
+        root = self._rewrite(root)
+        if tracing.enabled:
+            logger.debug('Optimized to ' + str(root))
+        return root
+
+    def _rewrite(self, node):
+        # bottom up, so that each rewrite sees optimized children
+        if hasattr(node, 'children'):
+            node.children = [self._rewrite(c) for c in node.children]
+
+        if isinstance(node, (Operator, Function)):
+            node = self._fold(node)
+        elif isinstance(node, Predicate):
+            self._rewrite_position(node)
+            self._hoist(node.children[0])
+        elif isinstance(node, Step):
+            node = self._collapse_descendant(node)
+        return node
+
+    def _is_literal(self, node):
+        return isinstance(node, Literal) \
+            or (isinstance(node, Expression) and len(node.children) == 1 and isinstance(node.children[0], Literal))
+
+    def _fold(self, node):
+        # replace an operator or function of literals with its value
+        if isinstance(node, Operator):
+            if node.op == '|':
+                return node
+        elif node.name not in Optimizer.CONTEXT_FREE_FUNCTIONS \
+        or node.function is not Function.FUNCTIONS[node.name] \
+        or len(node.children) < Optimizer.CONTEXT_FREE_FUNCTIONS[node.name]:
+            return node
+
+        for c in node.children:
+            if not self._is_literal(c):
+                return node
+
+        try:
+            v = node.evaluate(None, 1, 1, {})
+        except Exception:
+            # leave the error to be raised when the expression is evaluated
+            return node
+
+        if tracing.enabled:
+            logger.debug('Folded ' + str(node) + ' to ' + str(v))
+        return Literal(v)
+
+    def _is_context_free(self, node):
+        if isinstance(node, (Literal, HoistedExpression, RootStep)):
+            return True
+        elif isinstance(node, Expression):
+            return len(node.children) > 0 and all([self._is_context_free(c) for c in node.children])
+        elif isinstance(node, Operator):
+            return all([self._is_context_free(c) for c in node.children])
+        elif isinstance(node, Function):
+            return node.name in Optimizer.CONTEXT_FREE_FUNCTIONS \
+                and node.function is Function.FUNCTIONS[node.name] \
+                and len(node.children) >= Optimizer.CONTEXT_FREE_FUNCTIONS[node.name] \
+                and all([self._is_context_free(c) for c in node.children])
+        return False
+
+    def _hoist(self, node):
+        # wrap the largest subexpressions below node that don't depend on the
+        # context so they're evaluated once
+        for i, c in enumerate(node.children):
+            if isinstance(c, (Literal, HoistedExpression)):
+                continue
+            if self._is_context_free(c):
+                if tracing.enabled:
+                    logger.debug('Hoisting ' + str(c))
+                node.children[i] = HoistedExpression(c)
+            elif hasattr(c, 'children'):
+                self._hoist(c)
+
+    def _rewrite_position(self, predicate):
+        # [position() = n] is [n] and [position() = last()] is [last()]
+        e = predicate.children[0] if len(predicate.children) == 1 else None
+        if not isinstance(e, Expression) or len(e.children) != 1:
+            return
+        o = e.children[0]
+        if not isinstance(o, Operator) or o.op != '=' or len(o.children) != 2:
+            return
+
+        a, b = o.children
+        if not Predicate._is_function(a, 'position'):
+            a, b = b, a
+        if not Predicate._is_function(a, 'position') or len(a.children) != 0:
+            return
+
+        if isinstance(b, Literal) and isinstance(b.value, (int, float)) \
+        and not isinstance(b.value, bool):
+            e.children = [b]
+        elif Predicate._is_function(b, 'last') and len(b.children) == 0:
+            e.children = [b]
+
+    def _collapse_descendant(self, step):
+        # descendant-or-self::node()/child::name selects the same nodes as
+        # descendant::name, as long as the child step's predicates don't
+        # depend on position
+        if len(step.children) != 2:
+            return step
+        first, next_ = step.children
+        if not isinstance(first, Axis) \
+        or first.name != 'descendant-or-self' \
+        or len(first.children) != 1 \
+        or not isinstance(first.children[0], TypeNodeTest) \
+        or first.children[0].name != 'node' \
+        or not isinstance(next_, Step) \
+        or isinstance(next_, RootStep) \
+        or not isinstance(next_.children[0], Axis) \
+        or next_.children[0].name != 'child':
+            return step
+        for p in next_.children[0].children[1:]:
+            if p._depends_on_position():
+                return step
+
+        axis = Axis('descendant')
+        axis.children = next_.children[0].children
+        if isinstance(step, RootStep):
+            collapsed = RootStep()
+        elif len(next_.children) == 1:
+            return axis
+        else:
+            collapsed = Step()
+        collapsed.children = [axis] + next_.children[1:]
+        return collapsed
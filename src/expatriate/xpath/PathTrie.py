@@ -0,0 +1,160 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+
+from .Axis import Axis
+from .ClosureCompiler import ClosureCompiler
+from .NCNameNodeTest import NCNameNodeTest
+from .NodeSet import NodeSet
+from .Optimizer import Optimizer
+from .parser import LocationPath
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class PathTrie(object):
+    '''
+    A trie of the steps of location paths, so that the steps paths start
+    with in common are evaluated once for all of them. The steps below a
+    node of the trie that go along the same axis are all evaluated in one
+    walk along it from each context node; a node is only checked against
+    the steps whose name test has its local name and those with other node
+    tests.
+
+    :param axis: The step this node of the trie evaluates, None for the root
+    :type axis: expatriate.xpath.Axis or None
+    :param evaluators: Stand ins for the evaluate methods of *axis*' predicates
+    :type evaluators: list[function] or None
+    '''
+    def __init__(self, axis=None, evaluators=None):
+        self.axis = axis
+        self.children = {}
+        ''' The tries of the next steps, keyed by the repr of their
+        expatriate.xpath.parser.LocationStep, which tells the literals 1 and
+        True apart where the steps themselves compare equal '''
+        self.paths = []
+        ''' The keys of the location paths ending at this node '''
+        self.queries = set()
+        ''' The expressions with a location path through this node '''
+
+        self._evaluators = evaluators
+        if axis is not None:
+            self._batched = Axis._batch_start(axis.children)
+
+    def insert(self, steps, key, query, tree_builder, optimize=True):
+        '''
+        Add a location path to the trie.
+
+        :param steps: The steps of the path
+        :type steps: list[expatriate.xpath.parser.LocationStep]
+        :param key: The key of the path's nodeset in the results of evaluate()
+        :param str query: The expression the path belongs to
+        :param expatriate.xpath.TreeBuilder tree_builder: Builds the Axis of each new step
+        :param bool optimize: Optimize each new step with expatriate.xpath.Optimizer
+        '''
+        trie = self
+        trie.queries.add(query)
+        for step in steps:
+            k = repr(step)
+            if k not in trie.children:
+                axis = tree_builder.build(LocationPath(False, (step,)))
+                if optimize:
+                    axis = Optimizer().optimize(axis)
+                axis._check()
+                compiler = ClosureCompiler()
+                evaluators = [None] + [compiler.compile(p) for p in axis.children[1:]]
+                trie.children[k] = PathTrie(axis, evaluators)
+            trie = trie.children[k]
+            trie.queries.add(query)
+        trie.paths.append(key)
+
+    def evaluate(self, contexts, variables, results, timings):
+        '''
+        Evaluate the paths in the trie.
+
+        :param expatriate.xpath.NodeSet contexts: The nodes selected by the path to this node, in document order
+        :param dict variables: Variables of the evaluation
+        :param dict results: Receives the nodeset of each path, by key
+        :param dict timings: The seconds spent so far on each expression;
+            the time spent on a step is split between the expressions
+            through it
+        '''
+        for key in self.paths:
+            results[key] = NodeSet(contexts, ordered=True)
+
+        groups = {}
+        for trie in self.children.values():
+            groups.setdefault(trie.axis.name, []).append(trie)
+
+        for name, tries in groups.items():
+            start = time.perf_counter()
+            selected = PathTrie._walk(name, tries, contexts, variables)
+            elapsed = time.perf_counter() - start
+
+            queries = set()
+            for trie in tries:
+                queries.update(trie.queries)
+            for q in queries:
+                timings[q] += elapsed / len(queries)
+
+            for trie, nodes in zip(tries, selected):
+                trie.evaluate(nodes, variables, results, timings)
+
+    @staticmethod
+    def _walk(name, tries, contexts, variables):
+        # the nodes each of tries selects, walking along the axis from each
+        # of contexts once for all of them
+        if tracing.enabled:
+            logger.debug('Walking ' + name + ' axis of ' + str(len(contexts))
+                + ' nodes for ' + str(len(tries)) + ' steps')
+        axis = Axis.AXES[name]
+        forward = Axis.AXIS_DIRECTION[name] == 'forward'
+
+        by_name = {}
+        others = []
+        for i, trie in enumerate(tries):
+            test = trie.axis.children[0]
+            if isinstance(test, NCNameNodeTest):
+                by_name.setdefault(test.name, []).append(i)
+            else:
+                others.append((i, test.evaluate))
+
+        runs = [[] for trie in tries]
+        for context_node in contexts:
+            found = [[] for trie in tries]
+            for n in axis(context_node):
+                for i in by_name.get(getattr(n, 'local_name', None), ()):
+                    found[i].append(n)
+                for i, test in others:
+                    if test(n, 1, 1, None):
+                        found[i].append(n)
+
+            for i, trie in enumerate(tries):
+                if len(found[i]) > 0:
+                    nodes = trie._filter(found[i], context_node, variables)
+                    runs[i].append(NodeSet(nodes, ordered=forward))
+        return [NodeSet.merge(r) for r in runs]
+
+    def _filter(self, nodes, context_node, variables):
+        # apply the step's predicates to the nodes passing its node test
+        for i in range(1, len(self.axis.children)):
+            nodes = Axis._filter(self.axis.children[i], nodes, context_node, variables,
+                self._evaluators[i], i >= self._batched)
+        return list(nodes)
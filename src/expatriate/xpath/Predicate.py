@@ -18,31 +18,215 @@
 import logging
 
 from .exceptions import *
+from .Expression import Expression
 from .Function import Function
+from .HoistedExpression import HoistedExpression
+from .Literal import Literal
+from .NCNameNodeTest import NCNameNodeTest
+from .Operator import Operator
+from .QNameNodeTest import QNameNodeTest
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class Predicate(object):
+    # the comparison seen from the attribute's side when the literal is on
+    # the left
+    FLIPPED_OPERATORS = {
+        '=': '=',
+        '!=': '!=',
+        '<': '>',
+        '<=': '>=',
+        '>': '<',
+        '>=': '<=',
+    }
+
     def __init__(self):
         self.children = []
+        self._comparison = None
+        self._last = None
+        self._mask = None
 
     def evaluate(self, context_node, context_position, context_size, variables):
         if len(self.children) != 1:
             raise XPathSyntaxException('Predicate can only have 1 expression')
 
+        path = self.children[0]._path()
+        if path is not None:
+            # a nodeset is true if it isn't empty; the first node settles it
+            for n in path.iterate(context_node, context_position, context_size, variables):
+                return True
+            return False
+
         v = self.children[0].evaluate(context_node, context_position, context_size, variables)
+        return Predicate._matches(v, context_node, context_position, context_size, variables)
 
+    @staticmethod
+    def _matches(v, context_node, context_position, context_size, variables):
+        # true if the value of the predicate's expression selects the node
         if isinstance(v, bool):
-            logger.debug('Boolean predicate subexpression: ' + str(v))
+            if tracing.enabled:
+                logger.debug('Boolean predicate subexpression: ' + str(v))
             return v
         elif isinstance(v, int) or isinstance(v, float):
-            logger.debug('Numeric result for predicate subexpression: ' + str(v) + '; comparing to position()')
+            if tracing.enabled:
+                logger.debug('Numeric result for predicate subexpression: ' + str(v) + '; comparing to position()')
             return Function.f_position((), context_node, context_position, context_size, variables) == v
         else:
             v_b = Function.f_boolean((v,), context_node, context_position, context_size, variables)
-            logger.debug('Converting predicate subexpression result ' + str(v) + ' to boolean: '  + str(v_b))
+            if tracing.enabled:
+                logger.debug('Converting predicate subexpression result ' + str(v) + ' to boolean: '  + str(v_b))
             return v_b
 
+    def _literal_position(self):
+        # the position selected if this predicate is just a number literal
+        e = self.children[0] if len(self.children) == 1 else None
+        if isinstance(e, Expression) and len(e.children) == 1 \
+        and isinstance(e.children[0], Literal) \
+        and isinstance(e.children[0].value, (int, float)) \
+        and not isinstance(e.children[0].value, bool):
+            return e.children[0].value
+        return None
+
+    def _is_last(self):
+        # true if this predicate is just last()
+        e = self.children[0] if len(self.children) == 1 else None
+        return isinstance(e, Expression) and len(e.children) == 1 \
+            and Predicate._is_function(e.children[0], 'last') \
+            and len(e.children[0].children) == 0
+
+    def _uses_last(self):
+        # true if evaluating this predicate needs the context size
+        if self._last is None:
+            self._last = Predicate._references(self, ('last',))
+        return self._last
+
+    def _depends_on_position(self):
+        # false if the predicate is known to select the same nodes whatever
+        # their position: its value can't be a number and it doesn't call
+        # position() or last()
+        e = self.children[0] if len(self.children) == 1 else None
+        if not isinstance(e, Expression) or len(e.children) != 1 \
+        or not Predicate._is_boolean_or_nodeset(e.children[0]):
+            return True
+        return Predicate._references(self, ('last', 'position'))
+
+    BOOLEAN_FUNCTIONS = ('boolean', 'not', 'true', 'false', 'lang', 'contains', 'starts-with')
+    ''' Core functions that return a boolean '''
+
+    @staticmethod
+    def _is_boolean_or_nodeset(node):
+        if isinstance(node, HoistedExpression):
+            return Predicate._is_boolean_or_nodeset(node.children[0])
+        elif hasattr(node, 'iterate'):
+            # a location path
+            return True
+        elif isinstance(node, Literal):
+            return isinstance(node.value, (bool, str))
+        elif isinstance(node, Operator):
+            return node.op in Predicate.FLIPPED_OPERATORS or node.op in ('and', 'or', '|')
+        elif isinstance(node, Function):
+            return any(Predicate._is_function(node, name) for name in Predicate.BOOLEAN_FUNCTIONS)
+        return False
+
+    @staticmethod
+    def _is_function(node, name):
+        # true if node is a call to the core function name
+        return isinstance(node, Function) and node.name == name \
+            and node.function is Function.FUNCTIONS.get(name)
+
+    @staticmethod
+    def _references(node, names):
+        # true if any of the named functions are called within node, outside
+        # of nested predicates
+        from .Axis import Axis
+
+        for c in getattr(node, 'children', ()):
+            if isinstance(c, Function) \
+            and (c.name in names or c.function is not Function.FUNCTIONS.get(c.name)):
+                # functions added by the user might use the context too
+                return True
+            if isinstance(c, (Axis, Predicate)):
+                # nested predicates have a context of their own
+                continue
+            if Predicate._references(c, names):
+                return True
+        return False
+
+    def _batch(self):
+        # the PredicateMask evaluating this predicate for a whole nodeset at
+        # once, None if it can't
+        from .PredicateMask import PredicateMask
+
+        if self._mask is None:
+            self._mask = PredicateMask.compile(self)
+            if self._mask is None:
+                self._mask = False
+
+        if self._mask is False:
+            return None
+        return self._mask
+
+    def _attribute_comparison(self):
+        # (node test, operator, literal value) if this predicate is a plain
+        # comparison between an attribute and a literal, otherwise None
+        from .Axis import Axis
+
+        if self._comparison is None:
+            self._comparison = False
+
+            e = self.children[0] if len(self.children) == 1 else None
+            o = e.children[0] if isinstance(e, Expression) and len(e.children) == 1 else None
+            if isinstance(o, Operator) and o.op in Predicate.FLIPPED_OPERATORS and len(o.children) == 2:
+                a, l = o.children
+                op = o.op
+                if isinstance(a, Literal):
+                    a, l = l, a
+                    op = Predicate.FLIPPED_OPERATORS[op]
+                if isinstance(a, Axis) and a.name == 'attribute' and len(a.children) == 1 \
+                and isinstance(l, Literal):
+                    self._comparison = (a.children[0], op, l.value)
+
+        if self._comparison is False:
+            return None
+        return self._comparison
+
+    def _index_matches(self, context_node):
+        # the elements satisfying this predicate, found with one of the
+        # document's attribute indexes; None if no index can answer it
+        comparison = self._attribute_comparison()
+        if comparison is None:
+            return None
+        test, op, value = comparison
+
+        doc = context_node.get_document()
+        if doc is None or len(doc._attribute_indexes) == 0:
+            return None
+
+        if isinstance(test, NCNameNodeTest):
+            index = doc.get_index(test.name)
+        elif isinstance(test, QNameNodeTest) and test.namespace is not None:
+            index = doc.get_index(test.name.partition(':')[2], namespace=test.namespace)
+        else:
+            index = None
+        if index is None:
+            return None
+
+        if isinstance(value, bool):
+            return None
+        elif isinstance(value, (int, float)):
+            if op == '!=':
+                return None
+            if tracing.enabled:
+                logger.debug('Using ' + str(index) + ' for @' + test.name + ' ' + op + ' ' + str(value))
+            return index.compare(op, value)
+        elif op == '=':
+            if tracing.enabled:
+                logger.debug('Using ' + str(index) + ' for @' + test.name + ' = ' + str(value))
+            return index.equal(value)
+        else:
+            return None
+
     def __str__(self):
         return 'Predicate ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -0,0 +1,328 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+import logging
+import math
+
+from .Axis import Axis
+from .Expression import Expression
+from .Function import Function
+from .HoistedExpression import HoistedExpression
+from .Literal import Literal
+from .Operator import Operator
+from .VariableReference import VariableReference
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class PredicateMask(object):
+    '''
+    Evaluates a predicate for all the nodes it filters at once, rather than
+    walking the predicate's tree once per node. Each subexpression yields a
+    column with a value for every node, computed in one pass, and the
+    predicate's column becomes a list of booleans selecting the nodes.
+    Numbers are held in array('d') columns.
+
+    Only predicates built from literals, variables, hoisted subexpressions,
+    location paths, position(), last(), count(), sum(), number(), string(),
+    boolean(), not(), true(), false() and the operators other than | are
+    supported; compile() returns None for the others.
+    '''
+
+    ARITHMETIC_OPERATORS = ('*', '+', '-', 'div', 'mod')
+
+    @staticmethod
+    def compile(predicate):
+        '''
+        Compile *predicate* for evaluation a nodeset at a time.
+
+        :param expatriate.xpath.Predicate predicate: The predicate
+        :rtype: expatriate.xpath.PredicateMask or None
+        '''
+        if len(predicate.children) != 1 or predicate.children[0]._path() is not None:
+            # a path on its own only needs its first node; see Predicate.evaluate
+            return None
+
+        column = PredicateMask._compile(predicate.children[0])
+        if column is None:
+            return None
+        if tracing.enabled:
+            logger.debug('Compiled mask for ' + str(predicate))
+        return PredicateMask(column)
+
+    def __init__(self, column):
+        self._column = column
+
+    def mask(self, nodes, context_node, variables):
+        '''
+        Evaluate the predicate for each of *nodes*, the node at index i
+        being at position i + 1 of len(*nodes*).
+
+        :param list nodes: The nodes to filter
+        :param expatriate.Node context_node: The context node of the step the predicate belongs to
+        :param dict variables: Variables of the evaluation
+        :rtype: list[bool] or None if a value turned out to be of an unsupported type
+        '''
+        if len(nodes) == 0:
+            return []
+
+        c = self._column(nodes, context_node, variables)
+        if c is None:
+            return None
+        kind, values = c
+        if kind == 'boolean':
+            return values
+        elif kind == 'number':
+            return [v == i for i, v in enumerate(values, 1)]
+        else:
+            return [len(v) > 0 for v in values]
+
+    @staticmethod
+    def _compile(node):
+        # a function(nodes, context_node, variables) returning the column
+        # of node's values, (kind, values), or None if a value isn't one of
+        # the supported types; None if node can't be compiled
+        if isinstance(node, Expression):
+            if len(node.children) != 1:
+                return None
+            return PredicateMask._compile(node.children[0])
+        elif isinstance(node, Literal):
+            value = node.value
+            def literal(nodes, context_node, variables):
+                return PredicateMask._broadcast(value, len(nodes))
+            return literal
+        elif isinstance(node, (HoistedExpression, VariableReference)):
+            # the same for every node, so it's evaluated once
+            def context_free(nodes, context_node, variables):
+                v = node.evaluate(context_node, 1, 1, variables)
+                return PredicateMask._broadcast(v, len(nodes))
+            return context_free
+        elif hasattr(node, 'iterate'):
+            return PredicateMask._compile_path(node)
+        elif isinstance(node, Function):
+            return PredicateMask._compile_function(node)
+        elif isinstance(node, Operator):
+            return PredicateMask._compile_operator(node)
+        return None
+
+    @staticmethod
+    def _broadcast(value, size):
+        # the column of a value shared by every node
+        if isinstance(value, bool):
+            return 'boolean', [value] * size
+        elif isinstance(value, (int, float)):
+            return 'number', array('d', [value]) * size
+        elif isinstance(value, str):
+            return 'string', [value] * size
+        elif isinstance(value, list):
+            return 'nodeset', [value] * size
+        return None
+
+    @staticmethod
+    def _compile_path(path):
+        # the nodes selected by the path for each node, in no particular
+        # order; everything they're used for is order independent
+        if isinstance(path, Axis) and len(path.children) == 1:
+            # without predicates, the node test alone picks the nodes
+            test = path.children[0].evaluate
+            if path.name == 'attribute':
+                def select(n):
+                    if not hasattr(n, 'attribute_nodes'):
+                        return []
+                    return [a for a in n.attribute_nodes.values() if test(a, 1, 1, None)]
+            else:
+                axis = Axis.AXES[path.name]
+                def select(n):
+                    return [x for x in axis(n) if test(x, 1, 1, None)]
+            def step(nodes, context_node, variables):
+                return 'nodeset', [select(n) for n in nodes]
+            return step
+
+        def location_path(nodes, context_node, variables):
+            size = len(nodes)
+            return 'nodeset', [list(path.iterate(n, i, size, variables)) for i, n in enumerate(nodes, 1)]
+        return location_path
+
+    @staticmethod
+    def _compile_function(node):
+        if node.function is not Function.FUNCTIONS.get(node.name):
+            return None
+
+        name = node.name
+        if len(node.children) == 0:
+            if name == 'position':
+                def position(nodes, context_node, variables):
+                    return 'number', array('d', range(1, len(nodes) + 1))
+                return position
+            elif name == 'last':
+                def last(nodes, context_node, variables):
+                    return 'number', array('d', [len(nodes)]) * len(nodes)
+                return last
+            elif name in ('true', 'false'):
+                value = name == 'true'
+                def constant(nodes, context_node, variables):
+                    return 'boolean', [value] * len(nodes)
+                return constant
+            elif name == 'string':
+                def string_value(nodes, context_node, variables):
+                    return 'string', [n.get_string_value() for n in nodes]
+                return string_value
+            return None
+
+        if len(node.children) != 1 \
+        or name not in ('count', 'sum', 'number', 'string', 'boolean', 'not'):
+            return None
+        arg = PredicateMask._compile(node.children[0])
+        if arg is None:
+            return None
+
+        def function(nodes, context_node, variables):
+            c = arg(nodes, context_node, variables)
+            if c is None:
+                return None
+            kind, values = c
+            if name == 'count':
+                if kind != 'nodeset':
+                    return None
+                return 'number', array('d', [len(v) for v in values])
+            elif name == 'sum':
+                if kind != 'nodeset':
+                    return None
+                return 'number', array('d', [Function.f_sum((v,), None, 1, 1, None) for v in values])
+            elif name == 'number':
+                return 'number', PredicateMask._to_number(kind, values)
+            elif name == 'string':
+                if kind == 'number':
+                    # the formatting of a number depends on whether it's an int
+                    return None
+                elif kind == 'string':
+                    return c
+                return 'string', [Function.f_string((v,), None, 1, 1, None) for v in values]
+            elif name == 'boolean':
+                return 'boolean', PredicateMask._to_boolean(kind, values)
+            else:
+                return 'boolean', [not v for v in values]
+        return function
+
+    @staticmethod
+    def _compile_operator(node):
+        op = node.op
+        if op == '|':
+            return None
+
+        operands = [PredicateMask._compile(c) for c in node.children]
+        if None in operands:
+            return None
+
+        if op == 'negate':
+            operand = operands[0]
+            def negate(nodes, context_node, variables):
+                c = operand(nodes, context_node, variables)
+                if c is None:
+                    return None
+                kind, values = c
+                values = [Operator._negate(v) for v in values]
+                if kind == 'boolean':
+                    return 'boolean', values
+                return 'number', array('d', values)
+            return negate
+
+        left, right = operands
+        f = Operator.OPERATORS[op]
+        def operator(nodes, context_node, variables):
+            l = left(nodes, context_node, variables)
+            r = right(nodes, context_node, variables)
+            if l is None or r is None:
+                return None
+            if op in ('and', 'or'):
+                l = PredicateMask._to_boolean(*l)
+                r = PredicateMask._to_boolean(*r)
+                return 'boolean', [f(x, y) for x, y in zip(l, r)]
+            elif op in PredicateMask.ARITHMETIC_OPERATORS:
+                l = PredicateMask._to_number(*l)
+                r = PredicateMask._to_number(*r)
+                return 'number', array('d', map(f, l, r))
+            return 'boolean', PredicateMask._compare(op, f, l, r)
+        return operator
+
+    @staticmethod
+    def _to_boolean(kind, values):
+        if kind == 'boolean':
+            return values
+        elif kind == 'number':
+            return [v != 0 and not math.isnan(v) for v in values]
+        return [len(v) > 0 for v in values]
+
+    @staticmethod
+    def _to_number(kind, values):
+        if kind == 'number':
+            return values
+        elif kind == 'boolean':
+            return array('d', [1 if v else 0 for v in values])
+        return array('d', [Function.f_number((v,), None, 1, 1, None) for v in values])
+
+    @staticmethod
+    def _compare(op, f, left, right):
+        # the same conversions as Operator._apply, a column at a time
+        (left_kind, l), (right_kind, r) = left, right
+        if left_kind == 'nodeset' and right_kind == 'nodeset':
+            return [Operator.compare_nodesets(op, x, y) for x, y in zip(l, r)]
+        elif left_kind == 'nodeset':
+            return PredicateMask._compare_nodesets(f, l, right_kind, r)
+        elif right_kind == 'nodeset':
+            return PredicateMask._compare_nodesets(lambda x, y: f(y, x), r, left_kind, l)
+
+        if left_kind == 'boolean' or right_kind == 'boolean':
+            l = PredicateMask._to_boolean(left_kind, l)
+            r = PredicateMask._to_boolean(right_kind, r)
+        elif left_kind == 'number' or right_kind == 'number':
+            l = PredicateMask._to_number(left_kind, l)
+            r = PredicateMask._to_number(right_kind, r)
+        return [f(x, y) for x, y in zip(l, r)]
+
+    @staticmethod
+    def _compare_nodesets(f, nodesets, kind, values):
+        # true for each node if any node of its nodeset compares to its
+        # value as f; the nodes' values are flattened into one column along
+        # with the index of the node they belong to
+        if kind == 'boolean':
+            # a boolean is an int to Operator._apply, so it's compared as one
+            kind = 'number'
+            values = PredicateMask._to_number('boolean', values)
+
+        owners = array('l')
+        if kind == 'number':
+            column = array('d')
+            to_number = Function._string_to_number
+            for i, ns in enumerate(nodesets):
+                for n in ns:
+                    column.append(to_number(n.get_string_value()))
+                    owners.append(i)
+        else:
+            column = []
+            for i, ns in enumerate(nodesets):
+                for n in ns:
+                    column.append(n.get_string_value())
+                    owners.append(i)
+
+        mask = [False] * len(nodesets)
+        for x, i in zip(column, owners):
+            if not mask[i] and f(x, values[i]):
+                mask[i] = True
+        return mask
@@ -0,0 +1,63 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class Profile(object):
+    '''
+    The value of a profiled evaluation of an expression, along with what
+    each of its steps did.
+
+    :param str expr: The expression
+    :param str backend: The backend the expression was evaluated with
+    '''
+    COLUMNS = ('in', 'out', 'predicates', 'sorts', 'ms')
+    ''' Headings of the columns of str(profile) after the steps '''
+
+    def __init__(self, expr, backend):
+        self.expr = expr
+        self.backend = backend
+
+        # the value of the expression
+        self.value = None
+
+        # seconds spent evaluating the expression
+        self.time = 0.0
+
+        # the number of times nodes were sorted or merged into document order
+        self.sorts = 0
+
+        # the expatriate.xpath.StepProfile of each step, in the order they
+        # appear in the expression
+        self.steps = []
+
+    def __str__(self):
+        rows = [('step',) + Profile.COLUMNS]
+        for s in self.steps:
+            rows.append(('  ' * s.depth + s.step, str(s.input_size), str(s.output_size),
+                str(s.predicate_evaluations), str(s.sorts), '%.3f' % (s.time * 1000)))
+        rows.append(('total', '', '', '', str(self.sorts), '%.3f' % (self.time * 1000)))
+
+        widths = [max([len(r[i]) for r in rows]) for i in range(len(rows[0]))]
+        lines = [self.expr + ' (' + self.backend + ')']
+        for r in rows:
+            lines.append('  '.join([r[0].ljust(widths[0])]
+                + [r[i].rjust(widths[i]) for i in range(1, len(r))]).rstrip())
+        return '\n'.join(lines)
@@ -0,0 +1,265 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+
+from .Axis import Axis
+from .ClosureCompiler import ClosureCompiler
+from .Explainer import Explainer
+from .Expression import Expression
+from .NodeSet import NodeSet
+from .Optimizer import Optimizer
+from .Predicate import Predicate
+from .Profile import Profile
+from .Step import Step
+from .StepProfile import StepProfile
+from .TreeBuilder import TreeBuilder
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class Profiler(object):
+    '''
+    Evaluates a compiled expression while recording what each of its steps
+    does, with the same backend as the expression. The profiler builds a
+    tree of its own for the expression and instruments that, so evaluating
+    the expression itself isn't slowed down.
+
+    :param expatriate.xpath.CompiledExpression compiled_expression: The expression to profile
+    '''
+    def __init__(self, compiled_expression):
+        self._expr = compiled_expression.expr
+        self._backend = compiled_expression.backend
+
+        root = TreeBuilder(compiled_expression.functions,
+            compiled_expression.namespaces).build(compiled_expression.ast)
+        if compiled_expression._optimize:
+            root = Optimizer().optimize(root)
+
+        # (step, depth) of each step, in the order they appear, and the
+        # index of each step and of the step of each predicate, by id of
+        # their nodes
+        self._steps = []
+        self._indexes = {}
+        self._owners = {}
+        self._collect(root, 0)
+        self._instrument(root)
+
+        if self._backend == 'closure':
+            self._evaluate = ClosureCompiler(wrap=self._wrap).compile(root)
+        else:
+            self._evaluate = root.evaluate
+
+        # the Profile being recorded, the indexes of the steps being
+        # evaluated, innermost last, and NodeSet.sorts when the last of them
+        # was credited with its sorts
+        self._profile = None
+        self._stack = []
+        self._mark = 0
+
+    def profile(self, context_node, variables=None):
+        '''
+        Evaluate the expression with *context_node* as the context node.
+
+        :param expatriate.Node context_node: The context node
+        :param variables: Variables to substitute in the XPath expression
+        :type variables: dict or None
+        :rtype: expatriate.xpath.Profile
+        '''
+        if context_node.get_document() is None:
+            raise ValueError("Can't resolve xpath expression on Node not attached to a document")
+
+        if variables is None:
+            variables = {}
+        else:
+            variables = dict(variables)
+
+        profile = Profile(self._expr, self._backend)
+        profile.steps = [StepProfile(step, depth) for step, depth in self._steps]
+        self._profile = profile
+        self._stack = []
+        self._mark = NodeSet.sorts
+
+        if tracing.enabled:
+            logger.debug('Profiling ' + self._expr)
+        sorts = NodeSet.sorts
+        start = time.perf_counter()
+        try:
+            profile.value = self._evaluate(context_node, 1, 1, variables)
+        finally:
+            profile.time = time.perf_counter() - start
+            self._credit_sorts()
+            profile.sorts = NodeSet.sorts - sorts
+            self._profile = None
+        return profile
+
+    def _collect(self, node, depth):
+        # number the steps under node in the order they appear
+        if isinstance(node, Axis):
+            predicates = node.children[1:]
+        elif isinstance(node, Expression) and len(node.children) > 1:
+            self._collect(node.children[0], depth)
+            predicates = node.children[1:]
+        else:
+            for c in getattr(node, 'children', ()):
+                self._collect(c, depth)
+            return
+
+        i = len(self._steps)
+        self._steps.append((Explainer().text(node), depth))
+        self._indexes[id(node)] = i
+        for p in predicates:
+            self._owners[id(p)] = i
+            self._collect(p, depth + 1)
+
+    def _index(self, node):
+        # the index of the step node is, or of the last step of a path
+        while isinstance(node, Step) and len(node.children) > 0:
+            node = node.children[-1]
+        return self._indexes.get(id(node))
+
+    def _instrument(self, root):
+        # the interpreter calls the evaluate methods of the tree, and both
+        # backends the iterate methods of paths and the masks and _filter
+        # methods of predicates, so those are replaced on this tree's nodes
+        for node in self._walk(root):
+            if isinstance(node, Axis):
+                i = self._indexes[id(node)]
+                node.evaluate = self._time(i, node.evaluate)
+                node.iterate = self._time_iteration(i, node.iterate)
+            elif isinstance(node, Expression) and len(node.children) > 1:
+                node._filter = self._time_filter(self._indexes[id(node)], node._filter)
+            elif isinstance(node, Predicate):
+                i = self._owners[id(node)]
+                node.evaluate = self._count(i, node.evaluate)
+                mask = node._batch()
+                if mask is not None:
+                    mask.mask = self._count_mask(i, mask.mask)
+            elif isinstance(node, Step):
+                i = self._index(node)
+                if i is not None:
+                    node.evaluate = self._credit(i, node.evaluate)
+
+    def _walk(self, node):
+        yield node
+        for c in getattr(node, 'children', ()):
+            yield from self._walk(c)
+
+    def _wrap(self, node, f):
+        # instrument the closures of the closure backend
+        if isinstance(node, Axis):
+            return self._time(self._indexes[id(node)], f)
+        elif isinstance(node, Predicate):
+            return self._count(self._owners[id(node)], f)
+        elif isinstance(node, Step):
+            i = self._index(node)
+            if i is not None:
+                return self._credit(i, f)
+        return f
+
+    def _enter(self, i):
+        self._credit_sorts()
+        self._stack.append(i)
+
+    def _exit(self):
+        self._credit_sorts()
+        self._stack.pop()
+
+    def _credit_sorts(self):
+        # credit the innermost step with the sorts since the last credit
+        sorts = NodeSet.sorts
+        if len(self._stack) > 0:
+            self._profile.steps[self._stack[-1]].sorts += sorts - self._mark
+        self._mark = sorts
+
+    def _time(self, i, evaluate):
+        def timed(context_node, context_position, context_size, variables):
+            step = self._profile.steps[i]
+            self._enter(i)
+            start = time.perf_counter()
+            try:
+                v = evaluate(context_node, context_position, context_size, variables)
+            finally:
+                step.time += time.perf_counter() - start
+                self._exit()
+            step.input_size += 1
+            step.output_size += len(v)
+            return v
+        return timed
+
+    def _time_iteration(self, i, iterate):
+        def timed_iteration(context_node, context_position, context_size, variables):
+            step = self._profile.steps[i]
+            step.input_size += 1
+            nodes = iter(iterate(context_node, context_position, context_size, variables))
+            while True:
+                # only the time spent finding each node counts
+                self._enter(i)
+                start = time.perf_counter()
+                try:
+                    n = next(nodes)
+                except StopIteration:
+                    return
+                finally:
+                    step.time += time.perf_counter() - start
+                    self._exit()
+                step.output_size += 1
+                yield n
+        return timed_iteration
+
+    def _time_filter(self, i, filter_):
+        def timed_filter(nodeset, context_node, variables, evaluators=None):
+            step = self._profile.steps[i]
+            self._enter(i)
+            start = time.perf_counter()
+            try:
+                v = filter_(nodeset, context_node, variables, evaluators)
+            finally:
+                step.time += time.perf_counter() - start
+                self._exit()
+            step.input_size += len(nodeset)
+            step.output_size += len(v)
+            return v
+        return timed_filter
+
+    def _count(self, i, evaluate):
+        def counted(context_node, context_position, context_size, variables):
+            self._profile.steps[i].predicate_evaluations += 1
+            return evaluate(context_node, context_position, context_size, variables)
+        return counted
+
+    def _count_mask(self, i, mask):
+        def counted_mask(nodes, context_node, variables):
+            selected = mask(nodes, context_node, variables)
+            if selected is not None:
+                # otherwise the nodes are evaluated one at a time instead
+                self._profile.steps[i].predicate_evaluations += len(nodes)
+            return selected
+        return counted_mask
+
+    def _credit(self, i, evaluate):
+        # the sorts of a path after its steps, merging what its last step
+        # selected, are credited to that step
+        def credited(context_node, context_position, context_size, variables):
+            self._enter(i)
+            try:
+                return evaluate(context_node, context_position, context_size, variables)
+            finally:
+                self._exit()
+        return credited
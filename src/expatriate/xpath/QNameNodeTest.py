@@ -23,14 +23,29 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class QNameNodeTest(NodeTest):
-    def __init__(self, name):
+    def __init__(self, name, namespace=None):
         super().__init__()
         self.name = name
+        self.namespace = namespace
+        # the expanded name nodes must have when the prefix was resolved
+        self._expanded_name = (namespace, name.partition(':')[2])
 
     def evaluate(self, context_node, context_position, context_size, variables):
+        if self.namespace is not None:
+            # prefix was resolved when the expression was compiled
+            if not hasattr(context_node, 'namespace'):
+                return False
+            # names within a document are interned, so this compares by identity
+            return context_node.get_expanded_name() == self._expanded_name
+
         if not hasattr(context_node, 'name'):
             return False
         return context_node.name == self.name
 
+    def _postings(self, index):
+        if self.namespace is not None:
+            return index.by_expanded_name(*self._expanded_name)
+        return index.by_name(self.name)
+
     def __str__(self):
         return 'QNameNodeTest ' + hex(id(self)) + ' ' + self.name + ': [' + ','.join([str(x) for x in self.children]) + ']'
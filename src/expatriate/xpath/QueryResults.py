@@ -0,0 +1,46 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class QueryResults(dict):
+    '''
+    The values of the expressions of an expatriate.xpath.QuerySet, keyed by
+    expression, in the order the expressions were given.
+
+    :param timings: The seconds spent evaluating each expression
+    :type timings: dict[str, float] or None
+    '''
+    def __init__(self, timings=None):
+        super().__init__()
+        if timings is None:
+            timings = {}
+        self._timings = timings
+
+    @property
+    def timings(self):
+        """
+        The seconds spent evaluating each expression, keyed by expression.
+        The time spent on steps that expressions share is split evenly
+        between them. Read-only.
+
+        :type: dict[str, float]
+        """
+        return self._timings
@@ -0,0 +1,187 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+from types import MappingProxyType
+
+from .CompiledExpression import CompiledExpression
+from .Function import Function
+from .NodeSet import NodeSet
+from .parser import BinaryExpr, FunctionCallExpr, LocationPath, LocationStep, Parser
+from .PathTrie import PathTrie
+from .QueryResults import QueryResults
+from .TreeBuilder import TreeBuilder
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class QuerySet(object):
+    '''
+    A set of XPath expressions evaluated together, such as the rules of a
+    Schematron-style rule pack. The location paths among them, on their own,
+    in unions or as the argument of a function, go into a trie of their
+    steps (see expatriate.xpath.PathTrie), so the steps they share are
+    evaluated once and the steps that follow go along their axis together;
+    other expressions are evaluated one by one.
+
+    :param exprs: The XPath expressions
+    :type exprs: iterable of str
+    :param functions: Functions to use within the XPath expressions in addition to the XPath 1.0 core library
+    :type functions: dict[str, function] or None
+    :param namespaces: Prefix to namespace URI mapping used to resolve QName node tests
+    :type namespaces: dict[str, str] or None
+    :param bool optimize: Optimize the expressions with expatriate.xpath.Optimizer
+    :param str backend: The backend of the expressions evaluated on their own; see expatriate.xpath.CompiledExpression
+    '''
+    def __init__(self, exprs, functions=None, namespaces=None, optimize=True, backend='closure'):
+        self._expressions = {}
+        # the keys of the location paths whose union each expression is, or
+        # None if it's evaluated on its own
+        self._paths = {}
+        # the function applied to the union, if any
+        self._functions = {}
+        self._absolute = PathTrie()
+        self._relative = PathTrie()
+
+        f = Function.FUNCTIONS.copy()
+        if functions is not None:
+            f.update(functions)
+        if namespaces is not None:
+            namespaces = MappingProxyType(dict(namespaces))
+        tree_builder = TreeBuilder(MappingProxyType(f), namespaces)
+
+        for expr in exprs:
+            if expr in self._expressions:
+                continue
+            ce = CompiledExpression(expr, functions=functions, namespaces=namespaces,
+                optimize=optimize, backend=backend)
+            self._expressions[expr] = ce
+
+            function = None
+            paths = QuerySet._location_paths(ce.ast)
+            if paths is None and isinstance(ce.ast, FunctionCallExpr) and len(ce.ast.arguments) == 1:
+                paths = QuerySet._location_paths(ce.ast.arguments[0])
+                function = ce.functions[ce.ast.name]
+            self._functions[expr] = function
+            if paths is None:
+                self._paths[expr] = None
+                continue
+
+            keys = []
+            for path in paths:
+                key = (expr, len(keys))
+                steps = path.steps
+                if optimize:
+                    steps = QuerySet._collapse_descendant(steps, tree_builder)
+                if path.absolute:
+                    self._absolute.insert(steps, key, expr, tree_builder, optimize)
+                else:
+                    self._relative.insert(steps, key, expr, tree_builder, optimize)
+                keys.append(key)
+            self._paths[expr] = keys
+
+        if tracing.enabled:
+            logger.debug('Query set of ' + str(len(self._expressions)) + ' expressions, '
+                + str(len([k for k in self._paths.values() if k is not None])) + ' in the trie')
+
+    @property
+    def expressions(self):
+        """
+        The compiled expressions of this set, keyed by expression. Read-only.
+
+        :type: dict[str, expatriate.xpath.CompiledExpression]
+        """
+        return MappingProxyType(self._expressions)
+
+    def evaluate(self, context_node, variables=None):
+        '''
+        Evaluate all the expressions with *context_node* as the context
+        node.
+
+        :param expatriate.Node context_node: The context node; absolute location paths start from its document
+        :param variables: Variables to substitute in the XPath expressions
+        :type variables: dict or None
+        :rtype: expatriate.xpath.QueryResults
+        '''
+        document = context_node.get_document()
+        if document is None:
+            raise ValueError("Can't resolve xpath expression on Node not attached to a document")
+
+        if variables is None:
+            variables = {}
+        else:
+            variables = dict(variables)
+
+        nodesets = {}
+        timings = dict.fromkeys(self._expressions, 0.0)
+        self._absolute.evaluate(NodeSet([document], ordered=True), variables, nodesets, timings)
+        self._relative.evaluate(NodeSet([context_node], ordered=True), variables, nodesets, timings)
+
+        results = QueryResults(timings)
+        for expr, ce in self._expressions.items():
+            start = time.perf_counter()
+            keys = self._paths[expr]
+            if keys is None:
+                results[expr] = ce.evaluate(context_node, variables)
+            else:
+                if len(keys) == 1:
+                    v = nodesets[keys[0]]
+                else:
+                    v = NodeSet.merge([nodesets[k] for k in keys])
+                function = self._functions[expr]
+                if function is not None:
+                    v = function([v], context_node, 1, 1, variables)
+                results[expr] = v
+            timings[expr] += time.perf_counter() - start
+        return results
+
+    @staticmethod
+    def _location_paths(node):
+        # the location paths the expression is a union of, or None if it
+        # isn't one
+        if isinstance(node, LocationPath):
+            return [node]
+        elif isinstance(node, BinaryExpr) and node.op == '|':
+            left = QuerySet._location_paths(node.left)
+            right = QuerySet._location_paths(node.right)
+            if left is None or right is None:
+                return None
+            return left + right
+        return None
+
+    @staticmethod
+    def _collapse_descendant(steps, tree_builder):
+        # descendant-or-self::node()/child::name is descendant::name when
+        # the child step's predicates don't depend on position, as in
+        # expatriate.xpath.Optimizer; // then takes a single walk
+        collapsed = []
+        i = 0
+        while i < len(steps):
+            step = steps[i]
+            if step == Parser.DESCENDANT_OR_SELF and i + 1 < len(steps) \
+            and steps[i + 1].axis == 'child':
+                child = steps[i + 1]
+                axis = tree_builder.build(LocationPath(False, (child,)))
+                if not any([p._depends_on_position() for p in axis.children[1:]]):
+                    collapsed.append(LocationStep('descendant', child.node_test, child.predicates))
+                    i += 2
+                    continue
+            collapsed.append(step)
+            i += 1
+        return collapsed
@@ -0,0 +1,111 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from collections import OrderedDict
+
+from .NodeSet import NodeSet
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class ResultCache(object):
+    '''
+    Bounded least recently used cache of the results of XPath expressions
+    evaluated against a document. Results are keyed by the compiled
+    expression, the context node and the variables, and are only used while
+    the document is unchanged since they were computed.
+
+    :param expatriate.Document document: The document whose results are cached
+    :param int maxsize: The maximum number of results to keep
+    '''
+    def __init__(self, document, maxsize=256):
+        self.document = document
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def get(self, compiled_expression, context_node, variables=None):
+        '''
+        Return the result of evaluating *compiled_expression* with
+        *context_node* as the context node, evaluating it if there's no
+        result from since the document last changed. Evaluations with
+        variables that aren't hashable, such as nodesets, aren't cached.
+
+        :param expatriate.xpath.CompiledExpression compiled_expression: The expression
+        :param expatriate.Node context_node: The context node
+        :param variables: Variables to substitute in the XPath expression
+        :type variables: dict or None
+        :rtype: list[expatriate.Node] or str or int or float or bool
+        '''
+        key = ResultCache._key(compiled_expression, context_node, variables)
+        if key is None:
+            return compiled_expression.evaluate(context_node, variables)
+
+        mutations = self.document._mutations
+        entry = self._results.get(key)
+        if (
+            entry is not None
+            and entry[0] == mutations
+            and entry[1] is context_node
+        ):
+            self.hits += 1
+            self._results.move_to_end(key)
+            if tracing.enabled:
+                logger.debug('Result cache hit for ' + compiled_expression.expr)
+            return ResultCache._copy(entry[2])
+
+        self.misses += 1
+        result = compiled_expression.evaluate(context_node, variables)
+        self._results[key] = (mutations, context_node, result)
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return ResultCache._copy(result)
+
+    def clear(self):
+        '''
+        Empty the cache and reset the hit & miss counters.
+        '''
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    @staticmethod
+    def _key(compiled_expression, context_node, variables):
+        if not variables:
+            return (compiled_expression, id(context_node), None)
+        try:
+            return (compiled_expression, id(context_node),
+                frozenset(variables.items()))
+        except TypeError:
+            # a nodeset or other unhashable value
+            return None
+
+    @staticmethod
+    def _copy(result):
+        # callers are free to change the nodesets they're given
+        if isinstance(result, NodeSet):
+            return NodeSet(result, ordered=result.ordered)
+        elif isinstance(result, list):
+            return list(result)
+        return result
@@ -17,22 +17,34 @@
 
 import logging
 
+from .NodeSet import NodeSet
 from .Step import Step
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class RootStep(Step):
-    def __init__(self, document):
-        self.children = []
-        self._document = document
-
     def evaluate(self, context_node, context_position, context_size, variables):
+        document = context_node.get_document()
+        if len(self.children) == 0:
+            if tracing.enabled:
+                logger.debug('Root step with no children: using ' + str(document) + ' as the result set')
+            return NodeSet([document], ordered=True)
+        else:
+            return super().evaluate(document, 1, 1, variables)
+
+    def iterate(self, context_node, context_position, context_size, variables):
+        document = context_node.get_document()
         if len(self.children) == 0:
-            logger.debug('Root step with no children: using ' + str(self._document) + ' as the result set')
-            return [self._document]
+            return iter([document])
         else:
-            return super().evaluate(self._document, 1, 1, variables)
+            return super().iterate(document, 1, 1, variables)
+
+    def is_ordered(self):
+        if len(self.children) == 0:
+            return True
+        return super().is_ordered()
 
     def __str__(self):
         return 'RootStep ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
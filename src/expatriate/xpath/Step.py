@@ -19,6 +19,8 @@ import logging
 
 from .Axis import Axis
 from .exceptions import *
+from .NodeSet import NodeSet
+from .. import tracing
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -28,29 +30,79 @@ class Step(object):
         self.children = []
 
     def evaluate(self, context_node, context_position, context_size, variables):
-        from ..Document import Document
         if len(self.children) == 1:
-            logger.debug('Collecting nodes with ' + str(self.children[0]) + ' for context node ' + str(context_node))
+            if tracing.enabled:
+                logger.debug('Collecting nodes with ' + str(self.children[0]) + ' for context node ' + str(context_node))
             ns = self.children[0].evaluate(context_node, context_position, context_size, variables)
-            logger.debug('Nodes from ' + str(self.children[0]) + ': [' + ','.join([str(x) for x in ns]) + ']')
+            if tracing.enabled:
+                logger.debug('Nodes from ' + str(self.children[0]) + ': [' + ','.join([str(x) for x in ns]) + ']')
 
-            logger.debug(str(self) + ' nodeset: [' + ','.join([str(x) for x in ns]) + ']')
+                logger.debug(str(self) + ' nodeset: [' + ','.join([str(x) for x in ns]) + ']')
             return ns
         elif len(self.children) == 2:
-            logger.debug('Collecting context nodes with ' + str(self.children[0]) + ' for context node ' + str(context_node))
+            next_ = self.children[1]
+            if tracing.enabled:
+                logger.debug('Collecting context nodes with ' + str(self.children[0]) + ' for context node ' + str(context_node))
             context_nodes = self.children[0].evaluate(context_node, context_position, context_size, variables)
-            logger.debug('Context nodes from ' + str(self.children[0]) + ': [' + ','.join([str(x) for x in context_nodes]) + ']')
+            if tracing.enabled:
+                logger.debug('Context nodes from ' + str(self.children[0]) + ': [' + ','.join([str(x) for x in context_nodes]) + ']')
 
-            ns = []
+            runs = []
             for i, cn in enumerate(context_nodes):
-                logger.debug('Evaluating ' + str(self.children[1]) + ' with context ' + str(cn))
-                ns.extend(self.children[1].evaluate(cn, i+1, len(context_nodes), variables))
+                if tracing.enabled:
+                    logger.debug('Evaluating ' + str(next_) + ' with context ' + str(cn))
+                runs.append(next_.evaluate(cn, i+1, len(context_nodes), variables))
 
-            ns = Document.order_sort(ns)
-            logger.debug(str(self) + ' nodeset: [' + ','.join([str(x) for x in ns]) + ']')
+            ns = NodeSet.merge(runs)
+            if tracing.enabled:
+                logger.debug(str(self) + ' nodeset: [' + ','.join([str(x) for x in ns]) + ']')
             return ns
         else:
             raise XPathSyntaxException('Steps require between 1 and 2 children')
 
+    def iterate(self, context_node, context_position, context_size, variables):
+        '''
+        Select the nodes of this step lazily. Unless is_ordered() is True,
+        the nodes may come in any order and more than once.
+
+        :rtype: iterator of expatriate.Node
+        '''
+        if len(self.children) == 1:
+            return Step._iterate_part(self.children[0], context_node, context_position, context_size, variables)
+        elif len(self.children) == 2:
+            context_nodes = Step._iterate_part(self.children[0], context_node, context_position, context_size, variables)
+            return Step._chain(self.children[1], context_nodes, variables)
+        else:
+            raise XPathSyntaxException('Steps require between 1 and 2 children')
+
+    def is_ordered(self):
+        '''
+        Check if iterate() yields nodes in document order, each just once.
+
+        :rtype: bool
+        '''
+        # the results of more than one context node may interleave
+        return len(self.children) == 1 and Step._part_ordered(self.children[0])
+
+    @staticmethod
+    def _iterate_part(part, context_node, context_position, context_size, variables):
+        if hasattr(part, 'iterate'):
+            return part.iterate(context_node, context_position, context_size, variables)
+        v = part.evaluate(context_node, context_position, context_size, variables)
+        if not isinstance(v, list):
+            raise XPathSyntaxException(str(part) + ' does not select nodes')
+        return iter(v)
+
+    @staticmethod
+    def _part_ordered(part):
+        return hasattr(part, 'is_ordered') and part.is_ordered()
+
+    @staticmethod
+    def _chain(next_, context_nodes, variables):
+        for i, cn in enumerate(context_nodes):
+            # the size of the context nodeset isn't known yet; path steps
+            # don't use it
+            yield from Step._iterate_part(next_, cn, i+1, None, variables)
+
     def __str__(self):
         return 'Step ' + hex(id(self)) + ': [' + ','.join([str(x) for x in self.children]) + ']'
@@ -0,0 +1,58 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class StepProfile(object):
+    '''
+    What one step of an expression did during a profiled evaluation: a
+    location step, or the predicates of a filter expression.
+
+    :param str step: The step, in unabbreviated XPath
+    :param int depth: The number of steps whose predicates the step is nested within
+    '''
+    def __init__(self, step, depth=0):
+        self.step = step
+        self.depth = depth
+
+        # the number of nodes the step was applied to: context nodes for a
+        # location step, the nodes filtered for a filter expression
+        self.input_size = 0
+
+        # the number of nodes the step selected, summed over the nodes it was
+        # applied to
+        self.output_size = 0
+
+        # the number of nodes the step's predicates were evaluated for
+        self.predicate_evaluations = 0
+
+        # seconds spent in the step, including its predicates
+        self.time = 0.0
+
+        # the number of times nodes were sorted or merged into document order
+        # while the step was the innermost one being evaluated, including
+        # merging what it selected for each of its context nodes
+        self.sorts = 0
+
+    def __str__(self):
+        return 'StepProfile ' + hex(id(self)) + ' ' + self.step + ': ' \
+            + str(self.input_size) + ' in, ' + str(self.output_size) + ' out, ' \
+            + str(self.predicate_evaluations) + ' predicate evaluations, ' \
+            + str(self.sorts) + ' sorts, ' + str(self.time) + 's'
@@ -0,0 +1,152 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from .AnyNodeTest import AnyNodeTest
+from .Axis import Axis
+from .exceptions import *
+from .Expression import Expression
+from .Function import Function
+from .Literal import Literal
+from .NCNameNodeTest import NCNameNodeTest
+from .Operator import Operator
+from .parser.NodeTypeTest import NodeTypeTest
+from .Predicate import Predicate
+from .QNameNodeTest import QNameNodeTest
+from .RootStep import RootStep
+from .Step import Step
+from .TypeNodeTest import TypeNodeTest
+from .VariableReference import VariableReference
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class TreeBuilder(object):
+    '''
+    Builds the tree of evaluation objects (Axis, Step, Operator, ...) for
+    an expression from its syntax tree, resolving function names and
+    namespace prefixes.
+
+    :param functions: The functions available to the expression
+    :type functions: dict[str, function]
+    :param namespaces: Prefix to namespace URI mapping used to resolve QName node tests
+    :type namespaces: dict[str, str] or None
+    '''
+    def __init__(self, functions, namespaces=None):
+        self._functions = functions
+        self._namespaces = namespaces
+
+    def build(self, node):
+        '''
+        Build the evaluation tree of a syntax tree.
+
+        :param node: The root of the syntax tree, from expatriate.xpath.parser.parse
+        :rtype: the root of the evaluation tree
+        :raises expatriate.xpath.XPathSyntaxException: if the expression calls an unknown function
+        '''
+        return getattr(self, '_build_' + type(node).__name__)(node)
+
+    def _build_LiteralExpr(self, node):
+        return Literal(node.value)
+
+    def _build_VariableExpr(self, node):
+        return VariableReference(node.name)
+
+    def _build_FunctionCallExpr(self, node):
+        if node.name not in self._functions:
+            raise XPathSyntaxException('Unknown function or node type test: ' + node.name)
+        f = Function(node.name, self._functions[node.name])
+        for arg in node.arguments:
+            f.children.append(self._expression(arg))
+        return f
+
+    def _build_NegateExpr(self, node):
+        o = Operator('negate')
+        o.children.append(self.build(node.operand))
+        return o
+
+    def _build_BinaryExpr(self, node):
+        o = Operator(node.op)
+        o.children.append(self.build(node.left))
+        o.children.append(self.build(node.right))
+        return o
+
+    def _build_FilterExpr(self, node):
+        e = self._expression(node.primary)
+        e.children.extend([self._predicate(p) for p in node.predicates])
+        return e
+
+    def _build_PathExpr(self, node):
+        s = Step()
+        s.children.append(self.build(node.filter))
+        s.children.append(self._steps(node.path.steps))
+        return s
+
+    def _build_LocationPath(self, node):
+        if node.absolute:
+            s = RootStep()
+            if len(node.steps) > 0:
+                s.children.append(self._build_LocationStep(node.steps[0]))
+            if len(node.steps) > 1:
+                s.children.append(self._steps(node.steps[1:]))
+            return s
+        elif len(node.steps) == 1:
+            return self._build_LocationStep(node.steps[0])
+        else:
+            return self._steps(node.steps)
+
+    def _steps(self, steps):
+        # Step[first, Step[second, ...]]
+        s = Step()
+        s.children.append(self._build_LocationStep(steps[0]))
+        if len(steps) > 1:
+            s.children.append(self._steps(steps[1:]))
+        return s
+
+    def _build_LocationStep(self, node):
+        a = Axis(node.axis)
+        a.children.append(self._node_test(a, node.node_test))
+        a.children.extend([self._predicate(p) for p in node.predicates])
+        return a
+
+    def _node_test(self, axis, node):
+        if isinstance(node, NodeTypeTest):
+            return TypeNodeTest(node.node_type)
+
+        if node.prefix is None:
+            if node.local_name == '*':
+                return AnyNodeTest(axis.get_principal_node_type())
+            return NCNameNodeTest(node.local_name)
+
+        if node.local_name == '*':
+            raise XPathSyntaxException('Namespace wildcard node tests are not supported: ' + node.prefix + ':*')
+        if self._namespaces is not None and node.prefix in self._namespaces:
+            return QNameNodeTest(node.prefix + ':' + node.local_name,
+                namespace=self._namespaces[node.prefix])
+        return QNameNodeTest(node.prefix + ':' + node.local_name)
+
+    def _predicate(self, node):
+        p = Predicate()
+        p.children.append(self._expression(node))
+        return p
+
+    def _expression(self, node):
+        e = Expression()
+        e.children.append(self.build(node))
+        return e
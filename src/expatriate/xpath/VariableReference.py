@@ -0,0 +1,38 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from .exceptions import *
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class VariableReference(object):
+    def __init__(self, name):
+        self.name = name
+
+    def evaluate(self, context_node, context_position, context_size, variables):
+        if self.name not in variables:
+            raise XPathSyntaxException('Undefined variable: $' + self.name)
+        if tracing.enabled:
+            logger.debug('Variable $' + self.name + ' is ' + str(variables[self.name]))
+        return variables[self.name]
+
+    def __str__(self):
+        return 'VariableReference ' + hex(id(self)) + ' $' + self.name
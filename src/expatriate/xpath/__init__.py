@@ -18,14 +18,65 @@
 from .exceptions import *
 from .AnyNodeTest import AnyNodeTest
 from .Axis import Axis
+from .ClosureCompiler import ClosureCompiler
+from .CompiledExpression import CompiledExpression
+from .Explainer import Explainer
 from .Expression import Expression
+from .ExpressionCache import ExpressionCache
 from .Function import Function
+from .HoistedExpression import HoistedExpression
 from .Literal import Literal
 from .NCNameNodeTest import NCNameNodeTest
+from .NodeSet import NodeSet
 from .NodeTest import NodeTest
 from .Operator import Operator
+from .Optimizer import Optimizer
+from .PathTrie import PathTrie
 from .Predicate import Predicate
+from .PredicateMask import PredicateMask
+from .Profile import Profile
+from .Profiler import Profiler
 from .QNameNodeTest import QNameNodeTest
+from .QueryResults import QueryResults
+from .QuerySet import QuerySet
+from .ResultCache import ResultCache
 from .RootStep import RootStep
 from .Step import Step
+from .StepProfile import StepProfile
+from .TreeBuilder import TreeBuilder
 from .TypeNodeTest import TypeNodeTest
+from .VariableReference import VariableReference
+
+expression_cache = ExpressionCache()
+''' Cache of the expressions compiled by expatriate.Node.xpath '''
+
+def compile(expr, functions=None, namespaces=None, optimize=True, backend='closure'):
+    '''
+    Compile an XPath expression for repeated evaluation.
+
+    :param str expr: XPath expression
+    :param functions: Functions to use within the XPath expression in addition to the XPath 1.0 core library
+    :type functions: dict[str, function] or None
+    :param namespaces: Prefix to namespace URI mapping used to resolve QName node tests
+    :type namespaces: dict[str, str] or None
+    :param bool optimize: Rewrite the parsed expression with expatriate.xpath.Optimizer
+    :param str backend: 'closure' or 'interpreter'; see expatriate.xpath.CompiledExpression
+    :rtype: expatriate.xpath.CompiledExpression
+    '''
+    return CompiledExpression(expr, functions=functions, namespaces=namespaces, optimize=optimize, backend=backend)
+
+def explain(expr, functions=None, namespaces=None, optimize=True, file=None):
+    '''
+    Print the plan an XPath expression is evaluated by; see
+    expatriate.xpath.CompiledExpression.explain.
+
+    :param str expr: XPath expression
+    :param functions: Functions to use within the XPath expression in addition to the XPath 1.0 core library
+    :type functions: dict[str, function] or None
+    :param namespaces: Prefix to namespace URI mapping used to resolve QName node tests
+    :type namespaces: dict[str, str] or None
+    :param bool optimize: Show the expression as rewritten by expatriate.xpath.Optimizer
+    :param file: Where to print the plan. Defaults to sys.stdout
+    :type file: file object or None
+    '''
+    print(compile(expr, functions=functions, namespaces=namespaces, optimize=optimize).explain(), file=file)
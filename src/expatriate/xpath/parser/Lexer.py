@@ -0,0 +1,129 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import re
+
+from ..exceptions import *
+from .Token import Token
+from ... import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class Lexer(object):
+    '''
+    Splits XPath expressions into tokens with a single compiled regular
+    expression, then classifies names and * following the disambiguation
+    rules of XPath 1.0 section 3.7.
+    '''
+
+    NCNAME = r'[^\W\d][\w.\-]*'
+
+    PATTERN = re.compile(r'''
+        \s*
+        (
+            [0-9]+(?:\.[0-9]*)? | \.[0-9]+
+            | "[^"]*" | '[^']*'
+            | \$NCNAME(?::NCNAME)?
+            | NCNAME(?::(?:NCNAME|\*))? | \*
+            | // | :: | \.\. | != | <= | >=
+            | [/()\[\]@,|+\-=<>.]
+            | \S
+        )
+    '''.replace('NCNAME', NCNAME), re.VERBOSE)
+
+    PUNCTUATION = {
+        '/': 'operator',
+        '//': 'operator',
+        '|': 'operator',
+        '+': 'operator',
+        '-': 'operator',
+        '=': 'operator',
+        '!=': 'operator',
+        '<': 'operator',
+        '<=': 'operator',
+        '>': 'operator',
+        '>=': 'operator',
+        '(': '(',
+        ')': ')',
+        '[': '[',
+        ']': ']',
+        '.': '.',
+        '..': '..',
+        '@': '@',
+        ',': ',',
+        '::': '::',
+    }
+    ''' Token type of each punctuation token '''
+
+    OPERATOR_NAMES = ('and', 'or', 'mod', 'div')
+
+    NODE_TYPES = ('comment', 'text', 'processing-instruction', 'node')
+
+    # tokens after which * and names are name tests rather than operators
+    NAME_TEST_CONTEXT = ('@', '::', '(', '[', ',', 'operator')
+
+    @staticmethod
+    def tokenize(expr):
+        '''
+        Split an XPath expression into tokens.
+
+        :param str expr: XPath expression
+        :rtype: list[expatriate.xpath.parser.Token]
+        :raises expatriate.xpath.XPathSyntaxException: if expr has characters that can't start a token
+        '''
+        tokens = []
+        for value in Lexer.PATTERN.findall(expr):
+            c = value[0]
+            kind = Lexer.PUNCTUATION.get(value)
+            if kind is not None:
+                if value in ('(', '::') and len(tokens) > 0 and tokens[-1].type == 'name' \
+                and tokens[-1].value != '*':
+                    # a name followed by ( or :: is a function, node type or
+                    # axis
+                    tokens[-1] = Token(Lexer._call_type(tokens[-1].value, value), tokens[-1].value)
+            elif c.isdigit() or c == '.':
+                kind = 'number'
+            elif c in '"\'':
+                if len(value) < 2:
+                    raise XPathSyntaxException('Literal not closed in ' + repr(expr))
+                kind = 'literal'
+            elif c == '$':
+                kind = 'variable'
+            elif c.isalpha() or c in '_*':
+                if len(tokens) > 0 and tokens[-1].type not in Lexer.NAME_TEST_CONTEXT \
+                and (value == '*' or value in Lexer.OPERATOR_NAMES):
+                    # after an operand, * multiplies and names are operators
+                    kind = 'operator'
+                else:
+                    kind = 'name'
+            else:
+                raise XPathSyntaxException('Unexpected ' + repr(value) + ' in ' + repr(expr))
+            tokens.append(Token(kind, value))
+
+        if tracing.enabled:
+            logger.debug('Tokens: ' + str(tokens))
+        return tokens
+
+    @staticmethod
+    def _call_type(name, following):
+        if following == '::':
+            return 'axis'
+        elif name in Lexer.NODE_TYPES:
+            return 'node-type'
+        return 'function'
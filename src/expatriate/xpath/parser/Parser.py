@@ -0,0 +1,269 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from ..exceptions import *
+from .BinaryExpr import BinaryExpr
+from .FilterExpr import FilterExpr
+from .FunctionCallExpr import FunctionCallExpr
+from .Lexer import Lexer
+from .LiteralExpr import LiteralExpr
+from .LocationPath import LocationPath
+from .LocationStep import LocationStep
+from .NameTest import NameTest
+from .NegateExpr import NegateExpr
+from .NodeTypeTest import NodeTypeTest
+from .PathExpr import PathExpr
+from .VariableExpr import VariableExpr
+from ... import tracing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class Parser(object):
+    '''
+    Precedence climbing parser turning the tokens of an XPath expression
+    into an immutable abstract syntax tree
+
+    :param tokens: The tokens of the expression
+    :type tokens: list[expatriate.xpath.parser.Token]
+    :param str expr: The expression, for error messages
+    '''
+
+    PRECEDENCE = {
+        'or': 1,
+        'and': 2,
+        '=': 3, '!=': 3,
+        '<': 4, '<=': 4, '>': 4, '>=': 4,
+        '+': 5, '-': 5,
+        '*': 6, 'div': 6, 'mod': 6,
+    }
+    ''' Binding strength of the binary operators; | binds tighter than unary minus and is handled apart '''
+
+    AXES = (
+        'ancestor', 'ancestor-or-self', 'attribute', 'child', 'descendant',
+        'descendant-or-self', 'following', 'following-sibling', 'namespace',
+        'parent', 'preceding', 'preceding-sibling', 'self',
+    )
+
+    CONSTANTS = {
+        'true': True,
+        'false': False,
+        'NaN': float('nan'),
+        'Infinity': float('inf'),
+    }
+    ''' Names accepted as constants where a location path would otherwise start '''
+
+    DESCENDANT_OR_SELF = LocationStep('descendant-or-self', NodeTypeTest('node', None), ())
+    SELF = LocationStep('self', NodeTypeTest('node', None), ())
+    PARENT = LocationStep('parent', NodeTypeTest('node', None), ())
+
+    def __init__(self, tokens, expr=''):
+        self._tokens = tokens
+        self._expr = expr
+        self._i = 0
+
+    def parse(self):
+        '''
+        Parse the tokens into an expression.
+
+        :rtype: the root of the syntax tree
+        :raises expatriate.xpath.XPathSyntaxException: if the tokens aren't a valid expression
+        '''
+        self._i = 0
+        e = self._binary(1)
+        if self._i < len(self._tokens):
+            self._error('Unexpected ' + repr(self._tokens[self._i].value))
+        if tracing.enabled:
+            logger.debug('Parsed ' + self._expr + ' to ' + str(e))
+        return e
+
+    def _peek(self):
+        if self._i < len(self._tokens):
+            return self._tokens[self._i]
+        return None
+
+    def _next(self):
+        t = self._peek()
+        if t is None:
+            self._error('Unexpected end of expression')
+        self._i += 1
+        return t
+
+    def _accept(self, type_, value=None):
+        # consume the next token if it matches
+        t = self._peek()
+        if t is not None and t.type == type_ and (value is None or t.value == value):
+            self._i += 1
+            return t
+        return None
+
+    def _expect(self, type_):
+        t = self._accept(type_)
+        if t is None:
+            t = self._peek()
+            self._error('Expecting ' + type_ + (' but got ' + repr(t.value) if t is not None else ' at end of expression'))
+        return t
+
+    def _error(self, message):
+        raise XPathSyntaxException(message + ' in ' + repr(self._expr))
+
+    def _binary(self, min_precedence):
+        # operators binding at least as tightly as min_precedence
+        left = self._unary()
+        while True:
+            t = self._peek()
+            if t is None or t.type != 'operator' or t.value not in Parser.PRECEDENCE:
+                return left
+            precedence = Parser.PRECEDENCE[t.value]
+            if precedence < min_precedence:
+                return left
+            self._i += 1
+            # all the binary operators are left associative
+            right = self._binary(precedence + 1)
+            left = BinaryExpr(t.value, left, right)
+
+    def _unary(self):
+        if self._accept('operator', '-'):
+            return NegateExpr(self._unary())
+        return self._union()
+
+    def _union(self):
+        left = self._path()
+        while self._accept('operator', '|'):
+            left = BinaryExpr('|', left, self._path())
+        return left
+
+    def _path(self):
+        t = self._peek()
+        if t is None:
+            self._error('Unexpected end of expression')
+
+        if t.type in ('variable', 'literal', 'number', 'function', '('):
+            e = self._primary()
+            predicates = self._predicates()
+            if len(predicates) > 0:
+                e = FilterExpr(e, predicates)
+            t = self._peek()
+            if t is not None and t.type == 'operator' and t.value in ('/', '//'):
+                e = PathExpr(e, LocationPath(False, self._relative_steps(True)))
+            return e
+
+        if t.type == 'name' and t.value in Parser.CONSTANTS:
+            following = self._tokens[self._i + 1] if self._i + 1 < len(self._tokens) else None
+            if following is None or following.value not in ('[', '/', '//'):
+                self._i += 1
+                return LiteralExpr(Parser.CONSTANTS[t.value])
+
+        return self._location_path()
+
+    def _primary(self):
+        t = self._next()
+        if t.type == 'variable':
+            return VariableExpr(t.value[1:])
+        elif t.type == '(':
+            e = self._binary(1)
+            self._expect(')')
+            return e
+        elif t.type == 'literal':
+            return LiteralExpr(t.value[1:-1])
+        elif t.type == 'number':
+            if '.' in t.value:
+                return LiteralExpr(float(t.value))
+            return LiteralExpr(int(t.value))
+        else:
+            self._expect('(')
+            args = []
+            if not self._accept(')'):
+                args.append(self._binary(1))
+                while self._accept(','):
+                    args.append(self._binary(1))
+                self._expect(')')
+            return FunctionCallExpr(t.value, tuple(args))
+
+    def _location_path(self):
+        if self._accept('operator', '/'):
+            if self._starts_step(self._peek()):
+                return LocationPath(True, self._relative_steps(False))
+            return LocationPath(True, ())
+        elif self._peek().type == 'operator' and self._peek().value == '//':
+            return LocationPath(True, self._relative_steps(True))
+        return LocationPath(False, self._relative_steps(False))
+
+    def _starts_step(self, t):
+        return t is not None and (t.type in ('name', 'axis', 'node-type', '.', '..', '@'))
+
+    def _relative_steps(self, separated):
+        # steps separated by / or //; if separated, the first step is
+        # preceded by one too
+        steps = []
+        if not separated:
+            steps.append(self._step())
+        while True:
+            t = self._peek()
+            if t is None or t.type != 'operator' or t.value not in ('/', '//'):
+                return tuple(steps)
+            self._i += 1
+            if t.value == '//':
+                steps.append(Parser.DESCENDANT_OR_SELF)
+            steps.append(self._step())
+
+    def _step(self):
+        t = self._next()
+        if t.type == '.':
+            return Parser.SELF
+        elif t.type == '..':
+            return Parser.PARENT
+
+        if t.type == 'axis':
+            if t.value not in Parser.AXES:
+                self._error('Unknown axis: ' + t.value)
+            axis = t.value
+            self._expect('::')
+            t = self._next()
+        elif t.type == '@':
+            axis = 'attribute'
+            t = self._next()
+        else:
+            axis = 'child'
+
+        if t.type == 'name':
+            prefix, sep, local_name = t.value.rpartition(':')
+            node_test = NameTest(prefix if sep else None, local_name)
+        elif t.type == 'node-type':
+            self._expect('(')
+            literal = None
+            if t.value == 'processing-instruction':
+                l = self._accept('literal')
+                if l is not None:
+                    literal = l.value[1:-1]
+            self._expect(')')
+            node_test = NodeTypeTest(t.value, literal)
+        elif t.type == 'function':
+            self._error('Unknown function or node type test: ' + t.value)
+        else:
+            self._error('Expecting a node test but got ' + repr(t.value))
+
+        return LocationStep(axis, node_test, self._predicates())
+
+    def _predicates(self):
+        predicates = []
+        while self._accept('['):
+            predicates.append(self._binary(1))
+            self._expect(']')
+        return tuple(predicates)
@@ -0,0 +1,41 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+from .BinaryExpr import BinaryExpr
+from .FilterExpr import FilterExpr
+from .FunctionCallExpr import FunctionCallExpr
+from .Lexer import Lexer
+from .LiteralExpr import LiteralExpr
+from .LocationPath import LocationPath
+from .LocationStep import LocationStep
+from .NameTest import NameTest
+from .NegateExpr import NegateExpr
+from .NodeTypeTest import NodeTypeTest
+from .Parser import Parser
+from .PathExpr import PathExpr
+from .Token import Token
+from .VariableExpr import VariableExpr
+
+def parse(expr):
+    '''
+    Parse an XPath expression into an immutable syntax tree.
+
+    :param str expr: XPath expression
+    :rtype: the root of the syntax tree
+    :raises expatriate.xpath.XPathSyntaxException: if expr isn't a valid expression
+    '''
+    return Parser(Lexer.tokenize(expr), expr).parse()
@@ -0,0 +1,158 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+from expatriate.xpath.Predicate import Predicate
+
+XML = '''<catalog xmlns:t="http://jaymes.biz/test">
+    <item id="a" sku="X-1"><price amount="50"/></item>
+    <item id="b" sku="X-2"><price amount="150"/></item>
+    <item id="c" sku="X-1"><price amount="100"/><item id="d" sku="X-3"/></item>
+    <item id="e" t:sku="X-2"><price amount="n/a"/></item>
+</catalog>'''
+
+doc = Document()
+doc.parse(XML)
+doc.create_index('sku')
+doc.create_index('amount')
+a, b, c, e = doc.root_element.children
+d = c[1]
+
+unindexed = Document()
+unindexed.parse(XML)
+
+def _no_predicates(monkeypatch):
+    def evaluate(self, *args):
+        raise AssertionError('Predicate evaluated without the index')
+    monkeypatch.setattr(Predicate, 'evaluate', evaluate)
+
+def test_equal():
+    index = doc.get_index('sku')
+    assert len(index) == 5
+    assert Document.order_sort(index.equal('X-1')) == [a, c]
+    assert Document.order_sort(index.equal('X-2')) == [b, e]
+    assert index.equal('X-9') == []
+
+def test_namespaced():
+    n = Document()
+    n.parse(XML)
+    index = n.create_index('sku', namespace='http://jaymes.biz/test')
+    assert len(index) == 1
+    assert index.equal('X-2') == [n.root_element[3]]
+
+@pytest.mark.parametrize('op, number, expected', [
+    ('=', 100, ['c']),
+    ('<', 100, ['a']),
+    ('<=', 100, ['a', 'c']),
+    ('>', 100, ['b']),
+    ('>=', 50, ['a', 'b', 'c']),
+])
+def test_compare(op, number, expected):
+    index = doc.get_index('amount')
+    assert sorted([n.parent.attributes['id'] for n in index.compare(op, number)]) == expected
+
+def test_create_returns_existing():
+    n = Document()
+    n.parse(XML)
+    assert n.create_index('sku') is n.create_index('sku')
+    assert n.get_index('sku') is n.create_index('sku')
+    assert n.get_index('amount') is None
+
+def test_drop_index():
+    n = Document()
+    n.parse(XML)
+    n.create_index('sku')
+    n.drop_index('sku')
+    assert n.get_index('sku') is None
+    assert len(n.xpath('//item[@sku="X-1"]')) == 2
+
+def test_created_before_parse():
+    n = Document()
+    n.create_index('sku')
+    n.parse(XML)
+    assert Document.order_sort(n.get_index('sku').equal('X-1')) == [n.root_element[0], n.root_element[2]]
+
+@pytest.mark.parametrize('expr', [
+    '//item[@sku="X-1"]',
+    '//item[@sku="X-2"]',
+    '//item[@sku="X-1"][2]',
+    '//item[2][@sku="X-1"]',
+    '//*[@sku="X-3"]',
+    '/catalog/item[@sku="X-1"]',
+    '/catalog/item/item[@sku="X-3"]',
+    'descendant::item["X-1"=@sku]',
+    '//price[@amount > 60]',
+    '//price[@amount >= 100]',
+    '//price[@amount < 100]',
+    '//price[100 > @amount]',
+    '//price[@amount = 150]',
+    '//price[@amount != 150]',
+    '//item[@sku != "X-1"]',
+    '//item[@sku="X-1"]/price',
+])
+def test_matches_unindexed(expr):
+    assert [n.get_document_order() for n in doc.xpath(expr)] \
+        == [n.get_document_order() for n in unindexed.xpath(expr)]
+
+def test_uses_index(monkeypatch):
+    _no_predicates(monkeypatch)
+    assert doc.xpath('//item[@sku="X-1"]') == [a, c]
+    assert len(doc.xpath('//price[@amount > 60]')) == 2
+
+def test_attribute_added():
+    n = Document()
+    n.parse(XML)
+    n.create_index('sku')
+    n.root_element[1].attributes['sku'] = 'X-1'
+    assert n.xpath('//item[@sku="X-1"]') == n.root_element.children[:3]
+    assert n.xpath('//item[@sku="X-2"]') == [n.root_element[3]]
+
+def test_attribute_deleted():
+    n = Document()
+    n.parse(XML)
+    n.create_index('sku')
+    del n.root_element[0].attributes['sku']
+    assert n.xpath('//item[@sku="X-1"]') == [n.root_element[2]]
+
+def test_range_after_update():
+    n = Document()
+    n.parse(XML)
+    n.create_index('amount')
+    assert len(n.xpath('//price[@amount > 60]')) == 2
+    n.root_element[0][0].attributes['amount'] = '75'
+    assert len(n.xpath('//price[@amount > 60]')) == 3
+
+def test_subtree_attached():
+    n = Document()
+    n.parse(XML)
+    n.create_index('sku')
+    f = Element('item', attributes={'id': 'f', 'sku': 'X-1'})
+    g = f.spawn_element('item', attributes={'id': 'g', 'sku': 'X-1'})
+    n.root_element.append(f)
+    assert n.xpath('//item[@sku="X-1"]') == [n.root_element[0], n.root_element[2], f, g]
+
+def test_subtree_detached():
+    n = Document()
+    n.parse(XML)
+    n.create_index('sku')
+    n.root_element.remove(n.root_element[2])
+    assert n.xpath('//item[@sku="X-1"]') == [n.root_element[0]]
+    assert n.xpath('//item[@sku="X-3"]') == []
@@ -0,0 +1,171 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import gc
+import logging
+
+import pytest
+from expatriate import *
+
+logging.basicConfig(level=logging.DEBUG)
+
+XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<!--before-->
+<t:root xmlns:t="http://jaymes.biz/t" xmlns="http://jaymes.biz/d" id="r">
+    <?pi data?>
+    <a b="1" id="x">text &amp; more<![CDATA[<cdata>]]></a>
+    <!--comment-->
+    <t:c t:b="3">x<d>y</d>z</t:c>
+    <e xml:space="preserve">  </e>
+    <f id="y" q='"quoted"'/>
+</t:root>
+'''
+
+doc = Document()
+doc.parse(XML)
+compact = CompactDocument()
+compact.parse(XML)
+
+def _key(n):
+    if hasattr(n, 'get_type'):
+        return (n.get_type(), n.get_string_value(), n.get_document_order())
+    return n
+
+def test_root_element():
+    assert isinstance(compact.root_element, CompactElement)
+    assert isinstance(compact.root_element, Element)
+    assert compact.root_element.name == 't:root'
+    assert compact.root_element.namespace == 'http://jaymes.biz/t'
+    assert compact.root_element.get_document() is compact
+    assert [_key(c) for c in compact.children] == [_key(c) for c in doc.children]
+
+def test_produce():
+    assert compact.produce() == doc.produce()
+    assert compact.root_element[3].produce() == doc.root_element[3].produce()
+
+def test_string_value():
+    assert compact.get_string_value() == doc.get_string_value()
+    assert compact.root_element[3].get_string_value() == 'xyz'
+
+def test_children():
+    root = compact.root_element
+    assert len(root) == len(doc.root_element)
+    assert [_key(c) for c in root.children] == [_key(c) for c in doc.root_element.children]
+    assert [_key(c) for c in root.children[1:3]] == [_key(c) for c in doc.root_element.children[1:3]]
+    a = root[1]
+    assert a.parent is root
+    assert root.children.index(a) == 1
+    assert a in root.children
+    assert isinstance(a[1], CharacterData)
+    assert a[1].cdata_block
+
+def test_attributes():
+    a = compact.root_element[1]
+    assert a.attributes == {'b': '1', 'id': 'x'}
+    assert a.attribute_nodes['b'].value == '1'
+    assert a.attribute_nodes['b'].get_document_order() == doc.root_element[1].attribute_nodes['b'].get_document_order()
+    assert compact.root_element[3].attribute_nodes['t:b'].namespace == 'http://jaymes.biz/t'
+
+def test_namespaces():
+    d = compact.root_element[3][1]
+    assert d.namespace == 'http://jaymes.biz/d'
+    assert d.prefix_to_namespace('t') == 'http://jaymes.biz/t'
+    assert set(d.namespace_nodes.keys()) == set(['xml', 't', None])
+
+@pytest.mark.parametrize('expr', (
+    '//*',
+    '//node()',
+    '//@*',
+    '//namespace::*',
+    '/t:root/t:c/d',
+    '/t:root/*[2]',
+    '//text()',
+    '//comment()',
+    '//processing-instruction()',
+    '//d/following::node()',
+    '//d/preceding::node()',
+    '//d/ancestor::*',
+    '//a/following-sibling::*',
+    '//e/preceding-sibling::node()',
+    '(//*)[last()]',
+    '//*[@b]',
+    '//*[. = "xyz"]',
+    'id("x")',
+    'id("y")/@q',
+    'count(//node())',
+    'string(/)',
+    'name(//*[@t:b])',
+))
+@pytest.mark.parametrize('backend', xpath.CompiledExpression.BACKENDS)
+def test_xpath(expr, backend):
+    ce = xpath.compile(expr, namespaces={'t': 'http://jaymes.biz/t'}, backend=backend)
+    expected = ce.evaluate(doc)
+    result = ce.evaluate(compact)
+    if isinstance(expected, list):
+        assert [_key(n) for n in result] == [_key(n) for n in expected]
+    else:
+        assert _key(result) == _key(expected)
+
+def test_find_by_id():
+    assert compact.find_by_id('x') is compact.root_element[1]
+    assert compact.root_element[1].find_by_id('y') is None
+    assert compact.find_by_id('z') is None
+
+def test_nodes_dropped():
+    d = CompactDocument(result_cache_size=0)
+    d.parse('<root>' + '<a><b/>text</a>' * 100 + '</root>')
+    assert len(d.xpath('//b')) == 100
+    gc.collect()
+    # just the document's own children are kept
+    assert len(d._nodes) == 1
+
+    b = d.root_element[50][0]
+    assert d.root_element[50][0] is b
+    assert b.parent is d.root_element[50]
+    assert len(d._nodes) == 3
+
+def test_read_only():
+    a = compact.root_element[1]
+    with pytest.raises(TypeError):
+        a.attributes['c'] = '2'
+    with pytest.raises(AttributeError):
+        a.append(Element('c'))
+
+def test_unknown_prefix():
+    with pytest.raises(UnknownPrefixException):
+        CompactDocument().parse('<t:root/>')
+    with pytest.raises(UnknownPrefixException):
+        CompactDocument().parse('<root t:a="1"/>')
+
+def test_skip_whitespace():
+    d = CompactDocument(skip_whitespace=False)
+    d.parse('<root> <a/> </root>')
+    assert len(d.root_element) == 3
+    assert d.produce() == b'<?xml version="1.0" encoding="UTF-8"><root> <a/> </root>'
+
+def test_close_unclosed():
+    d = CompactDocument()
+    d.feed(b'<root><el>')
+    with pytest.raises(ValueError, match='Document ended with unclosed elements: root, el'):
+        d.close()
+
+def test_large_text_buffer():
+    d = CompactDocument()
+    d.parse('<root>' + ''.join(['<a n="%d">%d</a>' % (i, i) for i in range(10000)]) + '</root>')
+    assert len(d._blocks) > 1
+    assert d.root_element[9999].get_string_value() == '9999'
+    assert d.root_element[5000].attributes['n'] == '5000'
@@ -177,26 +177,9 @@ test
 </Element></Document>''')
     assert len(doc.root_element.children) == 1
     assert doc.root_element.children[0].name == 'Element'
-    assert len(doc.root_element.children[0].children) == 5
-    i = 0
-    assert isinstance(doc.root_element.children[0].children[i], CharacterData)
-    assert doc.root_element.children[0].children[i].data == '\n'
-
-    i += 1
-    assert isinstance(doc.root_element.children[0].children[i], CharacterData)
-    assert doc.root_element.children[0].children[i].data == 'test'
-
-    i += 1
-    assert isinstance(doc.root_element.children[0].children[i], CharacterData)
-    assert doc.root_element.children[0].children[i].data == '\n'
-
-    i += 1
-    assert isinstance(doc.root_element.children[0].children[i], CharacterData)
-    assert doc.root_element.children[0].children[i].data == '  test'
-
-    i += 1
-    assert isinstance(doc.root_element.children[0].children[i], CharacterData)
-    assert doc.root_element.children[0].children[i].data == '\n'
+    assert len(doc.root_element.children[0].children) == 1
+    assert isinstance(doc.root_element.children[0].children[0], CharacterData)
+    assert doc.root_element.children[0].children[0].data == '\ntest\n  test\n'
 
 def test_produce_element():
     doc = Document()
@@ -342,3 +325,148 @@ def test_produce_no_decl():
 def test_get_type():
     n = Document()
     assert n.get_type() == 'root'
+
+def _walk_order(n):
+    # nodes in document order as defined by the XPath data model
+    ns = [n]
+    if isinstance(n, Element):
+        ns.extend(n.namespace_nodes.values())
+        ns.extend([n.attribute_nodes[k] for k in sorted(n.attribute_nodes.keys())])
+    if hasattr(n, 'children'):
+        for c in n.children:
+            ns.extend(_walk_order(c))
+    return ns
+
+def test_document_order_parsed():
+    doc = Document()
+    doc.parse('<root xmlns:t="http://jaymes.biz/t" b="2" a="1"><!-- c --><t:el t:x="y">text<?pi data?></t:el><el/></root>')
+
+    ns = _walk_order(doc)
+    orders = [n.get_document_order() for n in ns]
+    assert orders == sorted(orders)
+    assert len(set(orders)) == len(orders)
+    assert Document.order_sort(list(reversed(ns))) == ns
+
+def test_document_order_attribute_added():
+    doc = Document()
+    doc.parse('<root><el/><el/></root>')
+    doc.root_element[0].attributes['id'] = 'a'
+
+    ns = _walk_order(doc)
+    orders = [n.get_document_order() for n in ns]
+    assert orders == sorted(orders)
+    assert len(set(orders)) == len(orders)
+
+def test_feed_chunks():
+    doc = Document()
+    doc.feed(b'<root><el na')
+    doc.feed(bytearray(b'me="a"/>te'))
+    doc.feed(memoryview(b'xt</root>'))
+    doc.close()
+    assert doc.root_element.name == 'root'
+    assert doc.root_element[0].attributes['name'] == 'a'
+    assert doc.bytes_consumed == 31
+
+def test_feed_str_counts_characters():
+    doc = Document()
+    doc.feed('<root>caf\u00e9</root>')
+    doc.close()
+    assert doc.root_element[0].data == 'caf\u00e9'
+    assert doc.bytes_consumed == 17
+
+def test_feed_type():
+    doc = Document()
+    with pytest.raises(TypeError):
+        doc.feed(42)
+
+def test_close_unclosed():
+    doc = Document()
+    doc.feed(b'<root><el>')
+    with pytest.raises(ValueError, match='Document ended with unclosed elements: root, el'):
+        doc.close()
+
+def test_parse_file_path(tmp_path):
+    p = tmp_path / 'test.xml'
+    p.write_bytes(b'<root><el name="a"/><el name="b"/></root>')
+    doc = Document()
+    assert doc.parse_file(str(p), buffer_size=4) == 41
+    assert len(doc.root_element) == 2
+    assert doc.root_element[1].attributes['name'] == 'b'
+
+def test_parse_file_object():
+    import io
+    doc = Document()
+    assert doc.parse_file(io.BytesIO(b'<root><el/></root>'), buffer_size=3) == 18
+    assert len(doc.root_element) == 1
+
+def test_parse_file_text():
+    import io
+    doc = Document()
+    doc.parse_file(io.StringIO('<root><el/></root>'), buffer_size=5)
+    assert len(doc.root_element) == 1
+
+def test_text_coalescing():
+    doc = Document()
+    doc.parse('''<Document>fish &amp; chips
+and peas<!-- c -->more</Document>''')
+    assert len(doc.root_element.children) == 3
+    assert doc.root_element[0].data == 'fish & chips\nand peas'
+    assert doc.root_element[2].data == 'more'
+
+def test_text_coalescing_chunks():
+    doc = Document()
+    doc.feed('<Document>fi')
+    doc.feed('sh &amp; ch')
+    doc.feed('ips</Document>')
+    doc.close()
+    assert len(doc.root_element.children) == 1
+    assert doc.root_element[0].data == 'fish & chips'
+
+def test_text_coalescing_cdata():
+    doc = Document()
+    doc.parse('''<Document>a<![CDATA[<b>]]>c</Document>''')
+    assert len(doc.root_element.children) == 3
+    assert doc.root_element[1].data == '<b>'
+    assert doc.root_element[1].cdata_block
+    assert not doc.root_element[2].cdata_block
+
+def test_find_by_id():
+    doc = Document()
+    doc.parse('<root><el id="a"><el xml:id="b"/></el><el ID="c"/></root>')
+    assert doc.find_by_id('a') is doc.root_element[0]
+    assert doc.find_by_id('b') is doc.root_element[0][0]
+    assert doc.find_by_id('c') is doc.root_element[1]
+    assert doc.find_by_id('d') is None
+    assert doc.root_element[0].find_by_id('b') is doc.root_element[0][0]
+    assert doc.root_element[1].find_by_id('b') is None
+
+def test_find_by_id_attribute_changes():
+    doc = Document()
+    doc.parse('<root><el id="a"/><el/></root>')
+    doc.root_element[1].attributes['id'] = 'b'
+    assert doc.find_by_id('b') is doc.root_element[1]
+    doc.root_element[0].attributes['id'] = 'z'
+    assert doc.find_by_id('a') is None
+    assert doc.find_by_id('z') is doc.root_element[0]
+    del doc.root_element[0].attributes['id']
+    assert doc.find_by_id('z') is None
+
+def test_find_by_id_attach_detach():
+    doc = Document()
+    doc.parse('<root><el id="a"><sub id="b"/></el></root>')
+    el = doc.root_element[0]
+    doc.root_element.remove(el)
+    assert doc.find_by_id('a') is None
+    assert doc.find_by_id('b') is None
+    assert el.find_by_id('b') is el[0]
+
+    doc.root_element.append(el)
+    assert doc.find_by_id('b') is el[0]
+    doc.root_element.spawn_element('el', {'id': 'c'})
+    assert doc.find_by_id('c') is doc.root_element[1]
+
+def test_find_by_id_duplicate():
+    doc = Document()
+    doc.parse('<root><el id="a"/><el id="a"/></root>')
+    assert doc.find_by_id('a') is doc.root_element[0]
+    assert doc.root_element[1].find_by_id('a') is doc.root_element[1]
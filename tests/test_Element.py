@@ -47,3 +47,68 @@ def test_produce_ns_prefix():
 def test_get_type():
     n = Element('test')
     assert n.get_type() == 'element'
+
+def test_attribute_nodes_lazy():
+    doc = Document()
+    doc.parse('<root xmlns:t="http://jaymes.biz/t"><a t:b="1" c="2"/></root>')
+    a = doc.root_element[0]
+    assert a._attribute_nodes is None
+    assert a.get_node_count() == 1 + 2 + 2
+    assert a._attribute_nodes is None
+
+    nodes = a.attribute_nodes
+    assert nodes['t:b'].namespace == 'http://jaymes.biz/t'
+    assert nodes['t:b'].local_name == 'b'
+    assert nodes['c'].value == '2'
+    # the nodes follow the element's 2 namespace nodes, in name order
+    assert nodes['c'].get_document_order() < nodes['t:b'].get_document_order()
+    assert nodes['c'].get_document_order() == a.get_document_order() + 3
+
+def test_attribute_nodes_updated_in_place():
+    doc = Document()
+    doc.parse('<root><a b="1" d="2"/></root>')
+    a = doc.root_element[0]
+    b = a.attribute_nodes['b']
+    d = a.attribute_nodes['d']
+
+    a.attributes['b'] = '3'
+    assert a.attribute_nodes['b'] is b
+    assert b.value == '3'
+
+    a.attributes['c'] = '4'
+    assert a.attribute_nodes['b'] is b
+    assert a.attribute_nodes['c'].value == '4'
+    assert b.get_document_order() < a.attribute_nodes['c'].get_document_order() < d.get_document_order()
+
+    del a.attributes['b']
+    assert 'b' not in a.attribute_nodes
+    assert a.attribute_nodes['d'] is d
+    assert b.parent is None
+    assert doc.xpath('/root/a/@*') == [a.attribute_nodes['c'], d]
+
+def test_attribute_unknown_prefix():
+    el = Element('a')
+    with pytest.raises(UnknownPrefixException):
+        el.attributes['t:b'] = '1'
+
+def test_slots():
+    el = Element('a')
+    assert not hasattr(el, '__dict__')
+    with pytest.raises(AttributeError):
+        el.foo = 'bar'
+
+    class SubElement(Element):
+        pass
+
+    sub = SubElement('a')
+    sub.foo = 'bar'
+    assert sub.foo == 'bar'
+
+def test_name_setter():
+    doc = Document()
+    doc.parse('<root xmlns:t="http://jaymes.biz/test"><a/></root>')
+    a = doc.root_element[0]
+    a.name = 't:b'
+    assert a.local_name == 'b'
+    assert a.prefix == 't'
+    assert a.namespace == 'http://jaymes.biz/test'
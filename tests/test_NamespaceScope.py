@@ -0,0 +1,79 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+def test_root():
+    assert NamespaceScope.ROOT.prefixes == {'xml': 'http://www.w3.org/XML/1998/namespace'}
+    assert NamespaceScope.ROOT.namespaces == {'http://www.w3.org/XML/1998/namespace': 'xml'}
+    assert len(NamespaceScope.ROOT) == 1
+
+def test_derive():
+    scope = NamespaceScope.ROOT.derive([('t', 'http://jaymes.biz/t'), (None, 'http://jaymes.biz/d')])
+    assert scope.parent is NamespaceScope.ROOT
+    assert scope.prefixes['t'] == 'http://jaymes.biz/t'
+    assert scope.prefixes[None] == 'http://jaymes.biz/d'
+    assert scope.namespaces['http://jaymes.biz/t'] == 't'
+    assert len(scope) == 3
+    assert 't' not in NamespaceScope.ROOT.prefixes
+
+def test_derive_nothing():
+    assert NamespaceScope.ROOT.derive([]) is NamespaceScope.ROOT
+
+def test_immutable():
+    with pytest.raises(TypeError):
+        NamespaceScope.ROOT.prefixes['t'] = 'http://jaymes.biz/t'
+
+def test_redefine():
+    scope = NamespaceScope.ROOT.derive([('t', 'http://jaymes.biz/t')])
+    with pytest.raises(PrefixRedefineException):
+        scope.derive([('t', 'http://jaymes.biz/t2')])
+
+def test_redefine_default():
+    scope = NamespaceScope.ROOT.derive([(None, 'http://jaymes.biz/d')])
+    assert scope.derive([(None, 'http://jaymes.biz/d2')]).prefixes[None] == 'http://jaymes.biz/d2'
+
+def test_shared_by_descendants():
+    doc = Document()
+    doc.parse('<root xmlns:t="http://jaymes.biz/t"><a><b/></a><t:c xmlns:u="http://jaymes.biz/u"><d/></t:c></root>')
+    root = doc.root_element
+    a, c = root.children
+    assert a.namespace_scope is root.namespace_scope
+    assert a[0].namespace_scope is root.namespace_scope
+    assert c.namespace_scope is not root.namespace_scope
+    assert c.namespace_scope.parent is root.namespace_scope
+    assert c[0].namespace_scope is c.namespace_scope
+    assert c[0].prefix_to_namespace('u') == 'http://jaymes.biz/u'
+    assert c[0].namespace_to_prefix('http://jaymes.biz/t') == 't'
+
+def test_namespace_nodes_lazy():
+    doc = Document()
+    doc.parse('<root xmlns:t="http://jaymes.biz/t"><a/><b/></root>')
+    a = doc.root_element[0]
+    assert a._namespace_nodes is None
+    # root, its 2 namespace nodes & xmlns:t, then a & b with their 2 each
+    assert doc.root_element.get_node_count() == 4 + 2 * 3
+    assert a._namespace_nodes is None
+
+    ns = doc.xpath('/root/a/namespace::node()')
+    assert a._namespace_nodes is not None
+    assert doc.root_element[1]._namespace_nodes is None
+    assert set([n.prefix for n in ns]) == set(['xml', 't'])
+    assert [n.get_document_order() for n in ns] == [a.get_document_order() + 1, a.get_document_order() + 2]
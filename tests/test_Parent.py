@@ -109,3 +109,64 @@ def test_spawn_pi():
     assert n.data == 'big guns'
 
 # TODO count, index, extend, insert, pop, remove, reverse, sort
+
+def _assert_ordered(doc):
+    ns = []
+    def walk(n):
+        ns.append(n)
+        if isinstance(n, Element):
+            ns.extend(n.namespace_nodes.values())
+            ns.extend([n.attribute_nodes[k] for k in sorted(n.attribute_nodes.keys())])
+        if hasattr(n, 'children'):
+            for c in n.children:
+                walk(c)
+    walk(doc)
+    orders = [n.get_document_order() for n in ns]
+    assert orders == sorted(orders)
+    assert len(set(orders)) == len(orders)
+
+def test_order_insert():
+    doc = Document()
+    doc.parse('''<Root><Element name="a"/><Element name="b"/><Element name="c"/></Root>''')
+    el = Element('Element', {'name': 'ab'})
+    el.append(Element('Sub'))
+    doc.root_element.insert(1, el)
+    assert doc.root_element[1].get_document_order() > doc.root_element[0].get_document_order()
+    assert doc.root_element[1][0].get_document_order() < doc.root_element[2].get_document_order()
+    _assert_ordered(doc)
+
+def test_order_insert_dense():
+    doc = Document()
+    doc.parse('''<Root><Element name="a"/><Element name="b"/></Root>''')
+    # keep inserting into the same gap until it has to be relabelled
+    for i in range(40):
+        doc.root_element.insert(1, Element('Element'))
+    _assert_ordered(doc)
+
+def test_order_append_nested():
+    doc = Document()
+    doc.parse('''<Root><Element name="a"/><Element name="b"/></Root>''')
+    doc.root_element[0].append('text')
+    doc.root_element[0].spawn_element('Element', {'name': 'a1'})
+    doc.append(Comment('trailing'))
+    _assert_ordered(doc)
+
+def test_order_remove_pop():
+    doc = Document()
+    doc.parse('''<Root><Element name="a"><Sub/></Element><Element name="b"/><Element name="c"/></Root>''')
+    a = doc.root_element[0]
+    doc.root_element.remove(a)
+    assert a.parent is None
+    with pytest.raises(UnattachedElementException):
+        a[0].get_document_order()
+    c = doc.root_element.pop()
+    assert c.parent is None
+    doc.root_element.insert(0, c)
+    _assert_ordered(doc)
+
+def test_order_reverse():
+    doc = Document()
+    doc.parse('''<Root><Element name="a"/><Element name="b"/><Element name="c"/></Root>''')
+    doc.root_element.reverse()
+    assert Document.ordered_first(doc.root_element.children).attributes['name'] == 'c'
+    _assert_ordered(doc)
@@ -0,0 +1,128 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+XML = '''<root xmlns:t="http://jaymes.biz/test">
+    <para id="a"><para id="b">text</para><t:item id="c"/></para>
+    <other id="d"><para id="e"/></other>
+    <t:item id="f"/>
+</root>'''
+
+doc = Document()
+doc.parse(XML)
+a = doc.root_element[0]
+b = a[0]
+c = a[1]
+d = doc.root_element[1]
+e = d[0]
+f = doc.root_element[2]
+
+unindexed = Document(structure_index=False)
+unindexed.parse(XML)
+
+def test_built_lazily():
+    d = Document()
+    d.parse(XML)
+    assert d._structure_index is None
+    d.xpath('//para')
+    assert isinstance(d._structure_index, StructureIndex)
+
+def test_disabled():
+    assert unindexed.get_structure_index() is None
+    assert unindexed.xpath('//para') == [unindexed.root_element[0], unindexed.root_element[0][0], unindexed.root_element[1][0]]
+
+def test_posting_lists():
+    index = doc.get_structure_index()
+    assert index.by_local_name('para')[1] == [a, b, e]
+    assert index.by_name('t:item')[1] == [c, f]
+    assert index.by_expanded_name('http://jaymes.biz/test', 'item')[1] == [c, f]
+    assert index.by_local_name('missing') == ([], [])
+    keys = index.elements()[0]
+    assert keys == sorted(keys)
+    assert len(keys) == 7
+
+def test_descendants():
+    index = doc.get_structure_index()
+    assert StructureIndex.descendants(a, index.by_local_name('para')) == [b]
+    assert StructureIndex.descendants(a, index.by_local_name('para'), include_self=True) == [a, b]
+    assert StructureIndex.descendants(doc, index.by_local_name('para')) == [a, b, e]
+
+@pytest.mark.parametrize('expr', [
+    '//para',
+    '//para[1]',
+    '//para[@id="e"]',
+    '//*',
+    '//t:item',
+    '/root//para',
+    '//other//para',
+    '//para/t:item',
+    'descendant::para',
+    'descendant-or-self::para',
+    '/root/descendant::*[2]',
+])
+def test_matches_unindexed(expr):
+    assert [n.get_document_order() for n in doc.xpath(expr)] \
+        == [n.get_document_order() for n in unindexed.xpath(expr)]
+
+def test_text_below_indexed_step():
+    expr = '//para//text()'
+    assert [n.data for n in doc.xpath(expr)] == [n.data for n in unindexed.xpath(expr)]
+
+def test_count():
+    assert doc.xpath('count(//para)') == 3
+    assert doc.xpath('count(/root//para)') == 3
+
+def test_invalidated_by_append():
+    d = Document()
+    d.parse(XML)
+    assert len(d.xpath('//para')) == 3
+    g = d.root_element[0].spawn_element('para', attributes={'id': 'g'})
+    assert d._structure_index is None
+    assert d.xpath('//para')[2] is g
+
+def test_invalidated_by_insert():
+    d = Document()
+    d.parse(XML)
+    assert len(d.xpath('//para')) == 3
+    g = Element('para', attributes={'id': 'g'})
+    d.root_element.insert(0, g)
+    assert d.xpath('//para')[0] is g
+
+def test_invalidated_by_remove():
+    d = Document()
+    d.parse(XML)
+    assert len(d.xpath('//para')) == 3
+    del d.root_element[0]
+    assert d.xpath('//para') == [d.root_element[0][0]]
+
+def test_invalidated_by_reverse():
+    d = Document()
+    d.parse(XML)
+    assert len(d.xpath('//para')) == 3
+    d.root_element.reverse()
+    assert d.xpath('//para') == [d.root_element[1][0], d.root_element[2], d.root_element[2][0]]
+
+def test_invalidated_by_rename():
+    d = Document()
+    d.parse(XML)
+    assert len(d.xpath('//para')) == 3
+    d.root_element[1].local_name = 'para'
+    assert d.xpath('//para') == [d.root_element[0], d.root_element[0][0], d.root_element[1], d.root_element[1][0]]
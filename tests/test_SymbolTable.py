@@ -0,0 +1,104 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+def test_intern():
+    symbols = SymbolTable()
+    a = ''.join(['na', 'me'])
+    assert symbols.intern(a) is a
+    assert symbols.intern(''.join(['na', 'me'])) is a
+    assert symbols.intern(None) is None
+    assert 'name' in symbols
+    assert len(symbols) == 1
+
+def test_get():
+    symbols = SymbolTable()
+    assert symbols.get('name') is None
+    assert 'name' not in symbols
+    a = symbols.intern('name')
+    assert symbols.get(''.join(['na', 'me'])) is a
+
+def test_qualified_name():
+    symbols = SymbolTable()
+    assert symbols.qualified_name(None, 'a') == 'a'
+    name = symbols.qualified_name('t', 'a')
+    assert name == 't:a'
+    assert symbols.qualified_name('t', 'a') is name
+    assert symbols.get('t:a') is name
+
+def test_expanded_name():
+    symbols = SymbolTable()
+    name = symbols.expanded_name('http://jaymes.biz/t', 'a')
+    assert name == ('http://jaymes.biz/t', 'a')
+    assert symbols.expanded_name('http://jaymes.biz/t', 'a') is name
+
+def test_document_names_shared():
+    doc = Document()
+    doc.parse('<t:root xmlns:t="http://jaymes.biz/t" xmlns="http://jaymes.biz/d"><a b="1"/><a b="2"/><t:c t:b="3"/></t:root>')
+    root = doc.root_element
+    a1, a2, c = root.children
+    assert a1.name is a2.name
+    assert a1.get_expanded_name() is a2.get_expanded_name()
+    assert a1.namespace is doc.symbols.get('http://jaymes.biz/d')
+    assert c.prefix is root.prefix
+    assert c.name is doc.symbols.get('t:c')
+    assert c.get_expanded_name() == ('http://jaymes.biz/t', 'c')
+    assert a1.attribute_nodes['b'].name is a2.attribute_nodes['b'].name
+    assert c.attribute_nodes['t:b'].local_name is a1.attribute_nodes['b'].local_name
+    assert c.attribute_nodes['t:b'].get_expanded_name() == ('http://jaymes.biz/t', 'b')
+
+def test_names_cached():
+    doc = Document()
+    doc.parse('<root xmlns:t="http://jaymes.biz/t"><a/></root>')
+    a = doc.root_element[0]
+    assert a.name is a.name
+    assert a.get_expanded_name() is a.get_expanded_name()
+
+    a.name = 't:b'
+    assert a.name == 't:b'
+    assert a.name is doc.symbols.get('t:b')
+    assert a.get_expanded_name() == ('http://jaymes.biz/t', 'b')
+    assert doc.xpath('/root/t:b') == [a]
+
+    a.local_name = 'c'
+    assert a.name == 't:c'
+    assert a.get_expanded_name() == ('http://jaymes.biz/t', 'c')
+
+def test_unattached():
+    el = Element('a', prefix='t', namespace='http://jaymes.biz/t')
+    assert el.name == 't:a'
+    assert el.get_expanded_name() == ('http://jaymes.biz/t', 'a')
+    assert el.namespace_scope.symbols is None
+
+def test_attached():
+    doc = Document()
+    doc.parse('<root/>')
+    el = Element(''.join(['ro', 'ot']), parent=doc.root_element)
+    assert el.name is doc.root_element.name
+
+def test_symbol_id():
+    symbols = SymbolTable()
+    assert symbols.symbol_id('a') == 0
+    assert symbols.symbol_id('b') == 1
+    assert symbols.symbol_id(''.join(['a'])) == 0
+    assert symbols.symbol(1) is symbols.get('b')
+    with pytest.raises(IndexError):
+        symbols.symbol(2)
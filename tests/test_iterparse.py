@@ -0,0 +1,82 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+
+import io
+
+def test_events():
+    f = io.BytesIO(b'<root><record id="1"><field/></record><record id="2"/></root>')
+    events = [(event, el.name) for event, el in iterparse(f)]
+    assert events == [
+        ('start', 'root'),
+        ('start', 'record'),
+        ('start', 'field'),
+        ('end', 'field'),
+        ('end', 'record'),
+        ('start', 'record'),
+        ('end', 'record'),
+        ('end', 'root'),
+    ]
+
+def test_tag():
+    f = io.BytesIO(b'<root><record id="1"><field/></record><record id="2"/></root>')
+    ids = [el.attributes['id'] for event, el in iterparse(f, events=('end',), tag='record')]
+    assert ids == ['1', '2']
+
+def test_tag_list():
+    f = io.BytesIO(b'<root><record id="1"><field/></record><record id="2"/></root>')
+    names = [el.name for event, el in iterparse(f, events=('start',), tag=['root', 'field'])]
+    assert names == ['root', 'field']
+
+def test_unknown_event():
+    with pytest.raises(ValueError):
+        list(iterparse(io.BytesIO(b'<root/>'), events=('comment',)))
+
+def test_release():
+    data = b'<root>' + b''.join([b'<record n="' + str(i).encode() + b'"><v>x</v></record>' for i in range(100)]) + b'</root>'
+    root = None
+    count = 0
+    for event, el in iterparse(io.BytesIO(data), events=('end',), tag='record', buffer_size=16):
+        assert el[0].get_string_value() == 'x'
+        root = el.parent
+        root.remove(el)
+        assert el.parent is None
+        assert len(root) <= 1
+        count += 1
+    assert count == 100
+    assert len(root) == 0
+
+def test_path(tmp_path):
+    p = tmp_path / 'test.xml'
+    p.write_bytes(b'<root><record/></root>')
+    assert [el.name for event, el in iterparse(str(p), events=('end',))] == ['record', 'root']
+
+def test_start_before_block_end():
+    # events come after the block is parsed, so a start may see children
+    f = io.BytesIO(b'<root a="1"><record/><record/></root>')
+    starts = [(len(el), el.attributes['a']) for event, el in iterparse(f, events=('start',), tag='root')]
+    assert starts == [(2, '1')]
+
+def test_end_complete():
+    f = io.BytesIO(b'<root>' + b'<record><a/><b/></record>' * 100 + b'</root>')
+    for event, el in iterparse(f, events=('end',), tag='record', buffer_size=7):
+        assert [c.name for c in el.children] == ['a', 'b']
@@ -0,0 +1,94 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+
+doc = Document()
+doc.parse('''<root><para name="a"><para name="b">text</para></para><para name="c"/></root>''')
+
+def _count_str(monkeypatch):
+    calls = []
+    orig = Element.__str__
+    def counting_str(self):
+        calls.append(self)
+        return orig(self)
+    monkeypatch.setattr(Element, '__str__', counting_str)
+    return calls
+
+def test_disabled_ignores_logging_config(monkeypatch):
+    set_tracing(False)
+    # even with everything at DEBUG, no debug strings are built
+    for name in ('expatriate.xpath.Axis', 'expatriate.xpath.Step', 'expatriate.Document'):
+        monkeypatch.setattr(logging.getLogger(name), 'level', logging.DEBUG)
+    calls = _count_str(monkeypatch)
+
+    assert len(doc.xpath('//para[@name="b"]/text()')) == 1
+    assert Document.order_sort(list(reversed(doc.root_element.children)))[0] is doc.root_element[0]
+    assert len(calls) == 0
+
+def test_enabled(monkeypatch, caplog):
+    calls = _count_str(monkeypatch)
+    set_tracing(True)
+    try:
+        assert logging.getLogger('expatriate.xpath.Axis').level == logging.DEBUG
+        with caplog.at_level(logging.DEBUG):
+            doc.xpath('//para/@name')
+        assert len(calls) > 0
+        assert any(r.name.startswith('expatriate.') for r in caplog.records)
+    finally:
+        set_tracing(False)
+    assert logging.getLogger('expatriate.xpath.Axis').level == logging.INFO
+
+def test_enabled_parse(caplog):
+    set_tracing(True)
+    try:
+        with caplog.at_level(logging.DEBUG):
+            d = Document()
+            d.parse('<t:root xmlns:t="http://jaymes.biz/t" xmlns="http://jaymes.biz/d"><a t:b="1"/><t:c/></t:root>')
+        assert d.root_element[1].name == 't:c'
+        assert d.root_element[0].namespace == 'http://jaymes.biz/d'
+        assert any(r.name == 'expatriate.Element' for r in caplog.records)
+    finally:
+        set_tracing(False)
+
+def test_enabled_parse_compact(caplog):
+    set_tracing(True)
+    try:
+        with caplog.at_level(logging.DEBUG):
+            c = CompactDocument()
+            c.parse('<t:root xmlns:t="http://jaymes.biz/t"><a/></t:root>')
+            assert len(c.xpath('//a')) == 1
+        assert c.root_element.name == 't:root'
+    finally:
+        set_tracing(False)
+
+def test_disabled_restores_levels():
+    logger = logging.getLogger('expatriate.Document')
+    logger.setLevel(logging.WARNING)
+    try:
+        set_tracing(True)
+        set_tracing(True)
+        assert logger.level == logging.DEBUG
+        set_tracing(False)
+        assert logger.level == logging.WARNING
+        assert logging.getLogger('expatriate.xpath.Axis').level == logging.INFO
+    finally:
+        logger.setLevel(logging.INFO)
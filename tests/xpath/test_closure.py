@@ -0,0 +1,194 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import gc
+import logging
+import weakref
+
+import pytest
+from expatriate import *
+from expatriate.xpath import *
+
+doc = Document()
+doc.parse('''<root flag="y">
+    <item n="1" type="a" price="2.5"><sub>x</sub><sub>y</sub></item>
+    <item n="2" type="b" price="10"><sub>z</sub></item>
+    <item n="3" type="a"/>
+    <group><item n="4" type="b" price="abc"><sub>w</sub></item><sub>10</sub></group>
+</root>''')
+
+EXPRESSIONS = (
+    '//item',
+    '//item[2]',
+    '//item[last()]',
+    '//item[position() = 2]',
+    '//item[position() < last()]',
+    '//item[@type = "a"]',
+    '//item[@type != "a"]',
+    '//item[@n > 1 + 1]',
+    '//item[2 < @n]',
+    '//item[@price >= 2.5]',
+    '//item[@price = 10]',
+    '//item["a" = @type]',
+    '//item[@n = true()]',
+    '//item[false() = @missing]',
+    '//item[@n = //sub]',
+    '//item[sub = "z" or @n = 3]',
+    '//item[sub and @type = "a"]',
+    '//item[not(sub)]',
+    '//item[boolean(@price)]',
+    '//item[@n mod 2 = 1]',
+    '//item[-@n < -2]',
+    '//item[@n * 2 = 4]',
+    '//item[@n div 2 = 1]',
+    '//item[count(sub)]',
+    '//item[count(/root/item)]',
+    '//item[string(@n)]',
+    '//item[@missing]',
+    '//item[""]',
+    '//item[0]',
+    '//item[$n]',
+    '//item[@n = $n]',
+    '//item[position() = $n]',
+    '//sub[1]',
+    '//sub[. = "y"]',
+    '//sub[. > 5]',
+    '//sub[last()]',
+    '//item//sub',
+    '//item/sub | //group/sub',
+    '(//item | //sub)[3]',
+    '(//item)[last()]',
+    '(//item)[@type = "b"][1]',
+    '$items[2]',
+    '$items[@n > 2]',
+    '/',
+    '/root/node()[2]',
+    '/root/item[sub][1]',
+    'root/item/sub[2]',
+    '../item',
+    '.',
+    'sub',
+    '1 + 2',
+    '(1 + 2) * 3',
+    '-(1 + 2)',
+    '- "3"',
+    '-true()',
+    '7 mod 3',
+    '7 div 2',
+    '1 div 0',
+    '"a" = "a"',
+    '"1" = 1',
+    '"x" != 1',
+    'true() = 1',
+    '"" = false()',
+    '3 > 2',
+    '"3" > "20"',
+    '1 and 0',
+    '"" or 0',
+    'not(true())',
+    'not(//item)',
+    'boolean(//missing)',
+    'string()',
+    'string(//item/@n)',
+    'string(//sub | //item)',
+    'name()',
+    'local-name(//sub)',
+    'concat("a", "b", "c")',
+    'count(//item)',
+    'count(//item[sub])',
+    'sum(//item/@n)',
+    'number(//item/@price)',
+    'string-length(//sub)',
+    'position() + last()',
+    '$n',
+    '$n + 1',
+    '$items',
+    '$s = //sub',
+    '//sub = $s',
+    '//item/@n = 4',
+    '4 = //item/@n',
+    '//item/@n < //item/@price',
+    '//item/@n != //item/@n',
+    '//item/@price > 5',
+    '5 > //item/@price',
+)
+
+VARIABLES = {'n': 2, 's': 'y', 'items': doc.xpath('//item')}
+
+CONTEXTS = (doc, doc.root_element, doc.root_element[1], doc.xpath('//sub')[0])
+
+def _result(backend, expr, context_node):
+    try:
+        e = CompiledExpression(expr, backend=backend)
+        return e.evaluate(context_node, VARIABLES)
+    except Exception as e:
+        return type(e)
+
+@pytest.mark.parametrize('expr', EXPRESSIONS)
+def test_closure_matches_interpreter(expr):
+    for context_node in CONTEXTS:
+        expected = _result('interpreter', expr, context_node)
+        actual = _result('closure', expr, context_node)
+        if isinstance(expected, float) and expected != expected:
+            assert actual != actual
+        else:
+            assert actual == expected
+
+@pytest.mark.parametrize('optimize', (True, False))
+def test_unoptimized_matches_interpreter(optimize):
+    for expr in EXPRESSIONS:
+        try:
+            expected = CompiledExpression(expr, optimize=optimize, backend='interpreter').evaluate(doc, VARIABLES)
+        except XPathSyntaxException:
+            continue
+        actual = CompiledExpression(expr, optimize=optimize, backend='closure').evaluate(doc, VARIABLES)
+        if isinstance(expected, float) and expected != expected:
+            assert actual != actual
+        else:
+            assert actual == expected
+
+def test_default_backend():
+    assert CompiledExpression('//item').backend == 'closure'
+    assert compile('//item', backend='interpreter').backend == 'interpreter'
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        CompiledExpression('//item', backend='bytecode')
+
+def test_closure_skips_tree():
+    e = CompiledExpression('count(//item[@n > 1])')
+    # the closure doesn't call back into the tree of operators
+    orig = Operator.evaluate
+    try:
+        Operator.evaluate = None
+        assert e.evaluate(doc) == 3
+    finally:
+        Operator.evaluate = orig
+
+def test_hoisted_per_evaluation():
+    e = CompiledExpression('//item[@n = $n + 0]')
+    assert [n.attributes['n'] for n in e.evaluate(doc, {'n': 1})] == ['1']
+    assert [n.attributes['n'] for n in e.evaluate(doc, {'n': 3})] == ['3']
+
+def test_hoisted_does_not_keep_document():
+    d = Document()
+    d.parse('<r><a x="1"/><b y="1"/></r>')
+    assert len(d.xpath('//a[@x = //b/@y]')) == 1
+    ref = weakref.ref(d)
+    del d
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,104 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+from expatriate import xpath
+
+
+doc = Document()
+doc.parse('''<?xml version='1.0' encoding='utf-8'?>
+<root xmlns:t="http://jaymes.biz/t">
+    <para name="element1"/>
+    <t:item name="element2"/>
+    <para name="element3"/>
+</root>
+''')
+
+def test_compile_reuse():
+    ce = xpath.compile('child::para')
+    assert ce.evaluate(doc.root_element) == [doc.root_element[0], doc.root_element[2]]
+
+    doc2 = Document()
+    doc2.parse('<root><para/></root>')
+    assert ce.evaluate(doc2.root_element) == [doc2.root_element[0]]
+
+def test_compile_root_step():
+    ce = xpath.compile('/root/para')
+    doc2 = Document()
+    doc2.parse('<root><para/></root>')
+    assert ce.evaluate(doc2.root_element[0]) == [doc2.root_element[0]]
+    assert ce.evaluate(doc.root_element) == [doc.root_element[0], doc.root_element[2]]
+
+def test_compile_variables():
+    ce = xpath.compile('1 + 1')
+    assert ce.evaluate(doc, {}) == 2
+    assert ce.evaluate(doc) == 2
+
+def test_compile_functions():
+    def f_answer(args, context_node, context_position, context_size, variables):
+        return 42
+    ce = xpath.compile('answer()', functions={'answer': f_answer})
+    assert ce.evaluate(doc) == 42
+    assert 'answer' not in xpath.Function.FUNCTIONS
+
+def test_compile_namespaces():
+    ce = xpath.compile('child::x:item', namespaces={'x': 'http://jaymes.biz/t'})
+    assert ce.evaluate(doc.root_element) == [doc.root_element[1]]
+
+def test_compile_immutable():
+    ce = xpath.compile('child::para')
+    with pytest.raises(AttributeError):
+        ce.expr = 'child::*'
+    with pytest.raises(TypeError):
+        ce.functions['answer'] = None
+
+def test_compile_unattached():
+    ce = xpath.compile('child::para')
+    with pytest.raises(ValueError):
+        ce.evaluate(Element('root'))
+
+def test_cache_hits():
+    cache = xpath.expression_cache
+    cache.clear()
+    doc.xpath('child::*')
+    assert cache.misses == 1
+    assert cache.hits == 0
+    doc.xpath('child::*')
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+def test_cache_functions_key():
+    def f_answer(args, context_node, context_position, context_size, variables):
+        return 42
+    cache = xpath.ExpressionCache()
+    assert cache.get('answer()', {'answer': f_answer}) is cache.get('answer()', {'answer': f_answer})
+    assert cache.get('count(*)') is not cache.get('count(*)', {'answer': f_answer})
+    assert cache.misses == 3
+    assert cache.hits == 1
+
+def test_cache_eviction():
+    cache = xpath.ExpressionCache(maxsize=2)
+    a = cache.get('child::a')
+    cache.get('child::b')
+    cache.get('child::a')
+    cache.get('child::c')
+    assert len(cache) == 2
+    assert cache.get('child::a') is a
+    assert cache.misses == 3
@@ -0,0 +1,129 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+from expatriate.xpath import *
+
+doc = Document()
+doc.parse('''<batch id="b1">
+    <record kind="a"><field v="1"/><field v="2"/><note>x</note></record>
+    <record kind="b"><field v="3"/></record>
+    <record kind="a"/>
+    <group><record kind="c"><field v="4"><field v="5"/></field></record></group>
+</batch>''')
+
+other = Document()
+other.parse('<batch id="b2"><record kind="a"><field v="6"/></record></batch>')
+
+EXPRESSIONS = (
+    'field/@v',
+    'field',
+    'field[2]',
+    'field[last()]/@v',
+    'field[@v > 1]',
+    '*',
+    '.',
+    '..',
+    '../@id',
+    '../record[@kind = "a"]',
+    'ancestor::*',
+    'ancestor-or-self::*/@kind',
+    'preceding-sibling::record',
+    'following::field',
+    'descendant::field/@v',
+    './/field',
+    'field/field',
+    '@kind',
+    'note/text()',
+    '/batch/@id',
+    '//field',
+    'count(//record)',
+    '1 + 2',
+    'count(field)',
+    'string(@kind)',
+    'field[@v = $v]',
+    '$v',
+    '(field)[1]',
+    'field | note',
+    'name()',
+    'position()',
+)
+
+CONTEXTS = doc.xpath('//record') + [doc.root_element, doc.xpath('//field')[0]] + other.xpath('//record') + [doc]
+
+@pytest.mark.parametrize('expr', EXPRESSIONS)
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_matches_evaluate(expr, backend):
+    e = CompiledExpression(expr, backend=backend)
+    values = e.evaluate_many(CONTEXTS, {'v': '2'})
+    assert values == [e.evaluate(n, {'v': '2'}) for n in CONTEXTS]
+
+def test_empty():
+    assert CompiledExpression('field').evaluate_many([]) == []
+
+def test_results_independent():
+    values = CompiledExpression('../@id').evaluate_many(doc.xpath('/batch/record'))
+    assert values[0] == values[1]
+    assert values[0] is not values[1]
+
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_shared_steps(monkeypatch, backend):
+    # the parent the records share is only stepped from once
+    calls = []
+    orig = Axis.AXES['attribute']
+    def counting(node):
+        calls.append(node)
+        return orig(node)
+    monkeypatch.setitem(Axis.AXES, 'attribute', counting)
+
+    records = doc.xpath('/batch/record')
+    values = CompiledExpression('../@id', backend=backend).evaluate_many(records)
+    assert [[a.value for a in v] for v in values] == [['b1']] * 3
+    assert calls == [doc.root_element]
+
+def test_predicates_together(monkeypatch):
+    # the predicate is applied to the fields of all the records at once
+    calls = []
+    orig = PredicateMask.mask
+    def counting(self, nodes, context_node, variables):
+        calls.append(len(nodes))
+        return orig(self, nodes, context_node, variables)
+    monkeypatch.setattr(PredicateMask, 'mask', counting)
+
+    values = CompiledExpression('field[@v > 1]/@v').evaluate_many(doc.xpath('//record'))
+    assert [[a.value for a in v] for v in values] == [['2'], ['3'], [], ['4']]
+    assert calls == [4]
+
+def test_context_free_once(monkeypatch):
+    calls = []
+    orig = RootStep.evaluate
+    def counting(self, *args):
+        calls.append(self)
+        return orig(self, *args)
+    monkeypatch.setattr(RootStep, 'evaluate', counting)
+
+    e = CompiledExpression('count(//record)', backend='interpreter')
+    assert e.evaluate_many(CONTEXTS) == [4] * 6 + [1] + [4]
+    # once for each document
+    assert len(calls) == 2
+
+def test_detached():
+    with pytest.raises(ValueError):
+        CompiledExpression('field').evaluate_many([Element('detached')])
@@ -67,6 +67,12 @@ def test_count():
 def test_id():
     assert doc.xpath('id("id_test")') == doc.root_element[2][0][0]
 
+def test_id_tokens():
+    d = Document()
+    d.parse('<root><el id="a"/><el id="b"/><el id="c"/></root>')
+    assert d.xpath('id("c  a missing a")') == [d.root_element[0], d.root_element[2]]
+    assert d.xpath('id("missing")') == []
+
 @pytest.mark.parametrize(
     "test, result",
     (
@@ -0,0 +1,79 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+from expatriate.xpath.Axis import Axis
+
+doc = Document(structure_index=False)
+doc.parse('<root>' + ''.join(['<item n="' + str(i) + '"><sub/></item>' for i in range(100)]) + '</root>')
+
+def _counting_axis(monkeypatch, name):
+    pulled = []
+    axis = Axis.AXES[name]
+    def counting(node):
+        for n in axis(node):
+            pulled.append(n)
+            yield n
+    monkeypatch.setitem(Axis.AXES, name, counting)
+    return pulled
+
+def test_ixpath_matches_xpath():
+    for expr in ('//item', '/root/item', '/root/item/sub', 'descendant::sub', '//item[3]', '//item/@n'):
+        assert list(doc.ixpath(expr)) == doc.xpath(expr)
+
+def test_ixpath_is_lazy(monkeypatch):
+    pulled = _counting_axis(monkeypatch, 'descendant')
+    it = doc.ixpath('//item')
+    assert next(it).attributes['n'] == '0'
+    assert next(it).attributes['n'] == '1'
+    assert len(pulled) < 10
+
+def test_ixpath_not_nodeset():
+    with pytest.raises(TypeError):
+        list(doc.ixpath('count(//item)'))
+
+def test_existence_short_circuits(monkeypatch):
+    pulled = _counting_axis(monkeypatch, 'child')
+    assert doc.xpath('boolean(/root/item)')
+    assert len(pulled) < 10
+
+def test_predicate_existence(monkeypatch):
+    assert len(doc.xpath('/root[item]')) == 1
+    pulled = _counting_axis(monkeypatch, 'child')
+    doc.xpath('/root[item]')
+    assert len(pulled) < 10
+
+def test_literal_position_stops_early(monkeypatch):
+    pulled = _counting_axis(monkeypatch, 'child')
+    assert doc.root_element.xpath('item[2]')[0].attributes['n'] == '1'
+    assert len(pulled) == 2
+
+def test_last():
+    assert doc.root_element.xpath('item[last()]')[0].attributes['n'] == '99'
+    assert doc.root_element.xpath('item[position() = last() - 1]')[0].attributes['n'] == '98'
+
+def test_string_of_first_node():
+    assert doc.xpath('string(/root/item/@n)') == '0'
+
+def test_reverse_axis_positions():
+    sub = doc.root_element[5][0]
+    assert sub.xpath('ancestor::*[1]') == [doc.root_element[5]]
+    assert doc.root_element[5].xpath('preceding-sibling::item[1]') == [doc.root_element[4]]
@@ -0,0 +1,103 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+
+from expatriate.xpath import NodeSet
+
+doc = Document()
+doc.parse('<root><a><a><b/></a><b/></a><b/><c/></root>')
+outer = doc.root_element[0]
+inner = outer[0]
+
+def test_in_order():
+    ns = NodeSet([outer[1], inner, outer, inner])
+    assert not ns.ordered
+    ordered = ns.in_order()
+    assert ordered.ordered
+    assert ordered == [outer, inner, outer[1]]
+    assert ordered.in_order() is ordered
+
+def test_merge_disjoint():
+    first = NodeSet([outer, inner], ordered=True)
+    second = NodeSet([doc.root_element[1], doc.root_element[2]], ordered=True)
+    assert NodeSet.merge([first, second]) == [outer, inner, doc.root_element[1], doc.root_element[2]]
+
+def test_merge_overlapping():
+    first = NodeSet([outer, inner[0], outer[1]], ordered=True)
+    second = NodeSet([inner, inner[0]], ordered=True)
+    ns = NodeSet.merge([first, [], second])
+    assert ns.ordered
+    assert ns == [outer, inner, inner[0], outer[1]]
+
+def test_merge_empty():
+    ns = NodeSet.merge([[], NodeSet()])
+    assert ns == []
+    assert ns.ordered
+
+def test_or():
+    assert NodeSet([doc.root_element[2]]) | NodeSet([outer, doc.root_element[2]]) \
+        == [outer, doc.root_element[2]]
+
+def test_union_operator():
+    assert doc.root_element.xpath('c | b') == [doc.root_element[1], doc.root_element[2]]
+    assert doc.root_element.xpath('b | b') == [doc.root_element[1]]
+
+def test_steps_deduplicated():
+    # the inner b is a descendant of both a elements
+    assert doc.xpath('//a//b') == [inner[0], outer[1]]
+    assert doc.xpath('//a/descendant::b') == [inner[0], outer[1]]
+
+def test_results_are_ordered_nodesets():
+    ns = doc.xpath('/root/a/a')
+    assert isinstance(ns, NodeSet)
+    assert ns.ordered
+
+def test_forward_axes_not_sorted(monkeypatch):
+    def order_sort(*args, **kwargs):
+        raise AssertionError('Forward axis results were sorted')
+    monkeypatch.setattr(Document, 'order_sort', order_sort)
+    assert doc.xpath('/root/a/b') == [outer[1]]
+    assert doc.xpath('//b') == [inner[0], outer[1], doc.root_element[1]]
+
+@pytest.mark.parametrize(
+    "mutate",
+    (
+        lambda ns: ns.reverse(),
+        lambda ns: ns.sort(key=lambda n: n.name),
+        lambda ns: ns.append(ns[0]),
+        lambda ns: ns.extend([ns[0]]),
+        lambda ns: ns.insert(0, ns[-1]),
+        lambda ns: ns.__setitem__(slice(None), list(reversed(ns))),
+        lambda ns: ns.__iadd__([ns[0]]),
+        lambda ns: ns.__imul__(2),
+    )
+)
+def test_mutated_not_ordered(mutate):
+    ns = doc.xpath('//*')
+    mutate(ns)
+    assert not ns.ordered
+    assert NodeSet.merge([ns, doc.xpath('//b')]) == doc.xpath('//*')
+
+def test_removed_still_ordered():
+    ns = doc.xpath('//*')
+    del ns[0]
+    ns.pop()
+    assert ns.ordered
@@ -110,3 +110,29 @@ def test_negate():
 #
 # def test_comparison_presides_equality():
 #     pytest.fail()
+
+nodes_doc = Document()
+nodes_doc.parse('''<root>
+    <a ref="1"/><a ref="3"/><a ref="10"/>
+    <b id="3"/><b id="4"/><b id="x"/>
+    <c id="9"/><c id="9"/>
+</root>''')
+
+@pytest.mark.parametrize('left, op, right, result', [
+    ('//a/@ref', '=', '//b/@id', True),
+    ('//a/@ref', '=', '//c/@id', False),
+    ('//a/@ref', '=', '//missing/@id', False),
+    ('//c/@id', '!=', '//c/@id', False),
+    ('//a/@ref', '!=', '//b/@id', True),
+    ('//c/@id', '!=', '//b/@id', True),
+    ('//a/@ref', '<', '//b/@id', True),
+    ('//a/@ref', '>', '//b/@id', True),
+    ('//a/@ref', '>=', '//c/@id', True),
+    ('//c/@id', '>', '//a/@ref', True),
+    ('//c/@id', '<', '//a/@ref', True),
+    ('//c/@id', '<=', '//b/@id', False),
+    ('//b/@id', '>', '//missing', False),
+])
+def test_nodeset_comparison(left, op, right, result):
+    from expatriate.xpath.Operator import Operator
+    assert Operator.compare_nodesets(op, nodes_doc.xpath(left), nodes_doc.xpath(right)) == result
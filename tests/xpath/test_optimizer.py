@@ -0,0 +1,145 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import gc
+import logging
+import weakref
+
+import pytest
+from expatriate import *
+from expatriate.xpath import *
+
+doc = Document()
+doc.parse('''<root flag="y">
+    <item n="1" type="a"><sub>x</sub><sub>y</sub></item>
+    <item n="2" type="b"><sub>z</sub></item>
+    <item n="3" type="a"/>
+    <group><item n="4" type="b"><sub>w</sub></item></group>
+</root>''')
+
+EXPRESSIONS = (
+    '//item',
+    '//item[2]',
+    '//item[last()]',
+    '//item[position() = 2]',
+    '//item[2 = position()]',
+    '//item[position() = last()]',
+    '//item[@type = "a"]',
+    '//item[@n > 1 + 1]',
+    '//sub[1]',
+    '//item//sub',
+    '/root//sub[last()]',
+    'root/item/sub[2]',
+    '/root/node()[2]',
+    '/root/node()[last()]',
+    '/root/item[sub][1]',
+    '//item[boolean(/root/@flag)]',
+    '//item[not(/root/@missing)]',
+    '//item[count(/root/item)]',
+    '//sub[string-length(concat("a", "b"))]',
+    '//sub[. = "y"]',
+    '1 + 2',
+    '(1 + 2) * 3',
+    'concat("a", "b", "c")',
+    'not(true())',
+    '3 > 2',
+    'string()',
+    'count(//item)',
+    '//group/item[last()]/sub',
+)
+
+@pytest.mark.parametrize('expr', EXPRESSIONS)
+def test_same_results(expr):
+    for context in (doc, doc.root_element):
+        expected = CompiledExpression(expr, optimize=False).evaluate(context)
+        assert CompiledExpression(expr).evaluate(context) == expected
+
+def test_descendant_collapsed():
+    e = CompiledExpression('//item')
+    assert isinstance(e._root, RootStep)
+    assert len(e._root.children) == 1
+    assert isinstance(e._root.children[0], Axis)
+    assert e._root.children[0].name == 'descendant'
+
+    e = CompiledExpression('item//sub')
+    assert isinstance(e._root, Step)
+    assert e._root.children[1].name == 'descendant'
+
+def test_positional_descendant_not_collapsed():
+    # //sub[1] is the first sub child of each parent, not the first sub
+    e = CompiledExpression('//sub[1]')
+    assert e._root.children[0].name == 'descendant-or-self'
+    assert len(doc.xpath('//sub[1]')) == 3
+
+def test_literals_folded():
+    e = CompiledExpression('(1 + 2) * 3')
+    assert isinstance(e._root, Literal)
+    assert e._root.value == 9
+
+    e = CompiledExpression('concat("a", "b")')
+    assert isinstance(e._root, Literal)
+    assert e._root.value == 'ab'
+
+def test_position_rewritten():
+    e = CompiledExpression('item[position() = 2]')
+    assert e._root.children[1]._literal_position() == 2
+
+    e = CompiledExpression('item[position() = last()]')
+    assert e._root.children[1]._is_last()
+
+def test_context_free_hoisted(monkeypatch):
+    calls = []
+    orig = RootStep.evaluate
+    def counting(self, *args):
+        calls.append(self)
+        return orig(self, *args)
+    monkeypatch.setattr(RootStep, 'evaluate', counting)
+
+    e = CompiledExpression('//item[count(/root/item)]', backend='interpreter')
+    assert [n.attributes['n'] for n in e.evaluate(doc)] == ['3']
+    # once for //item and once for /root/item
+    assert len(calls) == 2
+
+def test_hoisted_descendant_collapsed():
+    e = CompiledExpression('//item[boolean(/root/@flag)]')
+    assert e._root.children[0].name == 'descendant'
+
+def test_hoisted_per_evaluation():
+    e = CompiledExpression('//item[boolean(/root/@flag)]')
+    assert len(e.evaluate(doc)) == 4
+    del doc.root_element.attributes['flag']
+    try:
+        assert len(e.evaluate(doc)) == 0
+    finally:
+        doc.root_element.attributes['flag'] = 'y'
+
+def test_hoisted_does_not_keep_document():
+    e = CompiledExpression('//a[@x = //b/@y]', backend='interpreter')
+    d = Document()
+    d.parse('<r><a x="1"/><b y="1"/></r>')
+    assert len(e.evaluate(d)) == 1
+    ref = weakref.ref(d)
+    del d
+    gc.collect()
+    assert ref() is None
+
+def test_user_function_not_folded():
+    e = CompiledExpression('concat("a", "b")', functions={
+        'concat': lambda args, cn, cp, cs, v: 'user',
+    })
+    assert not isinstance(e._root, Literal)
+    assert e.evaluate(doc) == 'user'
@@ -0,0 +1,117 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import math
+
+import pytest
+from expatriate import *
+from expatriate.xpath import parser
+from expatriate.xpath.parser import *
+
+doc = Document()
+doc.parse('''<root>
+    <a ref="1"/><a ref="2"/><a ref="3"/>
+    <b id="2"/><b id="4"/>
+    <c n="2"/>
+</root>''')
+
+def _child(name, *predicates):
+    return LocationStep('child', NameTest(None, name), predicates)
+
+@pytest.mark.parametrize(
+    "expr, types",
+    (
+        ('child::para', ['axis', '::', 'name']),
+        ('@id', ['@', 'name']),
+        ('* * *', ['name', 'operator', 'name']),
+        ('a and b', ['name', 'operator', 'name']),
+        ('and', ['name']),
+        ('count (x)', ['function', '(', 'name', ')']),
+        ('text()', ['node-type', '(', ')']),
+        ('$v div .5', ['variable', 'operator', 'number']),
+        ('"a" != \'b\'', ['literal', 'operator', 'literal']),
+        ('../x:y', ['..', 'operator', 'name']),
+    )
+)
+def test_lexer(expr, types):
+    assert [t.type for t in Lexer.tokenize(expr)] == types
+
+@pytest.mark.parametrize("expr", ('"open', 'a # b', '1 ! 2'))
+def test_lexer_errors(expr):
+    with pytest.raises(XPathSyntaxException):
+        Lexer.tokenize(expr)
+
+def test_precedence():
+    assert parser.parse('1 + 2 * 3') == BinaryExpr('+', LiteralExpr(1), BinaryExpr('*', LiteralExpr(2), LiteralExpr(3)))
+    assert parser.parse('1 - 2 - 3') == BinaryExpr('-', BinaryExpr('-', LiteralExpr(1), LiteralExpr(2)), LiteralExpr(3))
+    assert parser.parse('a or b and c').op == 'or'
+    assert parser.parse('1 = 2 < 3') == BinaryExpr('=', LiteralExpr(1), BinaryExpr('<', LiteralExpr(2), LiteralExpr(3)))
+    assert parser.parse('-a | b') == NegateExpr(BinaryExpr('|', LocationPath(False, (_child('a'),)), LocationPath(False, (_child('b'),))))
+
+def test_location_paths():
+    assert parser.parse('/') == LocationPath(True, ())
+    assert parser.parse('//a') == LocationPath(True, (Parser.DESCENDANT_OR_SELF, _child('a')))
+    assert parser.parse('./@x') == LocationPath(False, (
+        Parser.SELF,
+        LocationStep('attribute', NameTest(None, 'x'), ()),
+    ))
+    assert parser.parse('x:a[1]') == LocationPath(False, (
+        LocationStep('child', NameTest('x', 'a'), (LiteralExpr(1),)),
+    ))
+    assert parser.parse('processing-instruction("p")').steps[0].node_test == NodeTypeTest('processing-instruction', 'p')
+
+def test_filter_and_path_exprs():
+    e = parser.parse('(//a)[2]/@ref')
+    assert isinstance(e, PathExpr)
+    assert isinstance(e.filter, FilterExpr)
+    assert e.filter.predicates == (LiteralExpr(2),)
+    assert parser.parse('$v') == VariableExpr('v')
+    assert parser.parse('f(1, "a")') == FunctionCallExpr('f', (LiteralExpr(1), LiteralExpr('a')))
+
+def test_immutable():
+    e = parser.parse('a/b')
+    with pytest.raises(AttributeError):
+        e.absolute = True
+    assert hash(e) == hash(parser.parse('a/b'))
+
+@pytest.mark.parametrize("expr", ('(1', 'a[1', 'a/', '1 +', 'foo::a', 'child::', 'a b', ')'))
+def test_parse_errors(expr):
+    with pytest.raises(XPathSyntaxException):
+        parser.parse(expr)
+
+def test_compiled_ast():
+    assert xpath.compile('//a').ast == parser.parse('//a')
+
+def test_path_comparison():
+    assert doc.xpath('//a/@ref = //b/@id') == True
+    assert doc.xpath('//a[@ref = //b/@id]') == [doc.root_element[1]]
+    assert doc.xpath('count(//a) + 1') == 4
+
+def test_union():
+    assert doc.xpath('//b | //a[1]') == [doc.root_element[0], doc.root_element[3], doc.root_element[4]]
+
+def test_filter_predicates():
+    assert doc.xpath('(//a)[last()]') == [doc.root_element[2]]
+    assert doc.xpath('(//a | //b)[@id]') == [doc.root_element[3], doc.root_element[4]]
+    assert doc.xpath('(//a)[2]/@ref')[0].value == '2'
+
+def test_variables():
+    assert doc.xpath('//a[@ref = $r]', variables={'r': '3'}) == [doc.root_element[2]]
+    assert doc.xpath('$n * 2', variables={'n': 21}) == 42
+    with pytest.raises(XPathSyntaxException):
+        doc.xpath('$missing')
@@ -0,0 +1,155 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+from expatriate.xpath import *
+
+doc = Document()
+doc.parse('''<root>
+    <item n="1" type="a" price="2.5"><tag>red</tag><tag>7</tag></item>
+    <item n="2" type="b" price="10"><tag>blue</tag></item>
+    <item n="3" type="a"/>
+    <item n="4" type="b" price="1e3"><tag>12</tag></item>
+    <item n="5" type="c" price="40"><tag>red</tag></item>
+</root>''')
+
+EXPRESSIONS = (
+    '//item[@type = "a"]',
+    '//item["a" != @type]',
+    '//item[@price > 5]',
+    '//item[5 > @price]',
+    '//item[@price <= 10]',
+    '//item[@missing = "a"]',
+    '//item[@type = true()]',
+    '//item[@n = true()]',
+    '//item[false() != tag]',
+    '//item[tag = "red"]',
+    '//item[tag > 10]',
+    '//item[tag = 7]',
+    '//item[tag = @n]',
+    '//item[number(@n) > 2]',
+    '//item[number(@n) + 1 = 4]',
+    '//item[@n * 2 >= 6]',
+    '//item[@n mod 2 = 1]',
+    '//item[@n div 2 = 1]',
+    '//item[-@n < -3]',
+    '//item[position() < 3]',
+    '//item[position() mod 2 = 0]',
+    '//item[position() > last() - 2]',
+    '//item[last() - position()]',
+    '//item[position() = last() - 1]',
+    '//item[count(tag) > 1]',
+    '//item[count(tag) = 0]',
+    '//item[count(tag)]',
+    '//item[sum(tag[. != "red" and . != "blue"]) > 8]',
+    '//item[string(@type) = "c"]',
+    '//item[string() = "blue"]',
+    '//item[boolean(@price) and @type != "b"]',
+    '//item[not(tag) or @n = 1]',
+    '//item[not(@price)]',
+    '//item[@type = $t]',
+    '//item[@n > $n]',
+    '//item[$n]',
+    '//item[$flag]',
+    '//item[$items]',
+    '//item[@n = $items/@n]',
+    '//item[@type = "a"][2]',
+    '//item[@type = "b"][last()]',
+    '//item[tag][@n > 1]',
+    '//item[position() > 1][@type = "a"]',
+    '(//item)[@type = "b"]',
+    '(//item)[position() < 3][@n != 1]',
+    '/root/item[@type = "a" or @price > 20]',
+    '/root/item[tag/text() = "red"]',
+    'count(//item[@price > 5])',
+    'boolean(//item[@n > 4])',
+    '//item[@n = 1 + 1]',
+    '//item[@n = "2"]',
+    '//item[@price = "abc"]',
+    '//item[number(@price) > 5]',
+    '//item[sum(@price) > 5]',
+)
+
+VARIABLES = {'t': 'b', 'n': 2, 'flag': True, 'items': doc.xpath('//item[@type = "c"]')}
+
+def _result(monkeypatch, expr, backend, batched):
+    with monkeypatch.context() as m:
+        if not batched:
+            m.setattr(Predicate, '_batch', lambda self: None)
+        try:
+            return CompiledExpression(expr, backend=backend).evaluate(doc, VARIABLES)
+        except Exception as e:
+            return type(e)
+
+@pytest.mark.parametrize('expr', EXPRESSIONS)
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_mask_matches_per_node(monkeypatch, expr, backend):
+    assert _result(monkeypatch, expr, backend, True) == _result(monkeypatch, expr, backend, False)
+
+def _predicate(expr):
+    e = CompiledExpression('item[' + expr + ']', optimize=False)
+    return e._root.children[1]
+
+@pytest.mark.parametrize('expr', (
+    '@type = "a"',
+    'tag > 10',
+    'position() < 3',
+    'count(tag) > 1',
+    'sum(tag) > 1',
+    'number(@n) = 2',
+    'not(tag) and $n',
+))
+def test_compiled(expr):
+    assert PredicateMask.compile(_predicate(expr)) is not None
+
+@pytest.mark.parametrize('expr', (
+    'tag',
+    'contains(@type, "a")',
+    'tag | @n',
+))
+def test_not_compiled(expr):
+    assert PredicateMask.compile(_predicate(expr)) is None
+
+def test_mask():
+    nodes = doc.xpath('//item')
+    assert PredicateMask.compile(_predicate('@price > 5')).mask(nodes, doc, {}) == [False, True, False, False, True]
+    assert PredicateMask.compile(_predicate('position() mod 2 = 1')).mask(nodes, doc, {}) == [True, False, True, False, True]
+    assert PredicateMask.compile(_predicate('$x')).mask(nodes, doc, {'x': 'y'}) == [True] * 5
+    assert PredicateMask.compile(_predicate('@price > 5')).mask([], doc, {}) == []
+
+def test_unsupported_value():
+    # a variable of a type the columns don't hold is left to Predicate.evaluate
+    assert PredicateMask.compile(_predicate('$x')).mask(doc.xpath('//item'), doc, {'x': doc}) is None
+
+def test_lazy_before_position():
+    # [@type = "a"] needn't see the nodes after the one [1] picks
+    calls = []
+    orig = PredicateMask.mask
+    def counting(self, nodes, context_node, variables):
+        calls.append(len(nodes))
+        return orig(self, nodes, context_node, variables)
+    PredicateMask.mask = counting
+    try:
+        assert [n.attributes['n'] for n in doc.xpath('/root/item[@type = "a"][1]')] == ['1']
+        assert calls == []
+        assert [n.attributes['n'] for n in doc.xpath('/root/item[@type = "a"][last()]')] == ['3']
+        assert calls == [5]
+    finally:
+        PredicateMask.mask = orig
@@ -0,0 +1,147 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import logging
+
+import pytest
+from expatriate import *
+from expatriate import xpath
+from expatriate.xpath import *
+
+doc = Document()
+doc.parse('<root>'
+    + ''.join(['<item id="i' + str(i) + '"><price>' + str(i) + '</price><tag/><tag/></item>' for i in range(10)])
+    + '</root>')
+
+EXPRESSIONS = (
+    '//item[price > 5]/price',
+    '//item[@id = "i3"]/price',
+    'count(//tag)',
+    '(//tag | //price)[3]',
+    '//tag/..',
+    '/root/item[tag][2]',
+    '//item[position() mod 2 = 0]/@id',
+    'string(//price)',
+)
+
+def test_explain():
+    out = io.StringIO()
+    xpath.explain('//item[@id = "i3"]/price', file=out)
+    assert out.getvalue() == '\n'.join([
+        "RootStep /descendant::item[attribute::id = 'i3']/child::price",
+        "  Axis descendant::item (document order)",
+        "    Predicate [attribute::id = 'i3'] (attribute index if there is one, a nodeset at a time)",
+        "      Operator =",
+        "        Axis attribute::id (document order)",
+        "        Literal 'i3'",
+        "  Step child::price",
+        "    Axis child::price (document order)",
+    ]) + '\n'
+
+def test_explain_notes():
+    plan = xpath.compile('ancestor::*[1]').explain()
+    assert 'Axis ancestor::* (reverse document order)' in plan
+    assert 'Predicate [1] (selects node 1)' in plan
+    assert '(stops at the first node selected)' in xpath.compile('item[tag]').explain()
+    assert '(once per evaluation)' in xpath.compile('item[price = count(//tag)]').explain()
+
+def test_explain_unoptimized():
+    out = io.StringIO()
+    xpath.explain('//tag', optimize=False, file=out)
+    assert 'Axis descendant-or-self::node()' in out.getvalue()
+
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+@pytest.mark.parametrize('expr', EXPRESSIONS)
+def test_profile_value(expr, backend):
+    ce = xpath.compile(expr, backend=backend)
+    p = ce.evaluate(doc, profile=True)
+    assert isinstance(p, Profile)
+    assert p.value == ce.evaluate(doc)
+    assert p.expr == expr
+    assert p.backend == backend
+    assert p.time >= sum([s.time for s in p.steps if s.depth == 0])
+
+@pytest.mark.parametrize('expr', EXPRESSIONS)
+def test_profile_backends_agree(expr):
+    closure = xpath.compile(expr, backend='closure').evaluate(doc, profile=True)
+    interpreter = xpath.compile(expr, backend='interpreter').evaluate(doc, profile=True)
+    assert [s.step for s in closure.steps] == [s.step for s in interpreter.steps]
+    for c, i in zip(closure.steps, interpreter.steps):
+        assert (c.input_size, c.output_size, c.predicate_evaluations, c.sorts) \
+            == (i.input_size, i.output_size, i.predicate_evaluations, i.sorts)
+    assert closure.sorts == interpreter.sorts
+
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_profile_steps(backend):
+    p = xpath.compile('//item[price > 5]/price', backend=backend).evaluate(doc, profile=True)
+    assert [(s.step, s.depth) for s in p.steps] == [
+        ('descendant::item[child::price > 5]', 0),
+        ('child::price', 1),
+        ('child::price', 0),
+    ]
+    item, _, price = p.steps
+    assert (item.input_size, item.output_size, item.predicate_evaluations) == (1, 4, 10)
+    assert (price.input_size, price.output_size, price.predicate_evaluations) == (4, 4, 0)
+
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_profile_predicates(backend):
+    p = xpath.compile('item[tag][2]', backend=backend).evaluate(doc.root_element, profile=True)
+    item, tag = p.steps
+    assert p.value == [doc.root_element[1]]
+    # [2] stops after the second item passes [tag]
+    assert item.predicate_evaluations == 2
+    assert (tag.input_size, tag.output_size) == (2, 2)
+
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_profile_filter(backend):
+    p = xpath.compile('(//tag | //price)[3]', backend=backend).evaluate(doc, profile=True)
+    filter_ = p.steps[-1]
+    assert filter_.step == '(/descendant::tag | /descendant::price)[3]'
+    assert (filter_.input_size, filter_.output_size) == (30, 1)
+
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_profile_sorts(backend):
+    # the parents of the tags repeat, so they're merged back into order
+    p = xpath.compile('//tag/..', backend=backend).evaluate(doc, profile=True)
+    assert p.steps[-1].step == 'parent::node()'
+    assert p.steps[-1].sorts == 1
+    assert p.sorts == 1
+    assert len(p.value) == 10
+
+def test_profile_fresh():
+    ce = xpath.compile('//tag')
+    first = ce.evaluate(doc, profile=True)
+    second = ce.evaluate(doc, profile=True)
+    assert first.steps[0] is not second.steps[0]
+    assert second.steps[0].output_size == 20
+
+def test_profile_variables():
+    p = xpath.compile('//item[@id = $id]').evaluate(doc, {'id': 'i4'}, profile=True)
+    assert p.value == [doc.root_element[4]]
+
+def test_profile_str():
+    p = xpath.compile('count(//tag)').evaluate(doc, profile=True)
+    lines = str(p).split('\n')
+    assert lines[0] == 'count(//tag) (closure)'
+    assert lines[1].split() == ['step', 'in', 'out', 'predicates', 'sorts', 'ms']
+    assert lines[2].split()[:5] == ['descendant::tag', '1', '20', '0', '0']
+    assert lines[3].startswith('total')
+
+def test_profile_unattached():
+    with pytest.raises(ValueError):
+        xpath.compile('foo').evaluate(Element('foo'), profile=True)
@@ -0,0 +1,150 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+from expatriate.xpath import *
+
+doc = Document()
+doc.parse('''<root xmlns:x="http://example.com/x">
+    <section id="s1">
+        <item n="1" type="a"><price>10</price><tag>red</tag></item>
+        <item n="2" type="b"><price>25</price></item>
+        <x:item n="3" type="a"/>
+    </section>
+    <section id="s2">
+        <item n="4" type="b"><price>5</price><tag>blue</tag><tag>red</tag></item>
+        <group><item n="5" type="a"/></group>
+    </section>
+</root>''')
+
+EXPRESSIONS = [
+    '/',
+    '/root',
+    '/root/section',
+    '/root/section/item',
+    '/root/section[@id = "s2"]/item',
+    '/root/section[2]/item[1]',
+    '/root/section/item[last()]',
+    '//item',
+    '//item[@type = "a"]',
+    '//item[1]',
+    '//item[true]',
+    '//item[position() = 2]',
+    '//item/price',
+    '//item[price > 8]/@n',
+    '//item/tag[. = "red"]',
+    '//price | //tag',
+    '//item[@type = "b"] | //x:item | //group',
+    '//x:item',
+    '//*[@type]',
+    '//section//item',
+    '//item/..',
+    '//item/ancestor::section',
+    '//tag/preceding-sibling::*',
+    '//price/following::tag',
+    '//node()[self::price]',
+    '//text()',
+    'section/item',
+    'item',
+    '.',
+    '..',
+    'count(//item)',
+    'sum(//price)',
+    '//item[@n > $n]',
+    'string(//item/@n)',
+    'boolean(//item[@n = 9])',
+    'not(item)',
+    'count(//price | //tag)',
+    'string(@missing)',
+    '(//item)[2]',
+    '//item[price][tag]',
+]
+
+NAMESPACES = {'x': 'http://example.com/x'}
+VARIABLES = {'n': 2}
+
+@pytest.mark.parametrize('context_node', (doc, doc.root_element, doc.xpath('//section')[0]))
+@pytest.mark.parametrize('backend', CompiledExpression.BACKENDS)
+def test_matches_compiled(context_node, backend):
+    results = QuerySet(EXPRESSIONS, namespaces=NAMESPACES, backend=backend).evaluate(context_node, VARIABLES)
+    assert list(results.keys()) == EXPRESSIONS
+    for expr in EXPRESSIONS:
+        expected = CompiledExpression(expr, namespaces=NAMESPACES, backend=backend).evaluate(context_node, VARIABLES)
+        assert results[expr] == expected, expr
+
+def test_unoptimized():
+    results = QuerySet(EXPRESSIONS, namespaces=NAMESPACES, optimize=False).evaluate(doc, VARIABLES)
+    for expr in EXPRESSIONS:
+        assert results[expr] == CompiledExpression(expr, namespaces=NAMESPACES).evaluate(doc, VARIABLES), expr
+
+def test_ordered():
+    results = QuerySet(['//price | //tag', '//tag/preceding-sibling::*']).evaluate(doc)
+    for v in results.values():
+        assert v.ordered
+        assert v == Document.order_sort(list(v))
+
+def test_shared_prefix():
+    qs = QuerySet(['/root/section/item', '/root/section/item/price', '/root/section/@id'])
+    section = qs._absolute.children[repr(qs.expressions['/root/section/item'].ast.steps[0])]
+    assert len(section.children) == 1
+    assert section.queries == set(qs.expressions.keys())
+
+def test_literals_kept_apart():
+    results = QuerySet(['//item[true]', '//item[1]']).evaluate(doc)
+    assert len(results['//item[true]']) == 5
+    assert len(results['//item[1]']) == 3
+
+def test_single_walk(monkeypatch):
+    # the name tests of steps along one axis are all checked in one walk
+    calls = []
+    orig = Axis.AXES['descendant']
+    def counting(node):
+        calls.append(node)
+        return orig(node)
+    monkeypatch.setitem(Axis.AXES, 'descendant', counting)
+
+    results = QuerySet(['//item', '//price', '//tag[. = "red"]', '//group']).evaluate(doc)
+    assert len(calls) == 1
+    assert [len(v) for v in results.values()] == [5, 3, 2, 1]
+
+def test_functions_in_trie():
+    qs = QuerySet(['count(//item)', 'sum(//price | //tag[. = 5])', 'concat(//item/@n, "x")', 'count(//item) > 1'])
+    assert qs._paths['count(//item)'] is not None
+    assert qs._paths['sum(//price | //tag[. = 5])'] is not None
+    assert qs._paths['concat(//item/@n, "x")'] is None
+    assert qs._paths['count(//item) > 1'] is None
+
+def test_duplicates():
+    results = QuerySet(['//item', '//item']).evaluate(doc)
+    assert list(results.keys()) == ['//item']
+
+def test_timings():
+    exprs = ['//item', '//item/price', 'count(//item)']
+    results = QuerySet(exprs).evaluate(doc)
+    assert set(results.timings.keys()) == set(exprs)
+    assert all([t > 0 for t in results.timings.values()])
+
+def test_detached():
+    with pytest.raises(ValueError):
+        QuerySet(['//item']).evaluate(Element('detached'))
+
+def test_syntax_error():
+    with pytest.raises(XPathSyntaxException):
+        QuerySet(['//item', '//item['])
@@ -0,0 +1,158 @@
+# Copyright 2016 Casey Jaymes
+
+# This file is part of Expatriate.
+#
+# Expatriate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Expatriate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Expatriate.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+import pytest
+from expatriate import *
+from expatriate.xpath import *
+
+XML = '<root><item id="a">one</item><item id="b">two</item></root>'
+
+def test_hit():
+    doc = Document()
+    doc.parse(XML)
+    cache = doc.get_result_cache()
+    first = doc.xpath('//item')
+    assert cache.misses == 1
+    second = doc.xpath('//item')
+    assert cache.hits == 1
+    assert first == second
+    assert len(cache) == 1
+
+def test_result_copied():
+    doc = Document()
+    doc.parse(XML)
+    doc.xpath('//item').clear()
+    assert len(doc.xpath('//item')) == 2
+
+def test_keyed_by_context_node():
+    doc = Document()
+    doc.parse(XML)
+    cache = doc.get_result_cache()
+    a, b = doc.root_element.children
+    assert a.xpath('string(.)') == 'one'
+    assert b.xpath('string(.)') == 'two'
+    assert cache.misses == 2
+
+def test_keyed_by_variables():
+    doc = Document()
+    doc.parse(XML)
+    cache = doc.get_result_cache()
+    assert doc.xpath('//item[@id = $i]', variables={'i': 'a'})[0].get_string_value() == 'one'
+    assert doc.xpath('//item[@id = $i]', variables={'i': 'b'})[0].get_string_value() == 'two'
+    assert cache.misses == 2
+    doc.xpath('//item[@id = $i]', variables={'i': 'a'})
+    assert cache.hits == 1
+
+def test_unhashable_variables():
+    doc = Document()
+    doc.parse(XML)
+    cache = doc.get_result_cache()
+    items = doc.xpath('//item')
+    assert doc.xpath('count($n)', variables={'n': items}) == 2
+    assert len(cache) == 1
+
+def test_invalidated_by_children():
+    doc = Document()
+    doc.parse(XML)
+    assert doc.xpath('count(//item)') == 2
+    doc.root_element.append(Element('item'))
+    assert doc.xpath('count(//item)') == 3
+    doc.root_element.pop()
+    assert doc.xpath('count(//item)') == 2
+    doc.root_element.reverse()
+    assert doc.xpath('string(//item)') == 'two'
+
+def test_invalidated_by_attributes():
+    doc = Document()
+    doc.parse(XML)
+    assert len(doc.xpath('//item[@id="c"]')) == 0
+    doc.root_element[0].attributes['id'] = 'c'
+    assert len(doc.xpath('//item[@id="c"]')) == 1
+    del doc.root_element[0].attributes['id']
+    assert len(doc.xpath('//item[@id="c"]')) == 0
+
+def test_invalidated_by_data():
+    doc = Document()
+    doc.parse(XML)
+    assert doc.xpath('string(//item)') == 'one'
+    doc.root_element[0][0].data = 'uno'
+    assert doc.xpath('string(//item)') == 'uno'
+
+def test_invalidated_by_comment_data():
+    doc = Document()
+    doc.parse('<root><!--a--></root>')
+    assert len(doc.xpath('//comment()[. = "x"]')) == 0
+    doc.root_element[0].data = 'x'
+    assert len(doc.xpath('//comment()[. = "x"]')) == 1
+
+def test_invalidated_by_processing_instruction():
+    doc = Document()
+    doc.parse('<root><?a data?></root>')
+    assert doc.xpath('local-name(/root/node())') == 'a'
+    doc.root_element[0].target = 'b'
+    assert doc.xpath('local-name(/root/node())') == 'b'
+    assert doc.xpath('string(/root/node())') == 'data'
+    doc.root_element[0].data = 'x'
+    assert doc.xpath('string(/root/node())') == 'x'
+
+def test_invalidated_by_attribute_value():
+    doc = Document()
+    doc.parse(XML)
+    assert doc.xpath('string(//item[1]/@id)') == 'a'
+    doc.root_element[0].attribute_nodes['id'].value = 'c'
+    assert doc.xpath('string(//item[1]/@id)') == 'c'
+
+def test_invalidated_by_feed():
+    doc = Document()
+    doc.feed('<root><item/>')
+    assert doc.xpath('count(//item)') == 1
+    doc.feed('<item/></root>')
+    doc.close()
+    assert doc.xpath('count(//item)') == 2
+
+def test_lru():
+    doc = Document(result_cache_size=2)
+    doc.parse(XML)
+    cache = doc.get_result_cache()
+    doc.xpath('//item')
+    doc.xpath('/root')
+    doc.xpath('//item')
+    doc.xpath('count(//item)')
+    assert len(cache) == 2
+    doc.xpath('//item')
+    assert cache.hits == 2
+    doc.xpath('/root')
+    assert cache.misses == 4
+
+def test_clear():
+    doc = Document()
+    doc.parse(XML)
+    cache = doc.get_result_cache()
+    doc.xpath('//item')
+    doc.xpath('//item')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+def test_disabled():
+    doc = Document(result_cache_size=0)
+    doc.parse(XML)
+    assert doc.get_result_cache() is None
+    assert len(doc.xpath('//item')) == 2